@@ -2,8 +2,8 @@
  * Drizzle pgTable definitions matching semantic/*.yaml.
  * GENERATED — do not hand-edit. Run `make codegen` to regenerate.
  *
- * @schema tasks, subtasks, task_dependencies, agent_activity
- * @depends_on semantic/tasks.yaml, semantic/subtasks.yaml, semantic/task_dependencies.yaml, semantic/agent_activity.yaml
+ * @schema tasks, subtasks, task_dependencies, agent_activity, activity_rollup_hourly, rollup_watermarks
+ * @depends_on semantic/tasks.yaml, semantic/subtasks.yaml, semantic/task_dependencies.yaml, semantic/agent_activity.yaml, semantic/activity_rollup_hourly.yaml, semantic/rollup_watermarks.yaml
  * @depended_by app/page.tsx, lib/db.ts
  * @semver major
  */
@@ -14,13 +14,23 @@ import {
   text,
   real,
   integer,
+  bigint,
   timestamp,
+  primaryKey,
   uniqueIndex,
   index,
   check,
+  customType,
 } from "drizzle-orm/pg-core";
 import { sql } from "drizzle-orm";
 
+// Opaque binary payloads (e.g. LatencySketch.to_bytes in src/analytics/sketch.py)
+const bytea = customType<{ data: Buffer }>({
+  dataType() {
+    return "bytea";
+  },
+});
+
 export const tasks = pgTable(
   "tasks",
   {
@@ -38,6 +48,8 @@ export const tasks = pgTable(
     dueAt: timestamp("due_at", { withTimezone: true }),
     githubIssueNumber: integer("github_issue_number"),
     githubProjectItemId: varchar("github_project_item_id", { length: 50 }),
+    githubSyncHash: varchar("github_sync_hash", { length: 64 }),
+    githubSyncedAt: timestamp("github_synced_at", { withTimezone: true }),
     schemaVersion: integer("schema_version").notNull().default(1),
     createdAt: timestamp("created_at", { withTimezone: true })
       .notNull()
@@ -53,10 +65,12 @@ export const tasks = pgTable(
   ]
 );
 
+// Range-partitioned by event_at (migrations/0003_partition_agent_activity.sql);
+// the partition key is part of the primary key.
 export const agentActivity = pgTable(
   "agent_activity",
   {
-    id: uuid("id").primaryKey().defaultRandom(),
+    id: uuid("id").notNull().defaultRandom(),
     taskId: uuid("task_id").references(() => tasks.id, {
       onDelete: "set null",
     }),
@@ -79,10 +93,14 @@ export const agentActivity = pgTable(
       .defaultNow(),
   },
   (table) => [
+    primaryKey({ columns: [table.id, table.eventAt] }),
     index("ix_agent_activity_task_id").on(table.taskId),
     index("ix_agent_activity_agent_name").on(table.agentName),
     index("ix_agent_activity_hook_event").on(table.hookEvent),
-    index("ix_agent_activity_event_at").on(table.eventAt),
+    // INCLUDE (agent_name, hook_event, tool_name, duration_ms, cost_usd) is
+    // applied by migrations/0002_activity_covering_index.sql.
+    index("ix_agent_activity_event_at_covering").on(table.eventAt),
+    index("ix_agent_activity_created_at").on(table.createdAt),
   ]
 );
 
@@ -99,10 +117,8 @@ export const subtasks = pgTable(
     outputSummary: text("output_summary"),
     githubIssueNumber: integer("github_issue_number"),
     githubProjectItemId: varchar("github_project_item_id", { length: 50 }),
-    agentActivityId: uuid("agent_activity_id").references(
-      () => agentActivity.id,
-      { onDelete: "set null" }
-    ),
+    // Soft reference: agent_activity is partitioned, so id alone is not unique.
+    agentActivityId: uuid("agent_activity_id"),
     schemaVersion: integer("schema_version").notNull().default(1),
     createdAt: timestamp("created_at", { withTimezone: true })
       .notNull()
@@ -142,3 +158,53 @@ export const taskDependencies = pgTable(
     index("ix_task_dependencies_blocked").on(table.blockedTaskId),
   ]
 );
+
+// Hourly pre-aggregates of agent_activity (migrations/0004_activity_rollups.sql),
+// maintained by src/analytics/rollup.py. toolName is "" for tool-less events.
+export const activityRollupHourly = pgTable(
+  "activity_rollup_hourly",
+  {
+    bucketStart: timestamp("bucket_start", { withTimezone: true }).notNull(),
+    agentName: varchar("agent_name", { length: 50 }).notNull(),
+    toolName: varchar("tool_name", { length: 50 }).notNull().default(""),
+    hookEvent: varchar("hook_event", { length: 20 }).notNull(),
+    eventCount: integer("event_count").notNull().default(0),
+    durationCount: integer("duration_count").notNull().default(0),
+    durationSumMs: bigint("duration_sum_ms", { mode: "number" })
+      .notNull()
+      .default(0),
+    durationMinMs: integer("duration_min_ms"),
+    durationMaxMs: integer("duration_max_ms"),
+    costUsdSum: real("cost_usd_sum").notNull().default(0.0),
+    durationSketch: bytea("duration_sketch"),
+    updatedAt: timestamp("updated_at", { withTimezone: true })
+      .notNull()
+      .defaultNow(),
+  },
+  (table) => [
+    primaryKey({
+      columns: [
+        table.bucketStart,
+        table.agentName,
+        table.toolName,
+        table.hookEvent,
+      ],
+    }),
+    index("ix_activity_rollup_hourly_agent_bucket").on(
+      table.agentName,
+      table.bucketStart
+    ),
+  ]
+);
+
+export const rollupWatermarks = pgTable("rollup_watermarks", {
+  name: varchar("name", { length: 50 }).primaryKey(),
+  lastCreatedAt: timestamp("last_created_at", { withTimezone: true }),
+  lastId: uuid("last_id"),
+  rowsProcessed: bigint("rows_processed", { mode: "number" })
+    .notNull()
+    .default(0),
+  updatedAt: timestamp("updated_at", { withTimezone: true })
+    .notNull()
+    .defaultNow(),
+});
@@ -0,0 +1 @@
+"""Performance benchmarks. Run from the repo root with `python -m benchmarks.<name>`."""
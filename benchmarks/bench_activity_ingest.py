@@ -0,0 +1,123 @@
+"""Benchmark agent_activity ingest paths: per-row _log_event vs executemany vs COPY.
+
+depends_on:
+  - src/db/bulk.py
+  - src/hooks/activity_tracker.py
+  - benchmarks/common.py
+depended_by: []
+semver: patch
+
+Requires PRJ_NEON_DATABASE_URL (point it at a local Postgres or a Neon branch,
+never main). Rows are tagged with a unique agent_name and deleted afterwards.
+
+Usage:
+    python -m benchmarks.bench_activity_ingest
+    python -m benchmarks.bench_activity_ingest --sizes 10000 100000 --output ingest.json
+
+The per-row path is measured on at most --per-row-limit rows (default 10k) and
+reported as sampled throughput; 1M sequential round trips would take hours.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import sqlalchemy as sa
+
+from benchmarks.common import Timer, write_results
+from src.db.bulk import bulk_copy_activity
+from src.db.engine import dispose_engine, get_engine
+from src.db.tables import agent_activity
+from src.hooks.activity_tracker import _log_event
+
+
+def _rows(n: int, agent_name: str):
+    now = datetime.now(UTC)
+    for i in range(n):
+        yield {
+            "agent_name": agent_name,
+            "agent_role": "code_reviewer",
+            "session_id": "bench-session",
+            "hook_event": "PostToolUse",
+            "tool_name": "Read",
+            "tool_input_summary": "{'file_path': '/src/app.py'}",
+            "tool_response_summary": "x" * 200,
+            "duration_ms": i % 5000,
+            "event_at": now,
+        }
+
+
+async def _cleanup(agent_name: str) -> None:
+    async with get_engine().begin() as conn:
+        await conn.execute(
+            sa.delete(agent_activity).where(agent_activity.c.agent_name == agent_name)
+        )
+
+
+async def _per_row(n: int, agent_name: str) -> None:
+    for row in _rows(n, agent_name):
+        await _log_event(
+            task_id=None,
+            agent_name=row["agent_name"],
+            agent_role=row["agent_role"],
+            session_id=row["session_id"],
+            hook_event=row["hook_event"],
+            tool_name=row["tool_name"],
+            tool_input_summary=row["tool_input_summary"],
+            tool_response_summary=row["tool_response_summary"],
+            duration_ms=row["duration_ms"],
+        )
+
+
+async def run(sizes: list[int], per_row_limit: int, output: str | None) -> None:
+    agent_name = f"bench-{uuid4().hex[:12]}"
+    results = []
+    try:
+        for n in sizes:
+            methods = {
+                "copy": lambda n=n: bulk_copy_activity(_rows(n, agent_name)),
+                "executemany": lambda n=n: bulk_copy_activity(_rows(n, agent_name), use_copy=False),
+            }
+            if per_row_limit > 0:
+                methods["per_row"] = lambda n=n: _per_row(min(n, per_row_limit), agent_name)
+
+            for method, fn in methods.items():
+                measured = min(n, per_row_limit) if method == "per_row" else n
+                with Timer() as t:
+                    await fn()
+                await _cleanup(agent_name)
+                results.append(
+                    {
+                        "rows": n,
+                        "method": method,
+                        "measured_rows": measured,
+                        "seconds": round(t.elapsed, 3),
+                        "rows_per_sec": round(measured / t.elapsed) if t.elapsed else None,
+                    }
+                )
+    finally:
+        await _cleanup(agent_name)
+        await dispose_engine()
+
+    write_results(
+        output,
+        "activity_ingest",
+        {"sizes": sizes, "per_row_limit": per_row_limit},
+        results,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--per-row-limit", type=int, default=10_000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.per_row_limit, args.output))
+
+
+if __name__ == "__main__":
+    main()
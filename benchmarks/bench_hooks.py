@@ -0,0 +1,340 @@
+"""Benchmark wall-clock overhead that get_activity_hooks adds to an agent run.
+
+depends_on:
+  - src/hooks/activity_tracker.py
+  - src/hooks/activity_writer.py
+  - src/hooks/outbox.py
+  - benchmarks/common.py
+depended_by: []
+semver: patch
+
+Simulates `--concurrency` agents, each making `--calls` tool calls
+(PreToolUse + PostToolUse), a SubagentStop every `--subagent-every` calls and a
+final Stop. Every hook invocation is timed individually.
+
+Backends:
+  stub      in-process stand-in for the database; each execute/commit awaits
+            `--stub-latency-ms` (default 0) so hook-side CPU cost and a
+            simulated network round trip can be measured without Postgres
+  postgres  the real engine on PRJ_NEON_DATABASE_URL (local Postgres or a Neon
+            branch); benchmark rows are deleted afterwards
+
+Modes:
+  direct    default hooks: one INSERT + commit per event (_log_event)
+  batched   hooks with an ActivityWriter; drain time is reported separately
+  outbox    hooks with an ActivityOutbox in a temp SQLite file; drain as above
+
+Reported per run: p50/p95/p99/max hook latency (µs), events/sec, and net
+retained memory blocks per event (sys.getallocatedblocks delta after the
+drain, a leak indicator; ~1.0 is the timing sample itself). A second,
+traced pass reports allocations per event: blocks and KiB allocated while
+the hooks ran and still live when they finish (tracemalloc snapshot diff,
+taken before the drain, so rows buffered by a writer count), plus the
+tracemalloc peak.
+
+Usage:
+    python -m benchmarks.bench_hooks --backend stub --mode direct batched \\
+        --concurrency 1 8 32 --output hooks.json
+    python -m benchmarks.compare old.json hooks.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Self
+from unittest.mock import patch
+from uuid import uuid4
+
+from benchmarks.common import Timer, percentile, write_results
+from src.hooks.activity_tracker import get_activity_hooks
+from src.hooks.activity_writer import ActivityWriter
+from src.hooks.outbox import ActivityOutbox
+
+# ── Local database stand-in ─────────────────────────────────────────
+
+
+class _StubResult:
+    rowcount = 0
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+
+class _StubConnection:
+    """Async session/connection stand-in: execute/commit only await a fixed latency."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        return False
+
+    async def execute(self, statement, params=None) -> _StubResult:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return _StubResult()
+
+    async def commit(self) -> None:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+
+class _StubEngine:
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    def connect(self) -> _StubConnection:
+        return _StubConnection(self.latency_s)
+
+    begin = connect
+
+
+@contextlib.contextmanager
+def stub_backend(latency_ms: float) -> Iterator[None]:
+    """Route every hook write path to _StubConnection instead of Postgres."""
+    latency_s = latency_ms / 1000
+    engine = _StubEngine(latency_s)
+
+    def factory():
+        return lambda: _StubConnection(latency_s)
+
+    with contextlib.ExitStack() as stack:
+        for target in (
+            "src.hooks.activity_tracker.get_session_factory",
+            "src.db.crud.get_session_factory",
+        ):
+            stack.enter_context(patch(target, factory))
+        stack.enter_context(patch("src.db.crud.get_engine", lambda: engine))
+        yield
+
+
+@contextlib.contextmanager
+def postgres_backend() -> Iterator[None]:
+    yield
+
+
+# ── Workload ────────────────────────────────────────────────────────
+
+
+async def _agent(
+    hooks: dict, calls: int, subagent_every: int, samples: list[int], agent_idx: int
+) -> None:
+    session_id = f"bench-{agent_idx}"
+    perf = time.perf_counter_ns
+
+    async def timed(coro) -> None:
+        start = perf()
+        await coro
+        samples.append(perf() - start)
+
+    for i in range(calls):
+        tool_input = {"file_path": f"/src/module_{i % 50}.py"}
+        tool_use_id = f"toolu_{agent_idx}_{i}"
+        await timed(
+            hooks["PreToolUse"]("Read", tool_input, session_id=session_id, tool_use_id=tool_use_id)
+        )
+        await timed(
+            hooks["PostToolUse"](
+                "Read",
+                tool_input,
+                "line\n" * 40,
+                session_id=session_id,
+                tool_use_id=tool_use_id,
+            )
+        )
+        if subagent_every and (i + 1) % subagent_every == 0:
+            await timed(hooks["SubagentStop"](session_id=session_id, num_turns=i))
+    await timed(hooks["Stop"](session_id=session_id, num_turns=calls, cost_usd=0.01))
+
+
+async def _run_once(
+    mode: str,
+    concurrency: int,
+    calls: int,
+    subagent_every: int,
+    agent_name: str,
+    *,
+    trace: bool = False,
+) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        return await _measure(
+            mode, concurrency, calls, subagent_every, agent_name, Path(tmp), trace=trace
+        )
+
+
+async def _measure(
+    mode: str,
+    concurrency: int,
+    calls: int,
+    subagent_every: int,
+    agent_name: str,
+    tmp: Path,
+    *,
+    trace: bool,
+) -> dict:
+    writer: ActivityWriter | ActivityOutbox | None = None
+    if mode == "batched":
+        writer = ActivityWriter()
+    elif mode == "outbox":
+        writer = ActivityOutbox(tmp / "outbox.sqlite3")
+    hooks = get_activity_hooks(agent_name=agent_name, writer=writer)
+    samples: list[int] = []
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    snapshot = tracemalloc.take_snapshot() if trace else None
+    with Timer() as t:
+        await asyncio.gather(
+            *(_agent(hooks, calls, subagent_every, samples, n) for n in range(concurrency))
+        )
+    allocated = _allocated_since(snapshot) if trace else None
+
+    drain_s = 0.0
+    if writer is not None:
+        with Timer() as drain:
+            await writer.aclose()
+        drain_s = drain.elapsed
+    # Measured after the drain so buffered rows don't count as retained.
+    gc.collect()
+    blocks_after = sys.getallocatedblocks()
+
+    samples.sort()
+    events = len(samples)
+    us = [s / 1000 for s in samples]
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "events": events,
+        "p50_us": round(percentile(us, 50), 1),
+        "p95_us": round(percentile(us, 95), 1),
+        "p99_us": round(percentile(us, 99), 1),
+        "max_us": round(us[-1], 1) if us else 0.0,
+        "events_per_sec": round(events / t.elapsed) if t.elapsed else None,
+        "drain_s": round(drain_s, 4),
+        "retained_blocks_per_event": round((blocks_after - blocks_before) / events, 3),
+        **(
+            {
+                "alloc_blocks_per_event": round(allocated[0] / events, 2),
+                "alloc_kib_per_event": round(allocated[1] / 1024 / events, 3),
+            }
+            if allocated is not None
+            else {}
+        ),
+    }
+
+
+def _allocated_since(before: tracemalloc.Snapshot) -> tuple[int, int]:
+    """(blocks, bytes) allocated since `before` and still live, by allocation site."""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    after = tracemalloc.take_snapshot().filter_traces(ignore)
+    stats = after.compare_to(before.filter_traces(ignore), "traceback")
+    return (
+        sum(s.count_diff for s in stats if s.count_diff > 0),
+        sum(s.size_diff for s in stats if s.size_diff > 0),
+    )
+
+
+async def _traced(
+    mode: str, concurrency: int, calls: int, subagent_every: int, agent_name: str
+) -> dict:
+    """Allocation metrics and tracemalloc peak from a separate, traced pass."""
+    tracemalloc.start()
+    try:
+        result = await _run_once(mode, concurrency, calls, subagent_every, agent_name, trace=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_blocks_per_event": result["alloc_blocks_per_event"],
+        "alloc_kib_per_event": result["alloc_kib_per_event"],
+        "tracemalloc_peak_kib": round(peak / 1024, 1),
+    }
+
+
+async def _cleanup(agent_name: str) -> None:
+    import sqlalchemy as sa
+
+    from src.db.engine import dispose_engine, get_engine
+    from src.db.tables import agent_activity
+
+    async with get_engine().begin() as conn:
+        await conn.execute(
+            sa.delete(agent_activity).where(agent_activity.c.agent_name == agent_name)
+        )
+    await dispose_engine()
+
+
+async def run(args: argparse.Namespace) -> None:
+    agent_name = f"bench-{uuid4().hex[:12]}"
+    backend = stub_backend(args.stub_latency_ms) if args.backend == "stub" else postgres_backend()
+    results = []
+    try:
+        with backend:
+            for mode in args.mode:
+                for concurrency in args.concurrency:
+                    await _run_once(mode, concurrency, min(args.calls, 20), 0, agent_name)  # warm
+                    result = await _run_once(
+                        mode, concurrency, args.calls, args.subagent_every, agent_name
+                    )
+                    if args.trace_alloc:
+                        result |= await _traced(
+                            mode, concurrency, args.calls, args.subagent_every, agent_name
+                        )
+                    results.append(result)
+    finally:
+        if args.backend == "postgres":
+            await _cleanup(agent_name)
+
+    write_results(
+        args.output,
+        "hooks",
+        {
+            "backend": args.backend,
+            "stub_latency_ms": args.stub_latency_ms if args.backend == "stub" else None,
+            "calls_per_agent": args.calls,
+            "subagent_every": args.subagent_every,
+        },
+        results,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["stub", "postgres"], default="stub")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--mode", nargs="+", choices=["direct", "batched", "outbox"], default=["direct"]
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per agent")
+    parser.add_argument("--subagent-every", type=int, default=50)
+    parser.add_argument(
+        "--no-trace-alloc",
+        dest="trace_alloc",
+        action="store_false",
+        help="Skip the tracemalloc pass",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Microbenchmark per-call overhead of session factory and session vs connection paths.
+
+depends_on:
+  - src/db/engine.py
+  - src/db/crud.py
+  - benchmarks/common.py
+depended_by: []
+semver: patch
+
+Offline cases (always run, no database needed):
+  factory_rebuild   build a new sessionmaker per call (the old get_session_factory)
+  factory_cached    cached get_session_factory()
+  session_open      open + close an AsyncSession without executing anything
+
+Online cases (only when PRJ_NEON_DATABASE_URL is set):
+  crud_session      Crud(tasks).exists(id) through an AsyncSession
+  crud_connection   Crud(tasks, use_connection=True).exists(id) on an AsyncConnection
+
+Usage:
+    python -m benchmarks.bench_session_overhead --iterations 20000 --output session.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import Timer, write_results
+from src.db.crud import Crud
+from src.db.engine import dispose_engine, get_engine, get_session_factory
+from src.db.tables import tasks
+
+
+def _result(case: str, n: int, seconds: float) -> dict:
+    return {"case": case, "iterations": n, "us_per_call": round(seconds / n * 1e6, 2)}
+
+
+async def run(iterations: int, db_iterations: int, output: str | None) -> None:
+    online = bool(os.environ.get("PRJ_NEON_DATABASE_URL"))
+    if not online:
+        # Engine creation is lazy: no connection is made for the offline cases.
+        os.environ["PRJ_NEON_DATABASE_URL"] = "postgresql://bench@localhost:1/bench"
+
+    engine = get_engine()
+    results = []
+
+    with Timer() as t:
+        for _ in range(iterations):
+            sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    results.append(_result("factory_rebuild", iterations, t.elapsed))
+
+    with Timer() as t:
+        for _ in range(iterations):
+            get_session_factory()
+    results.append(_result("factory_cached", iterations, t.elapsed))
+
+    factory = get_session_factory()
+    with Timer() as t:
+        for _ in range(iterations):
+            async with factory():
+                pass
+    results.append(_result("session_open", iterations, t.elapsed))
+
+    if online:
+        missing = uuid4()
+        for case, crud in (
+            ("crud_session", Crud(tasks)),
+            ("crud_connection", Crud(tasks, use_connection=True)),
+        ):
+            await crud.exists(missing)  # warm the pool and statement cache
+            with Timer() as t:
+                for _ in range(db_iterations):
+                    await crud.exists(missing)
+            results.append(_result(case, db_iterations, t.elapsed))
+
+    await dispose_engine()
+    write_results(
+        output,
+        "session_overhead",
+        {"iterations": iterations, "db_iterations": db_iterations, "online": online},
+        results,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--db-iterations", type=int, default=2_000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.db_iterations, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Shared helpers for benchmark scripts: timing, percentiles, JSON results.
+
+depends_on: []
+depended_by:
+  - benchmarks/bench_activity_ingest.py
+  - benchmarks/bench_hooks.py
+  - benchmarks/bench_session_overhead.py
+semver: patch
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Self
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def git_commit() -> str | None:
+    """Current commit hash, so result files can be compared across commits."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str | None, name: str, params: dict, results: list[dict]) -> dict:
+    """Print results and, if `path` is set, write them as JSON."""
+    doc = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "run_at": datetime.now(UTC).isoformat(),
+        "params": params,
+        "results": results,
+    }
+    for r in results:
+        print("  " + "  ".join(f"{k}={v}" for k, v in r.items()))
+    if path:
+        Path(path).write_text(json.dumps(doc, indent=2, default=str) + "\n")
+        print(f"Wrote {path}")
+    return doc
+
+
+class Timer:
+    """Context manager measuring wall-clock seconds with perf_counter."""
+
+    def __enter__(self) -> Self:
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,63 @@
+"""Diff two benchmark result files written by write_results.
+
+depends_on: []
+depended_by: []
+semver: patch
+
+Rows are matched on their non-metric keys (e.g. mode, concurrency); each numeric
+metric is printed as old → new with the percentage change.
+
+Usage:
+    python -m benchmarks.compare base.json head.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+# Keys that identify a result row rather than measure it.
+_KEY_FIELDS = ("method", "mode", "concurrency", "rows", "batch_size", "case")
+
+
+def _row_key(row: dict) -> tuple:
+    return tuple((k, row[k]) for k in _KEY_FIELDS if k in row)
+
+
+def compare(old: dict, new: dict) -> list[str]:
+    """Return human-readable lines comparing matching rows of two result docs."""
+    lines = [f"{old['benchmark']}: {old.get('commit')} → {new.get('commit')}"]
+    if old.get("params") != new.get("params"):
+        lines.append(f"  warning: params differ: {old.get('params')} vs {new.get('params')}")
+    base = {_row_key(r): r for r in old["results"]}
+    for row in new["results"]:
+        key = _row_key(row)
+        label = " ".join(f"{k}={v}" for k, v in key) or "(all)"
+        prev = base.get(key)
+        if prev is None:
+            lines.append(f"  {label}: new row")
+            continue
+        for metric, value in row.items():
+            if metric in _KEY_FIELDS or not isinstance(value, (int, float)):
+                continue
+            before = prev.get(metric)
+            if not isinstance(before, (int, float)):
+                continue
+            change = f"{(value - before) / before * 100:+.1f}%" if before else "n/a"
+            lines.append(f"  {label} {metric}: {before} → {value} ({change})")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    args = parser.parse_args()
+    old = json.loads(args.old.read_text())
+    new = json.loads(args.new.read_text())
+    print("\n".join(compare(old, new)))
+
+
+if __name__ == "__main__":
+    main()
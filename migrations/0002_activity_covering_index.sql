@@ -0,0 +1,15 @@
+-- 0002_activity_covering_index.sql
+-- Replace the plain event_at index on agent_activity with a covering index so
+-- time-range dashboards (recent activity, per-tool timings) that read only
+-- these columns can be answered with index-only scans, skipping the heap and
+-- its two 2000-char summary columns.
+--
+-- Index-only scans depend on the visibility map, so they pay off once autovacuum
+-- has processed the table. On a large live table, run the CREATE as
+-- CREATE INDEX CONCURRENTLY outside a transaction instead.
+
+CREATE INDEX IF NOT EXISTS ix_agent_activity_event_at_covering
+    ON agent_activity (event_at)
+    INCLUDE (agent_name, hook_event, tool_name, duration_ms, cost_usd);
+
+DROP INDEX IF EXISTS ix_agent_activity_event_at;
@@ -0,0 +1,99 @@
+-- 0003_partition_agent_activity.sql
+-- Convert agent_activity into a table range-partitioned by event_at (monthly,
+-- UTC bounds, named agent_activity_pYYYYMM). Old months can then be expired
+-- with DETACH/DROP PARTITION instead of DELETE, and each partition's indexes
+-- stay small. Ongoing partition creation/expiry: src/db/partitions.py
+-- (make db-partitions), driven by the `partitioning` block in
+-- semantic/agent_activity.yaml.
+--
+-- Schema changes:
+--   * primary key becomes (id, event_at): unique constraints on a partitioned
+--     table must include the partition key
+--   * subtasks.agent_activity_id loses its foreign key (it cannot reference a
+--     non-unique id) and becomes a soft reference
+--   * agent_activity_default catches rows outside every partition; it should
+--     stay empty while maintenance runs on schedule
+--
+-- Existing rows are copied into the new partitions inside one transaction.
+-- On a very large table, run this in a maintenance window (hooks that fail to
+-- insert meanwhile are dropped by design, or buffered by ActivityOutbox).
+
+BEGIN;
+
+SET LOCAL TIME ZONE 'UTC';
+
+ALTER TABLE subtasks DROP CONSTRAINT IF EXISTS subtasks_agent_activity_id_fkey;
+
+-- Move the old heap aside, freeing its index names
+ALTER TABLE agent_activity RENAME TO agent_activity_legacy;
+ALTER TABLE agent_activity_legacy RENAME CONSTRAINT agent_activity_pkey TO agent_activity_legacy_pkey;
+ALTER INDEX IF EXISTS ix_agent_activity_task_id RENAME TO ix_agent_activity_legacy_task_id;
+ALTER INDEX IF EXISTS ix_agent_activity_agent_name RENAME TO ix_agent_activity_legacy_agent_name;
+ALTER INDEX IF EXISTS ix_agent_activity_hook_event RENAME TO ix_agent_activity_legacy_hook_event;
+ALTER INDEX IF EXISTS ix_agent_activity_event_at_covering RENAME TO ix_agent_activity_legacy_event_at_covering;
+
+CREATE TABLE agent_activity (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    task_id UUID REFERENCES tasks(id) ON DELETE SET NULL,
+    subtask_id UUID,
+    agent_name VARCHAR(50) NOT NULL,
+    agent_role VARCHAR(30),
+    session_id VARCHAR(100),
+    hook_event VARCHAR(20) NOT NULL,
+    tool_name VARCHAR(50),
+    tool_input_summary VARCHAR(2000),
+    tool_response_summary VARCHAR(2000),
+    duration_ms INTEGER,
+    cost_usd REAL,
+    num_turns INTEGER,
+    event_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, event_at)
+) PARTITION BY RANGE (event_at);
+
+ALTER TABLE agent_activity
+    ADD CONSTRAINT fk_agent_activity_subtask
+    FOREIGN KEY (subtask_id) REFERENCES subtasks(id) ON DELETE SET NULL;
+
+-- Indexes on the parent are created on every partition automatically
+CREATE INDEX ix_agent_activity_task_id ON agent_activity (task_id);
+CREATE INDEX ix_agent_activity_agent_name ON agent_activity (agent_name);
+CREATE INDEX ix_agent_activity_hook_event ON agent_activity (hook_event);
+CREATE INDEX ix_agent_activity_event_at_covering
+    ON agent_activity (event_at)
+    INCLUDE (agent_name, hook_event, tool_name, duration_ms, cost_usd);
+
+CREATE TABLE agent_activity_default PARTITION OF agent_activity DEFAULT;
+
+-- Monthly partitions from the oldest existing row through 3 months ahead
+DO $$
+DECLARE
+    m TIMESTAMPTZ;
+    stop TIMESTAMPTZ := date_trunc('month', now()) + interval '4 months';
+BEGIN
+    SELECT COALESCE(date_trunc('month', min(event_at)), date_trunc('month', now()))
+      INTO m
+      FROM agent_activity_legacy;
+    WHILE m < stop LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF agent_activity FOR VALUES FROM (%L) TO (%L)',
+            'agent_activity_p' || to_char(m, 'YYYYMM'), m, m + interval '1 month'
+        );
+        m := m + interval '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO agent_activity (
+    id, task_id, subtask_id, agent_name, agent_role, session_id, hook_event, tool_name,
+    tool_input_summary, tool_response_summary, duration_ms, cost_usd, num_turns,
+    event_at, created_at
+)
+SELECT
+    id, task_id, subtask_id, agent_name, agent_role, session_id, hook_event, tool_name,
+    tool_input_summary, tool_response_summary, duration_ms, cost_usd, num_turns,
+    event_at, created_at
+FROM agent_activity_legacy;
+
+DROP TABLE agent_activity_legacy;
+
+COMMIT;
@@ -0,0 +1,50 @@
+-- 0004_activity_rollups.sql
+-- Hourly pre-aggregates of agent_activity so dashboards read one row per
+-- (hour, agent, tool, event) instead of scanning raw events. Maintained
+-- incrementally by src/analytics/rollup.py (make analytics-rollup), which
+-- reads rows past the watermark in rollup_watermarks and folds them into
+-- activity_rollup_hourly. Query API: src/analytics/query.py.
+--
+--   * tool_name is '' (not NULL) for tool-less events so it can be part of
+--     the primary key; the query API maps it back to NULL
+--   * duration_sketch is a mergeable latency sketch (JSONB here; 0005 changes
+--     it to the compact BYTEA encoding); percentiles over any range are
+--     computed by merging sketches, not from SQL
+--   * the watermark is (created_at, id), so ix_agent_activity_created_at lets
+--     each run read only new rows (the index is created on every partition)
+--
+-- On a large live table, build the index with CREATE INDEX CONCURRENTLY on
+-- each partition first; this CREATE then only attaches them.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_agent_activity_created_at ON agent_activity (created_at);
+
+CREATE TABLE IF NOT EXISTS activity_rollup_hourly (
+    bucket_start TIMESTAMPTZ NOT NULL,
+    agent_name VARCHAR(50) NOT NULL,
+    tool_name VARCHAR(50) NOT NULL DEFAULT '',
+    hook_event VARCHAR(20) NOT NULL,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    duration_count INTEGER NOT NULL DEFAULT 0,
+    duration_sum_ms BIGINT NOT NULL DEFAULT 0,
+    duration_min_ms INTEGER,
+    duration_max_ms INTEGER,
+    cost_usd_sum REAL NOT NULL DEFAULT 0.0,
+    duration_sketch JSONB,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (bucket_start, agent_name, tool_name, hook_event)
+);
+
+CREATE INDEX IF NOT EXISTS ix_activity_rollup_hourly_agent_bucket
+    ON activity_rollup_hourly (agent_name, bucket_start);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    last_created_at TIMESTAMPTZ,
+    last_id UUID,
+    rows_processed BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMIT;
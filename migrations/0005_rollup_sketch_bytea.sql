@@ -0,0 +1,19 @@
+-- 0005_rollup_sketch_bytea.sql
+-- Store activity_rollup_hourly.duration_sketch in the compact binary sketch
+-- encoding (LatencySketch.to_bytes, src/analytics/sketch.py) instead of JSONB:
+-- varint delta-encoded bins take a fraction of the space and decode without
+-- a JSON parser.
+--
+-- Rollups are derived data, so instead of converting in SQL the table is
+-- emptied and its watermark reset; the next `make analytics-rollup` rebuilds
+-- every bucket from agent_activity (bounded by partition retention).
+
+BEGIN;
+
+TRUNCATE activity_rollup_hourly;
+DELETE FROM rollup_watermarks WHERE name = 'activity_rollup_hourly';
+
+ALTER TABLE activity_rollup_hourly DROP COLUMN duration_sketch;
+ALTER TABLE activity_rollup_hourly ADD COLUMN duration_sketch BYTEA;
+
+COMMIT;
@@ -0,0 +1,19 @@
+-- 0006_task_github_sync_hash.sql
+-- Change detection for the GitHub sync (src/sync/github_project.py).
+--
+--   * github_sync_hash: SHA-256 of (title, description, status) as last
+--     pushed to GitHub; the sync skips tasks whose current hash matches
+--   * github_synced_at: set on every sync or "unchanged" confirmation, in the
+--     same statement that bumps updated_at (trg_tasks_updated_at), so
+--     `updated_at > github_synced_at` selects exactly the tasks touched since
+--     the last sync. A sync that raced an edit leaves it unchanged, so the
+--     edit is still selected next time.
+--
+-- Existing rows start with NULLs and are pushed once on the next sync.
+
+BEGIN;
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS github_sync_hash VARCHAR(64);
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS github_synced_at TIMESTAMPTZ;
+
+COMMIT;
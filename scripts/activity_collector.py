@@ -0,0 +1,54 @@
+"""Run the per-host activity collector that agent processes send hook events to.
+
+Usage:
+    python scripts/activity_collector.py [--socket PATH] [--outbox PATH]
+
+Agents opt in with get_activity_hooks(..., transport="uds"). The collector owns
+the only database pool on the host (PRJ_DB_POOL_PROFILE defaults to
+hook-writer here). With --outbox, received events are spooled to a SQLite
+outbox first so they survive database outages and collector restarts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+
+from src.db.engine import dispose_engine
+from src.hooks.collector import ActivityCollector
+from src.hooks.outbox import ActivityOutbox
+
+logger = logging.getLogger(__name__)
+
+
+async def run(args: argparse.Namespace) -> None:
+    writer = ActivityOutbox(args.outbox) if args.outbox else None
+    collector = ActivityCollector(args.socket, writer=writer)
+    await collector.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info("Shutting down: %d events received", collector.received)
+    await collector.aclose()
+    await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", help="Socket path (default PRJ_ACTIVITY_COLLECTOR_SOCKET)")
+    parser.add_argument("--outbox", help="Spool events through a SQLite outbox at this path")
+    args = parser.parse_args()
+    os.environ.setdefault("PRJ_DB_POOL_PROFILE", "hook-writer")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
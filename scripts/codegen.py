@@ -26,8 +26,10 @@ TYPE_MAP: dict[str, tuple[str, str, str, str]] = {
     "varchar": ("str", "sa.String", "varchar", "VARCHAR"),
     "text": ("str | None", "sa.Text", "text", "TEXT"),
     "integer": ("int", "sa.Integer", "integer", "INTEGER"),
+    "bigint": ("int", "sa.BigInteger", "bigint", "BIGINT"),
     "float": ("float", "sa.Float", "real", "REAL"),
     "timestamptz": ("datetime", "sa.DateTime(timezone=True)", "timestamp", "TIMESTAMPTZ"),
+    "bytea": ("bytes | None", "sa.LargeBinary", "bytea", "BYTEA"),
 }
 
 
@@ -54,16 +56,59 @@ def parse_type(col_type: str) -> tuple[str, int | None]:
     return col_type, None
 
 
+PARTITION_INTERVALS = ("day", "month")
+PARTITION_EXPIRE = ("drop", "detach")
+
+
+def validate_partitioning(table: dict) -> list[str]:
+    """Check a table's optional `partitioning` block. Returns error messages."""
+    spec = table.get("partitioning")
+    if not spec:
+        return []
+    name = table["name"]
+    columns = table.get("columns", {})
+    errors = []
+    if spec.get("strategy") != "range":
+        errors.append(f"{name}: partitioning.strategy must be 'range'")
+    column = spec.get("column")
+    if column not in columns:
+        errors.append(f"{name}: partitioning.column '{column}' is not a column")
+    elif not columns[column].get("primary_key"):
+        errors.append(f"{name}: partition column '{column}' must be part of the primary key")
+    if spec.get("interval") not in PARTITION_INTERVALS:
+        errors.append(f"{name}: partitioning.interval must be one of {PARTITION_INTERVALS}")
+    premake = spec.get("premake", 1)
+    if not isinstance(premake, int) or premake < 1:
+        errors.append(f"{name}: partitioning.premake must be an integer >= 1")
+    retain = spec.get("retain")
+    if retain is not None and (not isinstance(retain, int) or retain < 1):
+        errors.append(f"{name}: partitioning.retain must be null or an integer >= 1")
+    if spec.get("expire", "detach") not in PARTITION_EXPIRE:
+        errors.append(f"{name}: partitioning.expire must be one of {PARTITION_EXPIRE}")
+    return errors
+
+
 def generate_drizzle_schema(tables: list[dict], enums: dict) -> str:
     """Generate Drizzle pgTable definitions."""
     lines = [
         "// Auto-generated from semantic/*.yaml — do not edit manually",
-        'import { pgTable, uuid, varchar, text, real, integer, timestamp } from "drizzle-orm/pg-core";',
+        "import {",
+        "  pgTable, uuid, varchar, text, real, integer, bigint, timestamp, primaryKey,",
+        "  customType,",
+        '} from "drizzle-orm/pg-core";',
+        "",
+        "const bytea = customType<{ data: Buffer }>({",
+        "  dataType() {",
+        '    return "bytea";',
+        "  },",
+        "});",
         "",
     ]
 
     for table in tables:
         name = table["name"]
+        pk_cols = [c for c, d in table["columns"].items() if d.get("primary_key")]
+        composite_pk = len(pk_cols) > 1
         lines.append(f'export const {name} = pgTable("{name}", {{')
 
         for col_name, col_def in table["columns"].items():
@@ -88,6 +133,10 @@ def generate_drizzle_schema(tables: list[dict], enums: dict) -> str:
                 parts.append(f'real("{col_name}")')
             elif drizzle_type == "integer":
                 parts.append(f'integer("{col_name}")')
+            elif drizzle_type == "bigint":
+                parts.append(f'bigint("{col_name}", {{ mode: "number" }})')
+            elif drizzle_type == "bytea":
+                parts.append(f'bytea("{col_name}")')
             elif drizzle_type == "timestamp":
                 parts.append(f'timestamp("{col_name}", {{ withTimezone: true }})')
             else:
@@ -96,9 +145,11 @@ def generate_drizzle_schema(tables: list[dict], enums: dict) -> str:
             chain = ".".join(parts)
 
             if is_pk:
-                chain += ".primaryKey()"
+                chain += ".notNull()" if composite_pk else ".primaryKey()"
                 if default and "gen_random_uuid" in str(default):
                     chain += ".defaultRandom()"
+                if server_default == "now()":
+                    chain += ".defaultNow()"
             else:
                 if not nullable:
                     chain += ".notNull()"
@@ -112,7 +163,11 @@ def generate_drizzle_schema(tables: list[dict], enums: dict) -> str:
 
             lines.append(f"  {col_name}: {chain},")
 
-        lines.append("});")
+        if composite_pk:
+            cols = ", ".join(f"table.{c}" for c in pk_cols)
+            lines.append(f"}}, (table) => [primaryKey({{ columns: [{cols}] }})]);")
+        else:
+            lines.append("});")
         lines.append("")
 
     return "\n".join(lines)
@@ -130,15 +185,35 @@ def main():
     args = parser.parse_args()
 
     enums = load_enums()
-    table_names = ["tasks", "subtasks", "task_dependencies", "agent_activity"]
+    table_names = [
+        "tasks",
+        "subtasks",
+        "task_dependencies",
+        "agent_activity",
+        "activity_rollup_hourly",
+        "rollup_watermarks",
+    ]
     tables = [load_table(name) for name in table_names]
 
     print(f"Loaded {len(enums)} enums: {', '.join(enums.keys())}")
     print(f"Loaded {len(tables)} tables: {', '.join(t['name'] for t in tables)}")
 
+    errors = []
     for table in tables:
         col_count = len(table.get("columns", {}))
-        print(f"  {table['name']}: {col_count} columns")
+        partitioning = table.get("partitioning")
+        suffix = (
+            f", partitioned by {partitioning.get('interval')} on {partitioning.get('column')}"
+            if partitioning
+            else ""
+        )
+        print(f"  {table['name']}: {col_count} columns{suffix}")
+        errors.extend(validate_partitioning(table))
+
+    if errors:
+        for error in errors:
+            print(f"ERROR: {error}")
+        raise SystemExit(1)
 
     if args.check:
         print("\n--check mode: validation passed, no files written.")
@@ -0,0 +1,41 @@
+"""Export new agent_activity rows to date-partitioned Parquet.
+
+Usage:
+    python scripts/export_activity.py [--dest DIR] [--full] [--no-copy]
+
+Incremental: each run appends part files for rows inserted since the last
+export into DIR (default exports/agent_activity). Needs the `export` extra
+(pyarrow). PRJ_DB_POOL_PROFILE defaults to batch here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+
+from src.analytics.export import export_activity
+from src.db.engine import dispose_engine
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        report = await export_activity(args.dest, full=args.full, use_copy=not args.no_copy)
+    finally:
+        await dispose_engine()
+    print(json.dumps(report, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dest", default="exports/agent_activity", help="Dataset directory")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved watermark")
+    parser.add_argument("--no-copy", action="store_true", help="Use a server-side cursor")
+    args = parser.parse_args()
+    os.environ.setdefault("PRJ_DB_POOL_PROFILE", "batch")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
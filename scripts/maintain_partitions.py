@@ -0,0 +1,34 @@
+"""Pre-create upcoming agent_activity partitions and expire old ones.
+
+Usage:
+    python scripts/maintain_partitions.py [--dry-run]
+
+Safe to run repeatedly; schedule it at least once per partition interval.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+
+from src.db.engine import dispose_engine
+from src.db.partitions import maintain_partitions
+
+
+async def run(dry_run: bool) -> None:
+    try:
+        report = await maintain_partitions(dry_run=dry_run)
+    finally:
+        await dispose_engine()
+    print(json.dumps(report, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Print planned DDL only")
+    asyncio.run(run(parser.parse_args().dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Fold new agent_activity rows into the hourly rollup tables.
+
+Usage:
+    python scripts/run_rollups.py [--batch-size N] [--lag SECONDS]
+
+Incremental and safe to run repeatedly; schedule it every few minutes.
+PRJ_DB_POOL_PROFILE defaults to batch here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from datetime import timedelta
+
+from src.analytics.rollup import run_rollup
+from src.db.engine import dispose_engine
+
+
+async def run(batch_size: int, lag: float) -> None:
+    try:
+        report = await run_rollup(batch_size=batch_size, lag=timedelta(seconds=lag))
+    finally:
+        await dispose_engine()
+    print(json.dumps(report, indent=2, default=str))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction")
+    parser.add_argument(
+        "--lag", type=float, default=30.0, help="Skip rows inserted in the last N seconds"
+    )
+    args = parser.parse_args()
+    os.environ.setdefault("PRJ_DB_POOL_PROFILE", "batch")
+    asyncio.run(run(args.batch_size, args.lag))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,111 @@
-"""CLI entry: sync all pending/in-progress tasks to GitHub."""
+"""CLI entry: sync changed pending/in-progress tasks to GitHub.
+
+Usage:
+    python scripts/sync_github.py [--concurrency N] [--timeout SECONDS] [--min-interval SECONDS]
+                                  [--burst N] [--transport auto|graphql|gh] [--force]
+
+Only tasks whose title, description or status changed since their last sync
+are pushed (see select_tasks_to_sync), in-progress tasks first; --force
+pushes every task. Requests are paced under GitHub's rate limits by a shared
+Pacer (src/sync/rate_limit.py).
+
+Tasks sync concurrently (see src/sync/batch.py). With a GitHub token available
+(ORG_GITHUB_TOKEN, GH_TOKEN, or `gh auth login`) they go out as batched
+GraphQL requests. Otherwise, or with --transport gh, each task runs gh
+commands. Progress prints one line per task, then a JSON summary.
+"""
 
 from __future__ import annotations
 
+import argparse
 import asyncio
-import sqlalchemy as sa
+import json
+
+from src.db.engine import dispose_engine
+from src.sync.batch import SyncResult, sync_tasks
+from src.sync.github_project import select_tasks_to_sync
+from src.sync.graphql import GraphQLClient
+from src.sync.rate_limit import Pacer
 
-from src.db.engine import get_session_factory, dispose_engine
-from src.db.tables import tasks
-from src.sync.github_project import sync_task_to_github
 
+async def main(
+    concurrency: int,
+    timeout: float,
+    min_interval: float,
+    burst: int,
+    transport: str,
+    force: bool,
+) -> None:
+    pacer = Pacer(min_interval, burst=burst)
+    client = None if transport == "gh" else GraphQLClient.from_env(pacer=pacer)
+    if client is None and transport == "graphql":
+        raise SystemExit("No GitHub token found for --transport graphql")
 
-async def main():
-    factory = get_session_factory()
+    try:
+        rows = await select_tasks_to_sync(["pending", "in_progress", "blocked"], force=force)
 
-    async with factory() as session:
-        rows = (
-            (
-                await session.execute(
-                    sa.select(tasks.c.id, tasks.c.title, tasks.c.status).where(
-                        tasks.c.status.in_(["pending", "in_progress", "blocked"])
-                    )
-                )
+        via = "gh" if client is None else "GraphQL"
+        print(f"Found {len(rows)} changed tasks to sync via {via} (concurrency {concurrency})")
+        titles = {row["id"]: row["title"] for row in rows}
+
+        def progress(result: SyncResult, done: int, total: int) -> None:
+            outcome = (
+                f"issue #{result.github_issue_number}" if result.ok else f"FAILED: {result.error}"
             )
-            .mappings()
-            .all()
-        )
+            print(f"  [{done}/{total}] {titles[result.task_id]} → {outcome}")
 
-    print(f"Found {len(rows)} tasks to sync")
+        summary = await sync_tasks(
+            titles,
+            concurrency=concurrency,
+            timeout=timeout,
+            pacer=pacer,
+            client=client,
+            on_result=progress,
+        )
+    finally:
+        if client is not None:
+            client.close()
+        await dispose_engine()
+    report = summary.to_dict()
+    report["rate_limit_wait_s"] = round(pacer.waited, 2)
+    report["quota_remaining"] = pacer.remaining
+    print(json.dumps(report, indent=2))
 
-    for row in rows:
-        print(f"  Syncing: {row['title']} ({row['status']})")
-        try:
-            result = await sync_task_to_github(row["id"])
-            print(f"    → issue #{result['github_issue_number']}")
-        except Exception as e:
-            print(f"    → FAILED: {e}")
 
-    await dispose_engine()
+def cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8, help="Tasks synced at once")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-task timeout (s)")
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=0.75,
+        help="Minimum seconds between gh write calls (GitHub secondary rate limits)",
+    )
+    parser.add_argument(
+        "--burst", type=int, default=1, help="Writes allowed back to back after an idle spell"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["auto", "graphql", "gh"],
+        default="auto",
+        help="auto: GraphQL when a token is available, else gh",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Push every task, even if unchanged since last sync"
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.concurrency,
+            args.timeout,
+            args.min_interval,
+            args.burst,
+            args.transport,
+            args.force,
+        )
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli()
@@ -0,0 +1,17 @@
+"""Analytics over agent_activity: hourly rollups, queries, and Parquet export."""
+
+from src.analytics.export import export_activity
+from src.analytics.query import agent_cost, query_rollups, tool_latency
+from src.analytics.rollup import Bucket, aggregate, run_rollup
+from src.analytics.sketch import LatencySketch
+
+__all__ = [
+    "Bucket",
+    "LatencySketch",
+    "agent_cost",
+    "aggregate",
+    "export_activity",
+    "query_rollups",
+    "run_rollup",
+    "tool_latency",
+]
@@ -0,0 +1,299 @@
+"""Incremental columnar export of agent_activity to date-partitioned Parquet.
+
+depends_on:
+  - src/db/crud.py
+  - src/db/engine.py
+  - src/db/tables.py
+depended_by:
+  - src/analytics/__init__.py
+  - scripts/export_activity.py
+  - tests/test_analytics.py
+semver: minor
+
+Usage:
+    from src.analytics.export import export_activity
+
+    report = await export_activity("exports/agent_activity")
+    # {"rows": 120431, "files": ["exports/agent_activity/event_date=2026-10-17/part-....parquet"],
+    #  "watermark": ["2026-10-17T13:04:11.120+00:00", "5b0c..."], ...}
+
+    import pyarrow.dataset as ds
+    table = ds.dataset("exports/agent_activity", partitioning="hive").to_table(
+        filter=ds.field("event_date") == "2026-10-17"
+    )
+
+Layout (Hive-style, readable by pyarrow, DuckDB, Polars, Spark):
+
+    <dest>/event_date=YYYY-MM-DD/part-<run>.parquet   UTC date of event_at
+    <dest>/_export_state.json                         watermark + totals
+
+Rows are read with COPY (SELECT ...) TO STDOUT in CSV, spooled to a temp file,
+and parsed straight into Arrow record batches, so no per-row Python objects
+are built. If the driver has no COPY, it falls back to a server-side cursor
+(Crud.iter(stream=True)) with one batch of dicts in memory at a time.
+
+Each run exports the rows inserted after the saved `(created_at, id)`
+watermark (like src/analytics/rollup.py) and writes new part files, never
+rewriting old ones. Files are written under a dot-prefixed name, which
+dataset readers ignore, and renamed when complete. The watermark is saved
+last, so a crashed run leaves only ignorable temp files. A crash between the
+rename and the watermark save can duplicate rows in the next run; `id`
+identifies them.
+
+Requires the optional `export` extra (pyarrow).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import sqlalchemy as sa
+
+from src.db.crud import Crud
+from src.db.engine import get_engine
+from src.db.tables import agent_activity
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "_export_state.json"
+PARTITION_KEY = "event_date"
+
+_activity = Crud(agent_activity, use_connection=True)
+
+
+def _pyarrow():
+    """Import pyarrow lazily so the rest of the package works without it."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet export requires pyarrow: pip install 'jadecli-team-agents-sdk[export]'"
+        ) from exc
+    return pa, pc, pa_csv, pq
+
+
+def arrow_schema(table: sa.Table = agent_activity):
+    """Arrow schema for a table's columns (UUIDs as strings, timestamps in UTC)."""
+    pa, _, _, _ = _pyarrow()
+    fields = []
+    for col in table.columns:
+        if isinstance(col.type, sa.DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC")
+        elif isinstance(col.type, sa.Integer):
+            arrow_type = pa.int64() if isinstance(col.type, sa.BigInteger) else pa.int32()
+        elif isinstance(col.type, sa.Float):
+            arrow_type = pa.float64()
+        elif isinstance(col.type, sa.LargeBinary):
+            arrow_type = pa.binary()
+        else:  # UUID, String, Text
+            arrow_type = pa.string()
+        # Always nullable: the CSV reader cannot produce non-null fields.
+        fields.append(pa.field(col.name, arrow_type))
+    return pa.schema(fields)
+
+
+def load_state(dest: str | Path) -> dict[str, Any]:
+    """Saved export state: watermark `last_created_at`/`last_id` plus running totals."""
+    path = Path(dest) / STATE_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _save_state(dest: Path, state: dict[str, Any]) -> None:
+    tmp = dest / f".{STATE_FILE}.tmp"
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, dest / STATE_FILE)
+
+
+def _copy_sql(columns: list[str], resume: bool) -> str:
+    """COPY source query; $1 = cutoff, $2/$3 = watermark when resuming."""
+    cols = ", ".join(f'"{c}"' for c in columns)
+    where = "created_at < $1"
+    if resume:
+        where += " AND (created_at, id) > ($2, $3)"
+    return f"SELECT {cols} FROM agent_activity WHERE {where} ORDER BY created_at, id"
+
+
+class _PartitionWriter:
+    """One ParquetWriter per event_date partition, renamed into place on close."""
+
+    def __init__(self, dest: Path, schema, run_id: str, compression: str) -> None:
+        self.dest = dest
+        self.schema = schema
+        self.run_id = run_id
+        self.compression = compression
+        self.rows = 0
+        self._writers: dict[str, tuple[Any, Path, Path]] = {}
+
+    def write(self, batch) -> None:
+        _, pc, _, pq = _pyarrow()
+        if batch.num_rows == 0:
+            return
+        dates = pc.strftime(batch.column("event_at"), format="%Y-%m-%d")
+        for date in pc.unique(dates).to_pylist():
+            part = batch.filter(pc.equal(dates, date))
+            entry = self._writers.get(date)
+            if entry is None:
+                folder = self.dest / f"{PARTITION_KEY}={date}"
+                folder.mkdir(parents=True, exist_ok=True)
+                final = folder / f"part-{self.run_id}.parquet"
+                tmp = folder / f".{final.name}.inprogress"
+                writer = pq.ParquetWriter(str(tmp), self.schema, compression=self.compression)
+                entry = self._writers[date] = (writer, tmp, final)
+            entry[0].write_batch(part)
+        self.rows += batch.num_rows
+
+    def close(self) -> list[str]:
+        files = []
+        for writer, tmp, final in self._writers.values():
+            writer.close()
+            os.replace(tmp, final)
+            files.append(str(final))
+        self._writers.clear()
+        return sorted(files)
+
+    def abort(self) -> None:
+        for writer, tmp, _ in self._writers.values():
+            writer.close()
+            tmp.unlink(missing_ok=True)
+        self._writers.clear()
+
+
+async def _copy_batches(driver, columns, cursor, cutoff, schema, block_size):
+    """COPY the new rows to a CSV spool file and yield Arrow record batches from it."""
+    _, _, pa_csv, _ = _pyarrow()
+    args: list[Any] = [cutoff]
+    if cursor is not None:
+        args += [cursor[0], cursor[1]]
+    with tempfile.TemporaryFile() as spool:
+
+        async def sink(chunk: bytes) -> None:
+            spool.write(chunk)
+
+        await driver.copy_from_query(
+            _copy_sql(columns, cursor is not None), *args, output=sink, format="csv"
+        )
+        if spool.tell() == 0:
+            return  # no new rows; pyarrow rejects an empty CSV
+        spool.seek(0)
+        reader = pa_csv.open_csv(
+            spool,
+            read_options=pa_csv.ReadOptions(column_names=columns, block_size=block_size),
+            # Summaries keep raw newlines; without this a quoted newline that
+            # straddles a block boundary desyncs the chunker.
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            # COPY CSV writes NULL unquoted and '' quoted; keep them apart.
+            convert_options=pa_csv.ConvertOptions(
+                column_types=schema,
+                null_values=[""],
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        for batch in reader:
+            yield batch
+
+
+async def export_activity(
+    dest: str | Path,
+    *,
+    full: bool = False,
+    batch_rows: int = 65_536,
+    lag: timedelta = timedelta(seconds=30),
+    now: datetime | None = None,
+    use_copy: bool = True,
+    compression: str = "zstd",
+) -> dict[str, Any]:
+    """Export agent_activity rows inserted since the last run to Parquet under `dest`.
+
+    Args:
+        dest: Dataset root directory (created if missing).
+        full: Ignore the saved watermark and export everything (into an
+            empty `dest`; existing part files are not removed).
+        batch_rows: Rows per record batch on the cursor path (COPY batches are
+            sized by bytes, ~batch_rows * 256).
+        lag: Skip rows inserted in the last `lag`, so in-flight transactions
+            that commit late are not skipped by the watermark.
+        now: Override the clock (tests).
+        use_copy: Set False to force the server-side cursor path.
+        compression: Parquet codec.
+
+    Returns:
+        Dict with rows, files, watermark, and dest.
+    """
+    pa, _, _, _ = _pyarrow()
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    state = {} if full else load_state(dest)
+    cursor = None
+    if state.get("last_created_at"):
+        cursor = (datetime.fromisoformat(state["last_created_at"]), uuid.UUID(state["last_id"]))
+    cutoff = (now or datetime.now(UTC)) - lag
+    schema = arrow_schema()
+    columns = schema.names
+    run_id = f"{cutoff:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    out = _PartitionWriter(dest, schema, run_id, compression)
+    last: tuple[Any, Any] | None = None
+
+    try:
+        async with get_engine().begin() as conn:
+            await conn.execute(sa.text("SET LOCAL TIME ZONE 'UTC'"))
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            copied = use_copy and hasattr(driver, "copy_from_query")
+            if copied:
+                async for batch in _copy_batches(
+                    driver, columns, cursor, cutoff, schema, batch_rows * 256
+                ):
+                    out.write(batch)
+                    if batch.num_rows:
+                        last = (batch.column("created_at")[-1], batch.column("id")[-1])
+
+        if not copied:
+            logger.debug("COPY unavailable, exporting via server-side cursor")
+            async for rows in _activity.iter(
+                batch_size=batch_rows,
+                order_by="+created_at",
+                stream=True,
+                after=cursor,
+                where=[agent_activity.c.created_at < cutoff],
+            ):
+                for row in rows:
+                    row["id"] = str(row["id"])
+                    for key in ("task_id", "subtask_id"):
+                        if row[key] is not None:
+                            row[key] = str(row[key])
+                out.write(pa.RecordBatch.from_pylist(rows, schema=schema))
+                last = (rows[-1]["created_at"], rows[-1]["id"])
+    except BaseException:
+        out.abort()
+        raise
+
+    files = out.close()
+    if last is not None:
+        created_at, last_id = (v.as_py() if hasattr(v, "as_py") else v for v in last)
+        state = {
+            "last_created_at": created_at.isoformat(),
+            "last_id": str(last_id),
+            "rows_exported": state.get("rows_exported", 0) + out.rows,
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+        _save_state(dest, state)
+        logger.info("Exported %d agent_activity rows to %d files", out.rows, len(files))
+    return {
+        "dest": str(dest),
+        "rows": out.rows,
+        "files": files,
+        "watermark": [state.get("last_created_at"), state.get("last_id")],
+    }
@@ -0,0 +1,166 @@
+"""Dashboard queries over activity_rollup_hourly (latency percentiles, cost).
+
+depends_on:
+  - src/analytics/rollup.py
+  - src/analytics/sketch.py
+  - src/db/engine.py
+  - src/db/tables.py
+depended_by:
+  - src/analytics/__init__.py
+  - tests/test_analytics.py
+semver: minor
+
+Usage:
+    from src.analytics.query import agent_cost, query_rollups, tool_latency
+
+    # p50/p95/p99 latency per agent and tool, per hour
+    rows = await tool_latency(start, end)
+    # [{"period_start": datetime(2026, 10, 17, 13, tzinfo=UTC), "agent_name": "reviewer",
+    #   "tool_name": "Read", "event_count": 412, "avg_ms": 38.1, "p95_ms": 122.4, ...}]
+
+    # cost per agent per day
+    rows = await agent_cost(start, end)
+
+    # anything else: choose grouping, granularity, filters, quantiles
+    rows = await query_rollups(
+        start, end, granularity="day", group_by=["tool_name"], agent_name="reviewer"
+    )
+
+Reads one row per (hour, agent, tool, event) in the range, then merges buckets
+in Python: counts and sums add, and latency sketches merge, so percentiles over
+a day or across agents are as accurate as hourly ones (1% relative error).
+Hours are UTC; `start` is rounded down to its hour. Rows in the current hour
+only include events up to the last rollup run.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+import sqlalchemy as sa
+
+from src.analytics.rollup import Bucket, floor_hour
+from src.db.engine import get_engine
+from src.db.tables import activity_rollup_hourly
+
+DIMENSIONS = ("agent_name", "tool_name", "hook_event")
+GRANULARITIES = ("hour", "day", None)
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _period(bucket_start: datetime, granularity: str | None) -> datetime | None:
+    if granularity == "day":
+        return bucket_start.replace(hour=0)
+    if granularity == "hour":
+        return bucket_start
+    return None
+
+
+def _quantile_key(q: float) -> str:
+    return f"p{q * 100:g}_ms"
+
+
+async def query_rollups(
+    start: datetime,
+    end: datetime,
+    *,
+    granularity: str | None = "hour",
+    group_by: Sequence[str] = ("agent_name", "tool_name"),
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    **filters: Any,
+) -> list[dict[str, Any]]:
+    """Aggregate rollup buckets in [start, end) by period and `group_by` columns.
+
+    Args:
+        start: Range start (rounded down to the UTC hour).
+        end: Range end, exclusive.
+        granularity: "hour", "day", or None for one row per group over the range.
+        group_by: Subset of agent_name, tool_name, hook_event.
+        quantiles: Latency quantiles to report, as `p<100q>_ms` keys.
+        **filters: Equality filters on agent_name, tool_name (None = tool-less
+            events), hook_event.
+
+    Returns:
+        Rows sorted by period then group, each with period_start, the group
+        columns, event_count, duration_count, avg_ms, min_ms, max_ms, the
+        quantile keys, and cost_usd.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'. Expected hour, day or None")
+    unknown = [c for c in (*group_by, *filters) if c not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown rollup dimension(s) {unknown}. Expected {list(DIMENSIONS)}")
+
+    c = activity_rollup_hourly.c
+    query = sa.select(activity_rollup_hourly).where(
+        c.bucket_start >= floor_hour(start), c.bucket_start < end
+    )
+    for col, value in filters.items():
+        query = query.where(getattr(c, col) == ("" if value is None else value))
+
+    async with get_engine().connect() as conn:
+        result = await conn.execute(query)
+        rows = result.mappings().all()
+
+    groups: dict[tuple, Bucket] = {}
+    for row in rows:
+        key = (_period(row["bucket_start"], granularity), *(row[g] for g in group_by))
+        bucket = Bucket.from_row(row)
+        if key in groups:
+            groups[key].merge(bucket)
+        else:
+            groups[key] = bucket
+
+    out = []
+    for key in sorted(groups, key=lambda k: tuple("" if v is None else v for v in k)):
+        bucket = groups[key]
+        record: dict[str, Any] = {"period_start": key[0]}
+        for col, value in zip(group_by, key[1:]):
+            record[col] = None if col == "tool_name" and value == "" else value
+        record.update(
+            event_count=bucket.event_count,
+            duration_count=bucket.duration_count,
+            avg_ms=bucket.avg_ms,
+            min_ms=bucket.duration_min_ms,
+            max_ms=bucket.duration_max_ms,
+        )
+        for q in quantiles:
+            record[_quantile_key(q)] = bucket.sketch.quantile(q)
+        record["cost_usd"] = bucket.cost_usd_sum
+        out.append(record)
+    return out
+
+
+async def tool_latency(
+    start: datetime,
+    end: datetime,
+    *,
+    granularity: str | None = "hour",
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    **filters: Any,
+) -> list[dict[str, Any]]:
+    """Latency percentiles per agent and tool (PostToolUse events carry durations)."""
+    filters.setdefault("hook_event", "PostToolUse")
+    return await query_rollups(
+        start,
+        end,
+        granularity=granularity,
+        group_by=("agent_name", "tool_name"),
+        quantiles=quantiles,
+        **filters,
+    )
+
+
+async def agent_cost(
+    start: datetime,
+    end: datetime,
+    *,
+    granularity: str | None = "day",
+    **filters: Any,
+) -> list[dict[str, Any]]:
+    """Cost and event counts per agent (default: per day)."""
+    return await query_rollups(
+        start, end, granularity=granularity, group_by=("agent_name",), quantiles=(), **filters
+    )
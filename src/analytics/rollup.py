@@ -0,0 +1,269 @@
+"""Incremental hourly rollup of agent_activity into activity_rollup_hourly.
+
+depends_on:
+  - src/analytics/sketch.py
+  - src/db/crud.py
+  - src/db/engine.py
+  - src/db/tables.py
+depended_by:
+  - src/analytics/query.py
+  - src/analytics/__init__.py
+  - scripts/run_rollups.py
+  - tests/test_analytics.py
+semver: minor
+
+Usage:
+    from src.analytics.rollup import run_rollup
+
+    report = await run_rollup()      # fold in every row since the last run
+    # {"name": "activity_rollup_hourly", "rows": 1834, "buckets": 41,
+    #  "watermark": (datetime(...), UUID(...))}
+
+Each run reads agent_activity rows past the watermark `(created_at, id)` stored
+in rollup_watermarks, in keyset order, and folds every batch into buckets keyed
+by (hour of event_at, agent_name, tool_name, hook_event). A batch's buckets and
+the advanced watermark are written in one transaction, so a crash never
+double-counts or skips rows, and concurrent runs fail fast instead of racing.
+
+Rows are bucketed by when the event happened (event_at) but discovered by when
+they were inserted (created_at): events buffered by the outbox or collector
+and written late still land in the right hour. Only rows older than `lag` are
+read, so transactions that were in flight at the cutoff have committed.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.analytics.sketch import LatencySketch
+from src.db.crud import MAX_BIND_PARAMS, Crud
+from src.db.engine import get_engine
+from src.db.tables import activity_rollup_hourly, agent_activity, rollup_watermarks
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "activity_rollup_hourly"
+KEY_COLUMNS = ("bucket_start", "agent_name", "tool_name", "hook_event")
+
+_SOURCE_COLUMNS = ["agent_name", "tool_name", "hook_event", "duration_ms", "cost_usd", "event_at"]
+_activity = Crud(agent_activity, use_connection=True)
+
+BucketKey = tuple[datetime, str, str, str]
+
+
+def floor_hour(at: datetime) -> datetime:
+    """Start of the UTC hour containing `at`."""
+    return at.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class Bucket:
+    """Aggregates for one (hour, agent, tool, event) key; mergeable."""
+
+    event_count: int = 0
+    duration_count: int = 0
+    duration_sum_ms: int = 0
+    duration_min_ms: int | None = None
+    duration_max_ms: int | None = None
+    cost_usd_sum: float = 0.0
+    sketch: LatencySketch = field(default_factory=LatencySketch)
+
+    @property
+    def avg_ms(self) -> float | None:
+        return self.duration_sum_ms / self.duration_count if self.duration_count else None
+
+    def add(self, duration_ms: int | None, cost_usd: float | None) -> None:
+        self.event_count += 1
+        if duration_ms is not None:
+            self.duration_count += 1
+            self.duration_sum_ms += duration_ms
+            self.duration_min_ms = _min(self.duration_min_ms, duration_ms)
+            self.duration_max_ms = _max(self.duration_max_ms, duration_ms)
+            self.sketch.add(max(duration_ms, 0))
+        if cost_usd:
+            self.cost_usd_sum += cost_usd
+
+    def merge(self, other: Bucket) -> None:
+        self.event_count += other.event_count
+        self.duration_count += other.duration_count
+        self.duration_sum_ms += other.duration_sum_ms
+        self.duration_min_ms = _min(self.duration_min_ms, other.duration_min_ms)
+        self.duration_max_ms = _max(self.duration_max_ms, other.duration_max_ms)
+        self.cost_usd_sum += other.cost_usd_sum
+        self.sketch.merge(other.sketch)
+
+    def to_row(self) -> dict[str, Any]:
+        """Aggregate columns of activity_rollup_hourly (without the key)."""
+        return {
+            "event_count": self.event_count,
+            "duration_count": self.duration_count,
+            "duration_sum_ms": self.duration_sum_ms,
+            "duration_min_ms": self.duration_min_ms,
+            "duration_max_ms": self.duration_max_ms,
+            "cost_usd_sum": self.cost_usd_sum,
+            "duration_sketch": self.sketch.to_bytes() if self.sketch.count else None,
+        }
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> Bucket:
+        return cls(
+            event_count=row["event_count"],
+            duration_count=row["duration_count"],
+            duration_sum_ms=row["duration_sum_ms"],
+            duration_min_ms=row["duration_min_ms"],
+            duration_max_ms=row["duration_max_ms"],
+            cost_usd_sum=row["cost_usd_sum"],
+            sketch=LatencySketch.from_bytes(row["duration_sketch"]),
+        )
+
+
+def _min(a: int | None, b: int | None) -> int | None:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max(a: int | None, b: int | None) -> int | None:
+    return b if a is None else a if b is None else max(a, b)
+
+
+def bucket_key(row: dict[str, Any]) -> BucketKey:
+    """Rollup key of an agent_activity row; a NULL tool_name becomes ''."""
+    return (
+        floor_hour(row["event_at"]),
+        row["agent_name"],
+        row["tool_name"] or "",
+        row["hook_event"],
+    )
+
+
+def aggregate(rows: Iterable[dict[str, Any]]) -> dict[BucketKey, Bucket]:
+    """Fold agent_activity rows into hourly buckets."""
+    buckets: dict[BucketKey, Bucket] = {}
+    for row in rows:
+        key = bucket_key(row)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = Bucket()
+        bucket.add(row.get("duration_ms"), row.get("cost_usd"))
+    return buckets
+
+
+async def load_watermark(name: str = ROLLUP_NAME) -> tuple[datetime, Any] | None:
+    """Saved `(created_at, id)` cursor of a rollup job, or None before its first run."""
+    async with get_engine().connect() as conn:
+        row = (
+            await conn.execute(
+                sa.select(rollup_watermarks.c.last_created_at, rollup_watermarks.c.last_id).where(
+                    rollup_watermarks.c.name == name
+                )
+            )
+        ).first()
+    if row is None or row[0] is None:
+        return None
+    return (row[0], row[1])
+
+
+async def _apply(
+    name: str,
+    buckets: dict[BucketKey, Bucket],
+    expected: tuple[datetime, Any] | None,
+    cursor: tuple[datetime, Any],
+    rows: int,
+) -> None:
+    """Merge `buckets` into the table and move the watermark, atomically."""
+    wm = rollup_watermarks.c
+    async with get_engine().begin() as conn:
+        await conn.execute(
+            pg_insert(rollup_watermarks)
+            .values(name=name)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        locked = (
+            await conn.execute(
+                sa.select(wm.last_created_at, wm.last_id).where(wm.name == name).with_for_update()
+            )
+        ).first()
+        current = (locked[0], locked[1]) if locked is not None and locked[0] is not None else None
+        if current != expected:
+            raise RuntimeError(f"Rollup '{name}' watermark moved concurrently; rerun the job")
+
+        rollup = activity_rollup_hourly.c
+        key_cols = [getattr(rollup, c) for c in KEY_COLUMNS]
+        keys = list(buckets)
+        size = MAX_BIND_PARAMS // len(KEY_COLUMNS)
+        for i in range(0, len(keys), size):
+            existing = await conn.execute(
+                sa.select(activity_rollup_hourly)
+                .where(sa.tuple_(*key_cols).in_(keys[i : i + size]))
+                .with_for_update()
+            )
+            for row in existing.mappings().all():
+                key = tuple(row[c] for c in KEY_COLUMNS)
+                merged = Bucket.from_row(row)
+                merged.merge(buckets[key])
+                buckets[key] = merged
+
+        # Chunked like Crud._insert_many: asyncpg allows 32767 bind parameters per statement.
+        values = [dict(zip(KEY_COLUMNS, key)) | b.to_row() for key, b in buckets.items()]
+        stmt = pg_insert(activity_rollup_hourly)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={c: stmt.excluded[c] for c in values[0] if c not in KEY_COLUMNS}
+            | {"updated_at": sa.func.now()},
+        )
+        size = MAX_BIND_PARAMS // len(values[0])
+        for i in range(0, len(values), size):
+            await conn.execute(stmt.values(values[i : i + size]))
+
+        await conn.execute(
+            sa.update(rollup_watermarks)
+            .where(wm.name == name)
+            .values(
+                last_created_at=cursor[0],
+                last_id=cursor[1],
+                rows_processed=wm.rows_processed + rows,
+                updated_at=sa.func.now(),
+            )
+        )
+
+
+async def run_rollup(
+    *,
+    batch_size: int = 5000,
+    lag: timedelta = timedelta(seconds=30),
+    now: datetime | None = None,
+    name: str = ROLLUP_NAME,
+) -> dict[str, Any]:
+    """Fold agent_activity rows inserted since the last run into hourly buckets.
+
+    Idempotent and resumable: each batch commits together with its watermark,
+    so rerunning after a failure continues from the last committed batch.
+    """
+    cutoff = (now or datetime.now(UTC)) - lag
+    cursor = await load_watermark(name)
+    scanned = 0
+    written = 0
+
+    async for batch in _activity.iter(
+        batch_size=batch_size,
+        order_by="+created_at",
+        columns=_SOURCE_COLUMNS,
+        after=cursor,
+        where=[agent_activity.c.created_at < cutoff],
+    ):
+        buckets = aggregate(batch)
+        new_cursor = (batch[-1]["created_at"], batch[-1]["id"])
+        await _apply(name, buckets, cursor, new_cursor, len(batch))
+        cursor = new_cursor
+        scanned += len(batch)
+        written += len(buckets)
+
+    if scanned:
+        logger.info("Rollup %s: folded %d rows into %d buckets", name, scanned, written)
+    return {"name": name, "rows": scanned, "buckets": written, "watermark": cursor}
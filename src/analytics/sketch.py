@@ -0,0 +1,215 @@
+"""Mergeable latency sketch with bounded relative error (DDSketch-style).
+
+depends_on: []
+depended_by:
+  - src/analytics/rollup.py
+  - src/analytics/query.py
+  - src/analytics/__init__.py
+  - src/hooks/latency.py
+  - tests/test_analytics.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    from src.analytics.sketch import LatencySketch
+
+    s = LatencySketch()            # 1% relative accuracy
+    for ms in durations:
+        s.add(ms)
+    s.quantile(0.95)               # within 1% of the true p95
+
+    merged = LatencySketch.from_bytes(a.to_bytes())   # BYTEA column payload
+    merged.merge(b)                # p95 of the union, no raw values needed
+
+Values are counted in logarithmic buckets: bucket i holds values in
+(gamma^(i-1), gamma^i] with gamma = (1 + a) / (1 - a), so any quantile is
+reported within relative error `a`. Buckets from different sketches with the
+same accuracy add together, which is what makes hourly buckets rollable into
+days, across agents, or across hosts.
+
+Memory is bounded by `max_bins`. At 1% accuracy, 2048 bins span values from
+1 to e^41 without loss, so real durations never reach the limit. Past it,
+the lowest bins are collapsed into one, and only the smallest quantiles lose
+accuracy.
+
+Binary layout (`to_bytes`), little-endian:
+    version u8 | relative_accuracy f64 | zero_count varint | bin count varint
+    | per bin, in key order: zigzag key delta varint, count varint
+A typical tool-latency sketch encodes to a few hundred bytes.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+from collections.abc import Iterable
+
+DEFAULT_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 2048
+_VERSION = 1
+_HEAD = struct.Struct("<Bd")
+
+
+class LatencySketch:
+    """Log-bucketed histogram of non-negative values supporting merge and quantile."""
+
+    __slots__ = (
+        "_log_gamma",
+        "bins",
+        "count",
+        "gamma",
+        "max_bins",
+        "relative_accuracy",
+        "zero_count",
+    )
+
+    def __init__(
+        self, relative_accuracy: float = DEFAULT_ACCURACY, max_bins: int = DEFAULT_MAX_BINS
+    ) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if max_bins < 2:
+            raise ValueError("max_bins must be >= 2")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Record `value` (e.g. a duration in ms) `count` times. Negative values raise."""
+        if value < 0:
+            raise ValueError("LatencySketch only accepts non-negative values")
+        if value == 0:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            if key in self.bins:
+                self.bins[key] += count
+            else:
+                self.bins[key] = count
+                if len(self.bins) > self.max_bins:
+                    self._collapse()
+        self.count += count
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: LatencySketch) -> None:
+        """Add another sketch's counts into this one. Accuracies must match."""
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    @classmethod
+    def merged(cls, sketches: Iterable[LatencySketch]) -> LatencySketch:
+        """New sketch holding the union of `sketches` (empty if there are none)."""
+        out: LatencySketch | None = None
+        for sketch in sketches:
+            if out is None:
+                out = cls(sketch.relative_accuracy, sketch.max_bins)
+            out.merge(sketch)
+        return out if out is not None else cls()
+
+    def _collapse(self) -> None:
+        # Fold the lowest bins into the smallest surviving one (DDSketch
+        # "collapsing lowest"): high quantiles stay exact to `relative_accuracy`.
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def quantile(self, q: float) -> float | None:
+        """Approximate q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint (in relative terms) of (gamma^(key-1), gamma^key]
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form (BYTEA column payload); see module docstring."""
+        out = bytearray(_HEAD.pack(_VERSION, self.relative_accuracy))
+        _put_varint(out, self.zero_count)
+        _put_varint(out, len(self.bins))
+        prev = 0
+        for key in sorted(self.bins):
+            _put_varint(out, _zigzag(key - prev))
+            _put_varint(out, self.bins[key])
+            prev = key
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | None, max_bins: int = DEFAULT_MAX_BINS) -> LatencySketch:
+        """Inverse of `to_bytes`; None/empty gives an empty default sketch."""
+        if not data:
+            return cls(max_bins=max_bins)
+        try:
+            version, accuracy = _HEAD.unpack_from(data)
+        except struct.error as exc:
+            raise ValueError("Truncated latency sketch") from exc
+        if version != _VERSION:
+            raise ValueError(f"Unsupported latency sketch version {version}")
+        sketch = cls(accuracy, max(max_bins, 2))
+        pos = _HEAD.size
+        sketch.zero_count, pos = _get_varint(data, pos)
+        n, pos = _get_varint(data, pos)
+        key = 0
+        for _ in range(n):
+            delta, pos = _get_varint(data, pos)
+            count, pos = _get_varint(data, pos)
+            key += _unzigzag(delta)
+            sketch.bins[key] = count
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        if len(sketch.bins) > sketch.max_bins:
+            sketch._collapse()
+        return sketch
+
+
+def _zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated latency sketch")
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
@@ -1,17 +1,35 @@
 """Database layer: engine, tables, and CRUD utilities."""
 
-from src.db.crud import Crud
-from src.db.engine import get_engine, get_session_factory, dispose_engine
-from src.db.tables import metadata, tasks, subtasks, task_dependencies, agent_activity
+from src.db.bulk import bulk_copy, bulk_copy_activity
+from src.db.crud import Crud, CrudLoader
+from src.db.engine import dispose_engine, get_engine, get_pool_stats, get_session_factory
+from src.db.partitions import PartitionSpec, maintain_partitions
+from src.db.tables import (
+    activity_rollup_hourly,
+    agent_activity,
+    metadata,
+    rollup_watermarks,
+    subtasks,
+    task_dependencies,
+    tasks,
+)
 
 __all__ = [
     "Crud",
+    "CrudLoader",
+    "bulk_copy",
+    "bulk_copy_activity",
     "get_engine",
+    "get_pool_stats",
     "get_session_factory",
     "dispose_engine",
+    "PartitionSpec",
+    "maintain_partitions",
     "metadata",
     "tasks",
     "subtasks",
     "task_dependencies",
     "agent_activity",
+    "activity_rollup_hourly",
+    "rollup_watermarks",
 ]
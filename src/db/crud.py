@@ -5,21 +5,45 @@ depends_on:
 depended_by:
   - src/db/__init__.py
   - src/hooks/cost_tracker.py
+  - src/hooks/activity_writer.py
+  - src/analytics/rollup.py
+  - src/analytics/export.py
+  - src/graph/dag.py
+  - src/graph/scheduler.py
   - tests/test_crud.py
+  - benchmarks/bench_session_overhead.py
 semver: minor
 
 Usage:
     from src.db.crud import Crud
-    from src.db.tables import tasks
+    from src.db.tables import agent_activity, tasks
 
     task_crud = Crud(tasks)
 
     # Create
     row = await task_crud.create(title="Review auth", priority="high")
+    rows = await task_crud.create_many([{"title": "A"}, {"title": "B"}])
+    await task_crud.upsert_many(rows, conflict_cols=["id"], update_cols=["title"], returning=False)
 
     # Read
     task = await task_crud.get(some_uuid)
+    by_id = await task_crud.get_many([id_a, id_b])  # one WHERE id = ANY(:ids) query
+
+    # Coalesce concurrent get()s from one request/job into a single query
+    loader = task_crud.loader()
+    a, b = await asyncio.gather(loader.load(id_a), loader.load(id_b))
     all_pending = await task_crud.find(status="pending")
+    titles = await task_crud.find(columns=["id", "title"], status="pending")  # projection
+
+    # Stream a whole table in constant memory (keyset pages of 500 rows)
+    async for batch in Crud(agent_activity).iter(order_by="+event_at", agent_name="reviewer"):
+        ...
+
+    # Resume after a saved (created_at, id) cursor, with extra range conditions
+    async for batch in Crud(agent_activity).iter(
+        order_by="+created_at", after=(ts, last_id), where=[agent_activity.c.created_at < cutoff]
+    ):
+        ...
 
     # Update
     await task_crud.update(some_uuid, status="completed", completed_at=now)
@@ -29,17 +53,28 @@ Usage:
 
     # Atomic increment
     await task_crud.increment(some_uuid, "actual_cost_usd", 0.05)
+    await task_crud.increment_many("actual_cost_usd", {id_a: 0.05, id_b: 0.10})
+
+    # Connection-level path: skips the ORM AsyncSession for Core-only hot paths
+    fast_crud = Crud(tasks, use_connection=True)
 """
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from contextlib import asynccontextmanager
 from typing import Any
 from uuid import UUID
 
 import sqlalchemy as sa
 from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+
+from src.db.engine import get_engine, get_session_factory
 
-from src.db.engine import get_session_factory
+# Postgres wire protocol limit on bind parameters per statement.
+MAX_BIND_PARAMS = 32767
 
 
 class Crud:
@@ -47,45 +82,158 @@ class Crud:
 
     All methods use the async session factory from engine.py.
     Each method opens and closes its own session (request-scoped).
+
+    With `use_connection=True`, methods run on a pooled AsyncConnection from
+    the engine instead. Every statement here is Core, so the ORM session (identity
+    map, unit of work, event dispatch) is pure overhead on hot paths.
     """
 
-    def __init__(self, table: Table) -> None:
+    def __init__(self, table: Table, *, use_connection: bool = False) -> None:
         self.table = table
+        self.use_connection = use_connection
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[Any]:
+        """Yield an AsyncConnection or AsyncSession; both expose execute/commit."""
+        if self.use_connection:
+            async with get_engine().connect() as conn:
+                yield conn
+        else:
+            factory = get_session_factory()
+            async with factory() as session:
+                yield session
 
     async def create(self, **values: Any) -> dict:
         """Insert a row and return it as a dict."""
-        factory = get_session_factory()
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(
                 sa.insert(self.table).values(**values).returning(self.table)
             )
             await session.commit()
             return dict(result.mappings().first())
 
-    async def get(self, id: UUID) -> dict | None:
-        """Get a single row by primary key."""
-        factory = get_session_factory()
-        async with factory() as session:
-            result = await session.execute(sa.select(self.table).where(self.table.c.id == id))
+    async def create_many(
+        self,
+        rows: Iterable[dict],
+        *,
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict]:
+        """Insert many rows with one multi-row INSERT per chunk, in a single transaction.
+
+        Args:
+            rows: Column dicts; every row must have the same keys.
+            chunk_size: Max rows per statement. Always capped so a chunk stays under
+                Postgres' 32767 bind-parameter limit.
+            returning: Set False to skip RETURNING when the rows aren't needed
+                (returns an empty list).
+        """
+        return await self._insert_many(postgresql.insert(self.table), rows, chunk_size, returning)
+
+    async def upsert_many(
+        self,
+        rows: Iterable[dict],
+        *,
+        conflict_cols: Sequence[str] = ("id",),
+        update_cols: Sequence[str] | None = None,
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict]:
+        """INSERT ... ON CONFLICT (conflict_cols) DO UPDATE, chunked like create_many.
+
+        Args:
+            conflict_cols: Columns of the unique index/constraint to conflict on.
+            update_cols: Columns to overwrite from the incoming row. Defaults to every
+                non-conflict column present in the rows; pass [] for DO NOTHING
+                (RETURNING then yields only the rows actually inserted).
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        if update_cols is None:
+            update_cols = [c for c in rows[0] if c not in conflict_cols]
+        stmt = postgresql.insert(self.table)
+        if update_cols:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_cols),
+                set_={c: stmt.excluded[c] for c in update_cols},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_cols))
+        return await self._insert_many(stmt, rows, chunk_size, returning)
+
+    async def _insert_many(
+        self, stmt: Any, rows: Iterable[dict], chunk_size: int | None, returning: bool
+    ) -> list[dict]:
+        rows = list(rows)
+        if not rows:
+            return []
+        keys = rows[0].keys()
+        for row in rows:
+            if row.keys() != keys:
+                raise ValueError(f"All rows must have the same columns as the first: {list(keys)}")
+        max_rows = max(1, MAX_BIND_PARAMS // max(1, len(keys)))
+        size = min(chunk_size or max_rows, max_rows)
+        if returning:
+            stmt = stmt.returning(self.table)
+
+        out: list[dict] = []
+        async with self._connect() as session:
+            for i in range(0, len(rows), size):
+                result = await session.execute(stmt.values(rows[i : i + size]))
+                if returning:
+                    out.extend(dict(row) for row in result.mappings().all())
+            await session.commit()
+        return out
+
+    async def get(self, id: UUID, *, columns: Sequence[str] | None = None) -> dict | None:
+        """Get a single row by primary key, optionally only the named columns."""
+        query = self._select(columns).where(self.table.c.id == id)
+        async with self._connect() as session:
+            result = await session.execute(query)
             row = result.mappings().first()
             return dict(row) if row else None
 
+    async def get_many(
+        self, ids: Iterable[UUID], *, columns: Sequence[str] | None = None
+    ) -> dict[UUID, dict]:
+        """Get many rows by primary key with a single `WHERE id = ANY(:ids)` query.
+
+        The ids travel as one array parameter, so the statement text is the same
+        for any number of ids. Returns {id: row}; ids with no row are absent.
+        With `columns`, only those columns are selected (`id` is always included).
+        """
+        unique = list(dict.fromkeys(ids))
+        if not unique:
+            return {}
+        id_col = self.table.c.id
+        ids_param = sa.bindparam("ids", unique, type_=postgresql.ARRAY(id_col.type))
+        query = self._select(columns, "id").where(id_col == sa.any_(ids_param))
+        async with self._connect() as session:
+            result = await session.execute(query)
+            return {row["id"]: dict(row) for row in result.mappings().all()}
+
+    def loader(self, *, max_batch: int = 1000) -> CrudLoader:
+        """Create a CrudLoader that batches concurrent lookups on this table."""
+        return CrudLoader(self, max_batch=max_batch)
+
     async def find(
-        self, *, limit: int = 100, order_by: str = "created_at", **filters: Any
+        self,
+        *,
+        limit: int = 100,
+        order_by: str = "created_at",
+        columns: Sequence[str] | None = None,
+        **filters: Any,
     ) -> list[dict]:
         """Find rows matching column filters.
 
         Args:
             limit: Max rows to return.
             order_by: Column name to sort by (descending). Prefix with "+" for ascending.
+            columns: Only select these columns (default: the whole row).
             **filters: Column=value equality filters.
         """
-        factory = get_session_factory()
-        query = sa.select(self.table)
-
-        for col_name, value in filters.items():
-            if hasattr(self.table.c, col_name):
-                query = query.where(getattr(self.table.c, col_name) == value)
+        query = self._apply_filters(self._select(columns), filters)
 
         # Order
         ascending = order_by.startswith("+")
@@ -96,14 +244,87 @@ class Crud:
 
         query = query.limit(limit)
 
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(query)
             return [dict(row) for row in result.mappings().all()]
 
+    async def iter(
+        self,
+        *,
+        batch_size: int = 500,
+        order_by: str = "created_at",
+        stream: bool = False,
+        columns: Sequence[str] | None = None,
+        after: tuple[Any, Any] | None = None,
+        where: Iterable[sa.ColumnElement[bool]] = (),
+        **filters: Any,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield every row matching column filters, in batches, with constant memory.
+
+        By default pages by keyset on (order column, id): each batch is its own short
+        query `WHERE (col, id) > (:last_col, :last_id) ... LIMIT batch_size`, so no
+        OFFSET scans and no transaction held open between batches. The order column
+        should be NOT NULL (created_at, event_at), since NULLs never compare.
+
+        With `stream=True` a single query runs over a server-side cursor instead,
+        fetching `batch_size` rows at a time; one connection stays checked out for
+        the whole scan.
+
+        Args:
+            batch_size: Rows per yielded batch.
+            order_by: Column name to sort by (descending). Prefix with "+" for ascending.
+            stream: Use a server-side cursor instead of keyset pages.
+            columns: Only select these columns. The order column and `id` are
+                always included because they form the keyset cursor.
+            after: Resume cursor `(order value, id)`, exclusive: e.g. the last row
+                of a previous scan, so incremental jobs read only newer rows.
+            where: Extra SQLAlchemy conditions ANDed into the query (ranges etc.).
+            **filters: Column=value equality filters.
+        """
+        ascending = order_by.startswith("+")
+        col_name = order_by.lstrip("+")
+        if not hasattr(self.table.c, col_name):
+            raise ValueError(f"Unknown order_by column for {self.table.name}: {col_name}")
+        col = getattr(self.table.c, col_name)
+        id_col = self.table.c.id
+        base = self._apply_filters(self._select(columns, col_name, "id"), filters)
+        for clause in where:
+            base = base.where(clause)
+        if ascending:
+            base = base.order_by(col.asc(), id_col.asc())
+        else:
+            base = base.order_by(col.desc(), id_col.desc())
+
+        def page(last: tuple[Any, Any] | None) -> sa.Select:
+            if last is None:
+                return base
+            key = sa.tuple_(col, id_col)
+            bound = sa.tuple_(sa.literal(last[0], col.type), sa.literal(last[1], id_col.type))
+            return base.where(key > bound if ascending else key < bound)
+
+        if stream:
+            async with self._connect() as session:
+                query = page(after).execution_options(yield_per=batch_size)
+                result = await session.stream(query)
+                async for part in result.mappings().partitions(batch_size):
+                    yield [dict(row) for row in part]
+            return
+
+        last = after
+        while True:
+            async with self._connect() as session:
+                result = await session.execute(page(last).limit(batch_size))
+                batch = [dict(row) for row in result.mappings().all()]
+            if not batch:
+                return
+            yield batch
+            if len(batch) < batch_size:
+                return
+            last = (batch[-1][col_name], batch[-1]["id"])
+
     async def update(self, id: UUID, **values: Any) -> dict | None:
         """Update a row by primary key and return it."""
-        factory = get_session_factory()
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(
                 sa.update(self.table)
                 .where(self.table.c.id == id)
@@ -116,8 +337,7 @@ class Crud:
 
     async def delete(self, id: UUID) -> bool:
         """Delete a row by primary key. Returns True if deleted."""
-        factory = get_session_factory()
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(sa.delete(self.table).where(self.table.c.id == id))
             await session.commit()
             return result.rowcount > 0
@@ -125,8 +345,7 @@ class Crud:
     async def increment(self, id: UUID, column: str, amount: float | int) -> dict | None:
         """Atomically increment a numeric column."""
         col = getattr(self.table.c, column)
-        factory = get_session_factory()
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(
                 sa.update(self.table)
                 .where(self.table.c.id == id)
@@ -137,21 +356,125 @@ class Crud:
             row = result.mappings().first()
             return dict(row) if row else None
 
+    async def increment_many(self, column: str, deltas: Mapping[UUID, float | int]) -> int:
+        """Atomically add a per-row amount to a numeric column, one statement per chunk.
+
+        Runs `UPDATE t SET col = t.col + v.amount FROM (VALUES ...) AS v(id, amount)
+        WHERE t.id = v.id`, so N rows cost one round trip. Returns rows updated.
+        """
+        if not deltas:
+            return 0
+        col = getattr(self.table.c, column)
+        id_col = self.table.c.id
+        items = list(deltas.items())
+        size = MAX_BIND_PARAMS // 2
+        updated = 0
+        async with self._connect() as session:
+            for i in range(0, len(items), size):
+                v = sa.values(
+                    sa.column("id", id_col.type), sa.column("amount", col.type), name="v"
+                ).data(items[i : i + size])
+                result = await session.execute(
+                    sa.update(self.table).where(id_col == v.c.id).values({column: col + v.c.amount})
+                )
+                updated += result.rowcount
+            await session.commit()
+        return updated
+
     async def count(self, **filters: Any) -> int:
         """Count rows matching filters."""
-        factory = get_session_factory()
-        query = sa.select(sa.func.count()).select_from(self.table)
-        for col_name, value in filters.items():
-            if hasattr(self.table.c, col_name):
-                query = query.where(getattr(self.table.c, col_name) == value)
+        query = self._apply_filters(sa.select(sa.func.count()).select_from(self.table), filters)
 
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(query)
             return result.scalar() or 0
 
+    def _select(self, columns: Sequence[str] | None, *required: str) -> sa.Select:
+        """SELECT the named columns (plus `required` ones), or the whole row if None.
+
+        Unlike filters, unknown column names raise: silently dropping a projected
+        column would hand callers rows with missing keys.
+        """
+        if columns is None:
+            return sa.select(self.table)
+        names = list(dict.fromkeys([*columns, *required]))
+        unknown = [name for name in names if name not in self.table.c]
+        if unknown:
+            raise ValueError(f"Unknown columns for {self.table.name}: {unknown}")
+        return sa.select(*(self.table.c[name] for name in names))
+
+    def _apply_filters(self, query: Any, filters: dict[str, Any]) -> Any:
+        """Add Column=value equality filters, skipping names that aren't columns."""
+        for col_name, value in filters.items():
+            if hasattr(self.table.c, col_name):
+                query = query.where(getattr(self.table.c, col_name) == value)
+        return query
+
     async def exists(self, id: UUID) -> bool:
         """Check if a row exists."""
-        factory = get_session_factory()
-        async with factory() as session:
+        async with self._connect() as session:
             result = await session.execute(sa.select(sa.literal(1)).where(self.table.c.id == id))
             return result.first() is not None
+
+
+class CrudLoader:
+    """Coalesces concurrent primary-key lookups into one Crud.get_many() query.
+
+    Every load() issued before the event loop gets back to its scheduled callbacks
+    (e.g. calls fanned out with asyncio.gather) is answered by a single query, so
+    an N+1 access pattern costs one round trip. Results are memoized for the
+    loader's lifetime: create one per request or job, not one per process.
+    """
+
+    def __init__(self, crud: Crud, *, max_batch: int = 1000) -> None:
+        self.crud = crud
+        self.max_batch = max_batch
+        self._futures: dict[UUID, asyncio.Future] = {}
+        self._queue: list[tuple[UUID, asyncio.Future]] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, id: UUID) -> asyncio.Future:
+        """Return an awaitable resolving to the row dict, or None if missing."""
+        fut = self._futures.get(id)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._futures[id] = fut
+            self._queue.append((id, fut))
+            if len(self._queue) == 1:
+                loop.call_soon(self._dispatch)
+        return fut
+
+    async def load_many(self, ids: Iterable[UUID]) -> list[dict | None]:
+        """Load several ids; results are in the same order as `ids`."""
+        return list(await asyncio.gather(*(self.load(i) for i in ids)))
+
+    def clear(self, id: UUID | None = None) -> None:
+        """Forget a memoized row (or all of them) so the next load re-queries."""
+        if id is None:
+            self._futures.clear()
+        else:
+            self._futures.pop(id, None)
+
+    def _dispatch(self) -> None:
+        queued, self._queue = self._queue, []
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(queued), self.max_batch):
+            task = loop.create_task(self._fetch(queued[i : i + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, queued: list[tuple[UUID, asyncio.Future]]) -> None:
+        try:
+            rows = await self.crud.get_many(id for id, _ in queued)
+        except Exception as exc:  # noqa: BLE001 - re-raised in every waiting load()
+            for id, fut in queued:
+                # Don't memoize failures; the next load() retries.
+                if self._futures.get(id) is fut:
+                    del self._futures[id]
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for id, fut in queued:
+            if not fut.done():
+                fut.set_result(rows.get(id))
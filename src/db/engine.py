@@ -2,21 +2,36 @@
 
 depends_on:
   - src/get_env.py
+  - src/db/pool.py
 depended_by:
   - src/db/crud.py
+  - src/db/bulk.py
+  - src/db/partitions.py
   - src/db/__init__.py
   - src/hooks/activity_tracker.py
+  - src/analytics/rollup.py
+  - src/analytics/query.py
+  - src/analytics/export.py
+  - tests/test_engine.py
 semver: major
+
+Pool sizing comes from a named profile (PRJ_DB_POOL_PROFILE: api, hook-writer,
+batch) with per-key env overrides; see src/db/pool.py.
 """
 
 from __future__ import annotations
 
+from typing import Any
+
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from src.db.pool import InstrumentedAsyncPool, pool_settings
 from src.get_env import env
 
 _engine: AsyncEngine | None = None
+_engine_profile: str | None = None
+_session_factory: sessionmaker | None = None
 
 
 def _normalize_url(url: str) -> str:
@@ -29,32 +44,42 @@ def _normalize_url(url: str) -> str:
 
 
 def get_engine() -> AsyncEngine:
-    """Get or create the async engine singleton."""
-    global _engine
+    """Get or create the async engine singleton, using the configured pool profile."""
+    global _engine, _engine_profile
     if _engine is None:
         url = _normalize_url(env("PRJ_NEON_DATABASE_URL"))
-        _engine = create_async_engine(
-            url,
-            pool_pre_ping=True,
-            pool_recycle=600,
-            pool_size=5,
-            max_overflow=2,
-        )
+        _engine_profile, settings = pool_settings()
+        _engine = create_async_engine(url, poolclass=InstrumentedAsyncPool, **settings)
     return _engine
 
 
+def get_pool_stats() -> dict[str, Any] | None:
+    """Pool counters for the engine singleton, or None if no engine exists yet."""
+    if _engine is None or not isinstance(_engine.pool, InstrumentedAsyncPool):
+        return None
+    return {"profile": _engine_profile, **_engine.pool.stats()}
+
+
 def get_session_factory() -> sessionmaker:
-    """Get an async session factory bound to the engine."""
-    return sessionmaker(
-        get_engine(),
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
+    """Get the async session factory bound to the engine.
+
+    Built once per engine and cached; dispose_engine() resets it.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _session_factory
 
 
 async def dispose_engine() -> None:
-    """Dispose the engine and reset the singleton."""
-    global _engine
+    """Dispose the engine and reset the engine and session factory singletons."""
+    global _engine, _engine_profile, _session_factory
+    _session_factory = None
+    _engine_profile = None
     if _engine is not None:
         await _engine.dispose()
         _engine = None
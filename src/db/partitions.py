@@ -0,0 +1,254 @@
+"""Range-partition maintenance for time-partitioned tables (agent_activity).
+
+depends_on:
+  - src/db/engine.py
+  - src/db/tables.py
+depended_by:
+  - src/db/__init__.py
+  - scripts/maintain_partitions.py
+  - tests/test_partitions.py
+semver: minor
+
+Usage:
+    from src.db.partitions import maintain_partitions
+
+    report = await maintain_partitions()              # agent_activity, now
+    report = await maintain_partitions(dry_run=True)  # only report planned DDL
+    # {"table": "agent_activity", "created": ["agent_activity_p202611", ...],
+    #  "expired": [], "moved": {}, "default_rows": 0, "statements": [...]}
+
+The partitioning spec comes from `Table.info["partitioning"]`, which mirrors the
+`partitioning` block in semantic/<table>.yaml:
+
+    column   partition key (timestamptz)      interval  "day" | "month"
+    premake  future partitions kept ready     retain    past partitions kept (None = all)
+    expire   "detach" (default) | "drop"
+
+Partitions are named `<table>_pYYYYMM` (monthly) or `<table>_pYYYYMMDD` (daily)
+and bounded in UTC. Nothing expires unless `retain` is set. Expiry is DETACH
+PARTITION, metadata-only and O(1) regardless of row count, unlike DELETE. The
+detached table stays behind for archiving (e.g. export, then drop by hand).
+Dropping it in the same run is opt-in with expire "drop".
+
+Run it at least once per interval (cron / CI schedule) so a partition always
+exists ahead of incoming rows. Rows outside every partition land in
+`<table>_default`; a non-zero `default_rows` means maintenance fell behind.
+Postgres refuses to create a partition while the default partition holds rows
+in its range, so those rows are moved out through a temporary table, the
+partition is created, and the rows are inserted back (reported in `moved`).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import sqlalchemy as sa
+
+from src.db.engine import get_engine
+from src.db.tables import agent_activity
+
+logger = logging.getLogger(__name__)
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    """Range partitioning settings for one table."""
+
+    table: str
+    column: str
+    interval: str = "month"
+    premake: int = 3
+    retain: int | None = None
+    expire: str = "detach"
+
+    def __post_init__(self) -> None:
+        if self.interval not in ("day", "month"):
+            raise ValueError(f"Unknown partition interval '{self.interval}'")
+        if self.expire not in ("drop", "detach"):
+            raise ValueError(f"Unknown partition expire mode '{self.expire}'")
+        if self.premake < 1 or (self.retain is not None and self.retain < 1):
+            raise ValueError("premake and retain must be >= 1")
+
+    @classmethod
+    def from_table(cls, table: sa.Table) -> PartitionSpec:
+        spec = table.info.get("partitioning")
+        if not spec:
+            raise ValueError(f"Table {table.name} is not partitioned")
+        return cls(table=table.name, **spec)
+
+    def floor(self, at: datetime) -> datetime:
+        """Start of the interval containing `at`, in UTC."""
+        at = at.astimezone(UTC)
+        if self.interval == "day":
+            return at.replace(hour=0, minute=0, second=0, microsecond=0)
+        return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def shift(self, start: datetime, n: int) -> datetime:
+        """Interval start `n` intervals after (or before, if negative) `start`."""
+        if self.interval == "day":
+            return start + timedelta(days=n)
+        months = start.year * 12 + start.month - 1 + n
+        return start.replace(year=months // 12, month=months % 12 + 1)
+
+    def name(self, start: datetime) -> str:
+        fmt = "%Y%m%d" if self.interval == "day" else "%Y%m"
+        return f"{self.table}_p{start.strftime(fmt)}"
+
+    def wanted(self, now: datetime) -> list[tuple[str, datetime, datetime]]:
+        """(name, start, end) for the current interval plus `premake` future ones."""
+        current = self.floor(now)
+        return [
+            (self.name(self.shift(current, i)), self.shift(current, i), self.shift(current, i + 1))
+            for i in range(self.premake + 1)
+        ]
+
+    def expiry_cutoff(self, now: datetime) -> datetime | None:
+        """Partitions ending at or before this instant are expired."""
+        if self.retain is None:
+            return None
+        return self.shift(self.floor(now), -self.retain)
+
+
+def _create_sql(spec: PartitionSpec, name: str, start: datetime, end: datetime) -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{spec.table}" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def _rescue_sql(
+    spec: PartitionSpec, table: sa.Table, name: str, start: datetime, end: datetime
+) -> tuple[list[str], list[str]]:
+    """Statements to run before and after creating `name` that move its rows out of the default."""
+    cols = ", ".join(f'"{c.name}"' for c in table.columns)
+    tmp = f"_{name}_rescue"
+    in_range = (
+        f"\"{spec.column}\" >= '{start.isoformat()}' AND \"{spec.column}\" < '{end.isoformat()}'"
+    )
+    before = [
+        f'CREATE TEMP TABLE "{tmp}" (LIKE "{spec.table}") ON COMMIT DROP',
+        (
+            f'WITH moved AS (DELETE FROM "{spec.table}_default" WHERE {in_range} '
+            f'RETURNING {cols}) INSERT INTO "{tmp}" ({cols}) SELECT {cols} FROM moved'
+        ),
+    ]
+    after = [f'INSERT INTO "{spec.table}" ({cols}) SELECT {cols} FROM "{tmp}"']
+    return before, after
+
+
+async def list_partitions(conn, table: str) -> list[tuple[str, datetime | None, datetime | None]]:
+    """(name, start, end) of every attached partition; bounds are None for DEFAULT/MINVALUE."""
+    rows = await conn.execute(
+        sa.text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for name, bound in rows.all():
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            start, end = (datetime.fromisoformat(v) for v in match.groups())
+            partitions.append((name, start, end))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+async def maintain_partitions(
+    table: sa.Table = agent_activity,
+    *,
+    now: datetime | None = None,
+    dry_run: bool = False,
+) -> dict:
+    """Pre-create upcoming partitions and expire old ones for a partitioned table.
+
+    Idempotent: existing partitions are left alone. Runs in one transaction
+    with the session time zone pinned to UTC so partition bounds parse the same
+    way they were created.
+    """
+    spec = PartitionSpec.from_table(table)
+    now = now or datetime.now(UTC)
+    statements: list[str] = []
+    created: list[str] = []
+    expired: list[str] = []
+    moved: dict[str, int] = {}
+
+    async with get_engine().begin() as conn:
+        await conn.execute(sa.text("SET LOCAL TIME ZONE 'UTC'"))
+        existing = await list_partitions(conn, spec.table)
+        names = {name for name, _, _ in existing}
+
+        default_name = f"{spec.table}_default"
+        default_rows = 0
+        if default_name in names:
+            default_rows = (
+                await conn.execute(sa.text(f'SELECT count(*) FROM "{default_name}"'))
+            ).scalar_one()
+            if default_rows:
+                logger.warning(
+                    "%d rows in %s: partition maintenance is behind", default_rows, default_name
+                )
+
+        for name, start, end in spec.wanted(now):
+            if name in names:
+                continue
+            stranded = 0
+            if default_rows:
+                stranded = (
+                    await conn.execute(
+                        sa.text(
+                            f'SELECT count(*) FROM "{default_name}" '
+                            f'WHERE "{spec.column}" >= :start AND "{spec.column}" < :end'
+                        ),
+                        {"start": start, "end": end},
+                    )
+                ).scalar_one()
+            if stranded:
+                before, after = _rescue_sql(spec, table, name, start, end)
+                statements += [*before, _create_sql(spec, name, start, end), *after]
+                moved[name] = stranded
+            else:
+                statements.append(_create_sql(spec, name, start, end))
+            created.append(name)
+
+        cutoff = spec.expiry_cutoff(now)
+        if cutoff is not None:
+            for name, _, end in existing:
+                if end is not None and end <= cutoff:
+                    statements.append(f'ALTER TABLE "{spec.table}" DETACH PARTITION "{name}"')
+                    if spec.expire == "drop":
+                        statements.append(f'DROP TABLE "{name}"')
+                    expired.append(name)
+
+        if not dry_run:
+            for stmt in statements:
+                await conn.execute(sa.text(stmt))
+
+    if created or expired:
+        logger.info(
+            "%s partitions for %s: created=%s expired=%s moved=%s",
+            "Planned" if dry_run else "Applied",
+            spec.table,
+            created,
+            expired,
+            moved,
+        )
+    return {
+        "table": spec.table,
+        "created": created,
+        "expired": expired,
+        "moved": moved,
+        "default_rows": default_rows,
+        "statements": statements,
+        "dry_run": dry_run,
+    }
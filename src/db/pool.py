@@ -0,0 +1,183 @@
+"""Connection pool profiles and instrumentation for the async engine.
+
+depends_on:
+  - src/get_env.py
+depended_by:
+  - src/db/engine.py
+  - tests/test_engine.py
+semver: minor
+
+Usage:
+    # .env
+    PRJ_DB_POOL_PROFILE=hook-writer     # api (default) | hook-writer | batch
+    PRJ_DB_POOL_SIZE=3                  # optional per-key overrides
+
+    from src.db.engine import get_pool_stats
+
+    get_pool_stats()
+    # {"profile": "hook-writer", "checked_out": 1, "overflow_hits": 0,
+    #  "wait_ms": {"count": 812, "max": 3.1, "buckets": {...}}, "connection_age_s": {...}}
+
+Profiles with `pool_pre_ping: False` reconnect lazily instead of pinging on
+every checkout: a statement that hits a dead connection fails once, SQLAlchemy
+invalidates the pool on the disconnect error, and the next checkout reconnects.
+"""
+
+from __future__ import annotations
+
+import time
+import weakref
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.get_env import env
+
+POOL_PROFILES: dict[str, dict[str, Any]] = {
+    # Request-serving default; matches the original hard-coded settings.
+    "api": {
+        "pool_size": 5,
+        "max_overflow": 2,
+        "pool_recycle": 600,
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+    },
+    # Hook/telemetry writers: few connections, fail fast, no per-checkout ping.
+    "hook-writer": {
+        "pool_size": 2,
+        "max_overflow": 1,
+        "pool_recycle": 300,
+        "pool_timeout": 5,
+        "pool_pre_ping": False,
+    },
+    # Bulk jobs (seeding, sync, rollups, export): wide pool, long-lived connections.
+    "batch": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_recycle": 1800,
+        "pool_timeout": 60,
+        "pool_pre_ping": False,
+    },
+}
+
+DEFAULT_PROFILE = "api"
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# setting → (env key, parser)
+_OVERRIDES: dict[str, tuple[str, Any]] = {
+    "pool_size": ("PRJ_DB_POOL_SIZE", int),
+    "max_overflow": ("PRJ_DB_MAX_OVERFLOW", int),
+    "pool_recycle": ("PRJ_DB_POOL_RECYCLE", int),
+    "pool_timeout": ("PRJ_DB_POOL_TIMEOUT", float),
+    "pool_pre_ping": ("PRJ_DB_POOL_PRE_PING", _parse_bool),
+}
+
+
+def pool_settings(profile: str | None = None) -> tuple[str, dict[str, Any]]:
+    """Resolve (profile name, create_async_engine pool kwargs).
+
+    The profile comes from the argument, else PRJ_DB_POOL_PROFILE, else "api".
+    Individual PRJ_DB_POOL_* env vars override the profile's values.
+    """
+    name = profile or env("PRJ_DB_POOL_PROFILE", default=DEFAULT_PROFILE) or DEFAULT_PROFILE
+    if name not in POOL_PROFILES:
+        raise ValueError(
+            f"Unknown pool profile '{name}'. Expected one of: {', '.join(POOL_PROFILES)}"
+        )
+    settings = dict(POOL_PROFILES[name])
+    for key, (env_key, parse) in _OVERRIDES.items():
+        value = env(env_key, default=None)
+        if value:
+            settings[key] = parse(value)
+    return name, settings
+
+
+class PoolStatsMixin:
+    """Adds checkout wait, overflow and connection-age tracking to a QueuePool.
+
+    Wait time is measured around `connect()`, so it includes queueing for a free
+    connection plus any connect or pre-ping work done during checkout.
+    """
+
+    WAIT_BUCKETS_MS: tuple[float, ...] = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_hits = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
+        self._records: weakref.WeakSet = weakref.WeakSet()
+
+    def connect(self):  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self._record_wait((time.perf_counter() - start) * 1000)
+        self.checkouts += 1
+        return conn
+
+    def _create_connection(self):  # type: ignore[override]
+        record = super()._create_connection()
+        # QueuePool only creates connections after _inc_overflow(); a positive
+        # counter means this one is beyond pool_size.
+        if self._overflow > 0:
+            self.overflow_hits += 1
+        self._records.add(record)
+        return record
+
+    def _record_wait(self, ms: float) -> None:
+        self.wait_total_ms += ms
+        self.wait_max_ms = max(self.wait_max_ms, ms)
+        for i, bound in enumerate(self.WAIT_BUCKETS_MS):
+            if ms <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Point-in-time pool counters, wait histogram and connection ages."""
+        now = time.time()
+        ages = [
+            now - r.starttime
+            for r in list(self._records)
+            if r.dbapi_connection is not None and r.starttime
+        ]
+        waits = sum(self.wait_buckets)
+        labels = [f"<={b:g}" for b in self.WAIT_BUCKETS_MS] + [f">{self.WAIT_BUCKETS_MS[-1]:g}"]
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "overflow_hits": self.overflow_hits,
+            "wait_ms": {
+                "count": waits,
+                "mean": round(self.wait_total_ms / waits, 3) if waits else 0.0,
+                "max": round(self.wait_max_ms, 3),
+                "buckets": dict(zip(labels, self.wait_buckets)),
+            },
+            "connection_age_s": {
+                "count": len(ages),
+                "min": round(min(ages), 1) if ages else 0.0,
+                "max": round(max(ages), 1) if ages else 0.0,
+                "mean": round(sum(ages) / len(ages), 1) if ages else 0.0,
+            },
+        }
+
+
+class InstrumentedAsyncPool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with PoolStatsMixin counters."""
@@ -1,15 +1,26 @@
 """SQLAlchemy Table objects matching semantic YAML schemas.
 
-schema: tasks, subtasks, task_dependencies, agent_activity
+schema: tasks, subtasks, task_dependencies, agent_activity, activity_rollup_hourly,
+  rollup_watermarks
 depends_on:
   - semantic/tasks.yaml
   - semantic/subtasks.yaml
   - semantic/task_dependencies.yaml
   - semantic/agent_activity.yaml
+  - semantic/activity_rollup_hourly.yaml
+  - semantic/rollup_watermarks.yaml
 depended_by:
+  - src/analytics/rollup.py
+  - src/analytics/query.py
+  - src/analytics/export.py
+  - src/graph/dag.py
+  - src/graph/scheduler.py
   - src/db/crud.py
+  - src/db/bulk.py
+  - src/db/partitions.py
   - src/db/__init__.py
   - src/hooks/activity_tracker.py
+  - src/hooks/activity_writer.py
   - src/hooks/cost_tracker.py
   - tests/test_db.py
 semver: major
@@ -38,6 +49,8 @@ tasks = sa.Table(
     sa.Column("due_at", sa.DateTime(timezone=True), nullable=True),
     sa.Column("github_issue_number", sa.Integer, nullable=True),
     sa.Column("github_project_item_id", sa.String(50), nullable=True),
+    sa.Column("github_sync_hash", sa.String(64), nullable=True),
+    sa.Column("github_synced_at", sa.DateTime(timezone=True), nullable=True),
     sa.Column("schema_version", sa.Integer, nullable=False, server_default="1"),
     sa.Column(
         "created_at",
@@ -72,12 +85,9 @@ subtasks = sa.Table(
     sa.Column("output_summary", sa.Text, nullable=True),
     sa.Column("github_issue_number", sa.Integer, nullable=True),
     sa.Column("github_project_item_id", sa.String(50), nullable=True),
-    sa.Column(
-        "agent_activity_id",
-        sa.UUID,
-        sa.ForeignKey("agent_activity.id", ondelete="SET NULL"),
-        nullable=True,
-    ),
+    # Soft reference: agent_activity is partitioned, so id alone is not unique
+    # and cannot be the target of a foreign key.
+    sa.Column("agent_activity_id", sa.UUID, nullable=True),
     sa.Column("schema_version", sa.Integer, nullable=False, server_default="1"),
     sa.Column(
         "created_at",
@@ -130,6 +140,7 @@ task_dependencies = sa.Table(
 agent_activity = sa.Table(
     "agent_activity",
     metadata,
+    # Range-partitioned on event_at; the partition key must be part of the primary key.
     sa.Column("id", sa.UUID, primary_key=True, server_default=sa.text("gen_random_uuid()")),
     sa.Column(
         "task_id",
@@ -156,6 +167,7 @@ agent_activity = sa.Table(
     sa.Column(
         "event_at",
         sa.DateTime(timezone=True),
+        primary_key=True,
         nullable=False,
         server_default=sa.text("now()"),
     ),
@@ -168,5 +180,64 @@ agent_activity = sa.Table(
     sa.Index("ix_agent_activity_task_id", "task_id"),
     sa.Index("ix_agent_activity_agent_name", "agent_name"),
     sa.Index("ix_agent_activity_hook_event", "hook_event"),
-    sa.Index("ix_agent_activity_event_at", "event_at"),
+    # Covering index: time-range dashboards (recent activity, per-tool timings)
+    # read only these columns, so Postgres can answer them with index-only scans.
+    sa.Index(
+        "ix_agent_activity_event_at_covering",
+        "event_at",
+        postgresql_include=["agent_name", "hook_event", "tool_name", "duration_ms", "cost_usd"],
+    ),
+    # Incremental rollups scan new rows by insert time (src/analytics/rollup.py).
+    sa.Index("ix_agent_activity_created_at", "created_at"),
+    postgresql_partition_by="RANGE (event_at)",
+    # Mirrors semantic/agent_activity.yaml `partitioning`; read by src/db/partitions.py.
+    info={
+        "partitioning": {
+            "column": "event_at",
+            "interval": "month",
+            "premake": 3,
+            "retain": None,
+            "expire": "detach",
+        }
+    },
+)
+
+# Hourly pre-aggregates of agent_activity, maintained by src/analytics/rollup.py.
+# tool_name is '' (not NULL) for tool-less events so it can be part of the key.
+activity_rollup_hourly = sa.Table(
+    "activity_rollup_hourly",
+    metadata,
+    sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True, nullable=False),
+    sa.Column("agent_name", sa.String(50), primary_key=True, nullable=False),
+    sa.Column("tool_name", sa.String(50), primary_key=True, nullable=False, server_default=""),
+    sa.Column("hook_event", sa.String(20), primary_key=True, nullable=False),
+    sa.Column("event_count", sa.Integer, nullable=False, server_default="0"),
+    sa.Column("duration_count", sa.Integer, nullable=False, server_default="0"),
+    sa.Column("duration_sum_ms", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("duration_min_ms", sa.Integer, nullable=True),
+    sa.Column("duration_max_ms", sa.Integer, nullable=True),
+    sa.Column("cost_usd_sum", sa.Float, nullable=False, server_default="0.0"),
+    sa.Column("duration_sketch", sa.LargeBinary, nullable=True),  # LatencySketch.to_bytes
+    sa.Column(
+        "updated_at",
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    ),
+    sa.Index("ix_activity_rollup_hourly_agent_bucket", "agent_name", "bucket_start"),
+)
+
+rollup_watermarks = sa.Table(
+    "rollup_watermarks",
+    metadata,
+    sa.Column("name", sa.String(50), primary_key=True),
+    sa.Column("last_created_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("last_id", sa.UUID, nullable=True),
+    sa.Column("rows_processed", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column(
+        "updated_at",
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.text("now()"),
+    ),
 )
@@ -7,9 +7,13 @@ depends_on:
   - env.template
 depended_by:
   - src/db/engine.py
+  - src/db/pool.py
   - src/db/alembic/env.py
   - src/sync/github_project.py
+  - src/sync/graphql.py
   - src/hooks/activity_tracker.py
+  - src/hooks/outbox.py
+  - src/hooks/collector.py
 semver: major
 
 Usage:
@@ -0,0 +1,22 @@
+"""Task dependency graph: cycle checks, closure, critical path, and scheduling."""
+
+from src.graph.closure import ClosureIndex
+from src.graph.dag import (
+    CycleError,
+    DependencyGraph,
+    insert_dependency,
+    load_graph,
+    load_task_weights,
+)
+from src.graph.scheduler import TaskScheduler, load_scheduler
+
+__all__ = [
+    "ClosureIndex",
+    "CycleError",
+    "DependencyGraph",
+    "TaskScheduler",
+    "insert_dependency",
+    "load_graph",
+    "load_scheduler",
+    "load_task_weights",
+]
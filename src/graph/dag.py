@@ -0,0 +1,336 @@
+"""Task dependency DAG with incremental cycle detection and critical-path analysis.
+
+depends_on:
+  - src/db/crud.py
+  - src/db/tables.py
+depended_by:
+  - src/graph/closure.py
+  - src/graph/scheduler.py
+  - src/graph/__init__.py
+  - tests/test_graph.py
+semver: minor
+
+Usage:
+    from src.graph.dag import CycleError, insert_dependency, load_graph, load_task_weights
+
+    graph = await load_graph()
+    try:
+        await insert_dependency(graph, blocker_id, blocked_id)   # validated, then INSERTed
+    except CycleError as exc:
+        print(exc.cycle)                                        # [blocker, blocked, ..., blocker]
+
+    weights = await load_task_weights("duration")               # or "cost"
+    total, path = graph.critical_path(weights)
+
+The graph keeps a topological order up to date as edges are added
+(Pearce-Kelly dynamic topological sort). An edge that already agrees with the
+order is accepted in O(1). Otherwise only the nodes whose order lies between
+the two endpoints are searched and reordered, never the whole graph. So
+validating an edge on a 100k-task graph usually touches a handful of nodes.
+The database only enforces `ck_no_self_dependency`. Route inserts through
+`insert_dependency` (one process owning the graph) to keep longer cycles out.
+
+The critical path is the heaviest path through the DAG, computed in one
+O(V + E) pass over the maintained order.
+"""
+
+from __future__ import annotations
+
+import statistics
+from collections.abc import Hashable, Iterable, Mapping
+from typing import Any, Literal
+
+from src.db.crud import Crud
+from src.db.tables import task_dependencies, tasks
+
+
+class CycleError(ValueError):
+    """Adding an edge would create a cycle; `cycle` lists it, first node repeated last."""
+
+    def __init__(self, cycle: list[Hashable]) -> None:
+        self.cycle = cycle
+        super().__init__(f"Dependency would create a cycle: {' -> '.join(str(n) for n in cycle)}")
+
+
+class DependencyGraph:
+    """Directed acyclic graph (blocker -> blocked) with a maintained topological order."""
+
+    def __init__(self) -> None:
+        self._succ: dict[Hashable, set[Hashable]] = {}
+        self._pred: dict[Hashable, set[Hashable]] = {}
+        self._ord: dict[Hashable, int] = {}
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._succ)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._succ
+
+    @classmethod
+    def from_edges(
+        cls, edges: Iterable[tuple[Hashable, Hashable]], nodes: Iterable[Hashable] = ()
+    ) -> DependencyGraph:
+        """Bulk-build in O(V + E) with one static topological sort (Kahn).
+
+        Much faster than calling `add_edge` per edge when loading a whole
+        graph. Raises CycleError if the edges already contain a cycle.
+        """
+        graph = cls()
+        for node in nodes:
+            graph.add_node(node)
+        for u, v in edges:
+            if u == v:
+                raise CycleError([u, u])
+            graph.add_node(u)
+            graph.add_node(v)
+            graph._succ[u].add(v)
+            graph._pred[v].add(u)
+
+        indegree = {node: len(preds) for node, preds in graph._pred.items()}
+        queue = [node for node, d in indegree.items() if d == 0]
+        for slot, node in enumerate(queue):  # queue grows while iterating
+            graph._ord[node] = slot
+            for nxt in graph._succ[node]:
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    queue.append(nxt)
+        if len(queue) < len(graph):
+            raise CycleError(graph._find_cycle({n for n, d in indegree.items() if d > 0}))
+        graph._next = len(queue)
+        return graph
+
+    def _find_cycle(self, candidates: set[Hashable]) -> list[Hashable]:
+        """Some cycle among `candidates`, the nodes Kahn's algorithm could not order."""
+        # Each leftover node has a leftover blocker; walk back until one repeats.
+        node = next(iter(candidates))
+        seen: dict[Hashable, int] = {}
+        walk: list[Hashable] = []
+        while node not in seen:
+            seen[node] = len(walk)
+            walk.append(node)
+            node = next(p for p in self._pred[node] if p in candidates)
+        cycle = walk[seen[node] :]
+        cycle.reverse()
+        return [*cycle, cycle[0]]
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(s) for s in self._succ.values())
+
+    def add_node(self, node: Hashable) -> None:
+        """Add an isolated node (appending to the order keeps it valid). Idempotent."""
+        if node not in self._succ:
+            self._succ[node] = set()
+            self._pred[node] = set()
+            self._ord[node] = self._next
+            self._next += 1
+
+    def remove_node(self, node: Hashable) -> None:
+        """Remove a node and its edges; the remaining order stays valid."""
+        for v in self._succ.pop(node):
+            self._pred[v].discard(node)
+        for u in self._pred.pop(node):
+            self._succ[u].discard(node)
+        del self._ord[node]
+
+    def successors(self, node: Hashable) -> set[Hashable]:
+        """Tasks directly blocked by `node` (read-only view; do not mutate)."""
+        return self._succ[node]
+
+    def predecessors(self, node: Hashable) -> set[Hashable]:
+        """Direct blockers of `node` (read-only view; do not mutate)."""
+        return self._pred[node]
+
+    def order_key(self, node: Hashable) -> int:
+        """Sort key placing blockers before the tasks they block."""
+        return self._ord[node]
+
+    def descendants(self, node: Hashable) -> set[Hashable]:
+        """Every task reachable from `node` by a DFS (see ClosureIndex for O(1))."""
+        seen: set[Hashable] = set()
+        stack = [node]
+        while stack:
+            for nxt in self._succ[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def has_edge(self, u: Hashable, v: Hashable) -> bool:
+        return u in self._succ and v in self._succ[u]
+
+    def add_edge(self, u: Hashable, v: Hashable) -> bool:
+        """Add `u -> v` (u blocks v). Returns False if it already existed.
+
+        Raises CycleError, leaving the graph unchanged, if v already reaches u.
+        """
+        if u == v:
+            raise CycleError([u, u])
+        self.add_node(u)
+        self.add_node(v)
+        if v in self._succ[u]:
+            return False
+        lower, upper = self._ord[v], self._ord[u]
+        if lower < upper:
+            forward = self._search_forward(v, u, upper)
+            backward = self._search_backward(u, lower)
+            self._reorder(forward, backward)
+        self._succ[u].add(v)
+        self._pred[v].add(u)
+        return True
+
+    def remove_edge(self, u: Hashable, v: Hashable) -> bool:
+        """Remove `u -> v`; returns False if absent. The order stays valid."""
+        if not self.has_edge(u, v):
+            return False
+        self._succ[u].discard(v)
+        self._pred[v].discard(u)
+        return True
+
+    def would_create_cycle(self, u: Hashable, v: Hashable) -> bool:
+        """True if adding `u -> v` would close a cycle (graph is not modified)."""
+        if u == v:
+            return True
+        if u not in self._succ or v not in self._succ or self._ord[v] > self._ord[u]:
+            return False
+        try:
+            self._search_forward(v, u, self._ord[u])
+        except CycleError:
+            return True
+        return False
+
+    def _search_forward(self, start: Hashable, target: Hashable, upper: int) -> list[Hashable]:
+        """Nodes reachable from `start` with order <= upper; CycleError if `target` is one."""
+        parent: dict[Hashable, Hashable | None] = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in self._succ[node]:
+                if nxt == target:
+                    path = [target, node]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    path.reverse()  # start ... node, target
+                    raise CycleError([target, *path])
+                if nxt not in parent and self._ord[nxt] <= upper:
+                    parent[nxt] = node
+                    stack.append(nxt)
+        return list(parent)
+
+    def _search_backward(self, start: Hashable, lower: int) -> list[Hashable]:
+        """Nodes reaching `start` with order >= lower."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for prev in self._pred[node]:
+                if prev not in seen and self._ord[prev] >= lower:
+                    seen.add(prev)
+                    stack.append(prev)
+        return list(seen)
+
+    def _reorder(self, forward: list[Hashable], backward: list[Hashable]) -> None:
+        # Reuse the affected slots: everything that reaches u goes before
+        # everything v reaches, each group keeping its relative order.
+        backward.sort(key=self._ord.__getitem__)
+        forward.sort(key=self._ord.__getitem__)
+        nodes = backward + forward
+        slots = sorted(self._ord[n] for n in nodes)
+        for node, slot in zip(nodes, slots):
+            self._ord[node] = slot
+
+    def topological_order(self) -> list[Hashable]:
+        """Every node, blockers before the tasks they block."""
+        return sorted(self._succ, key=self._ord.__getitem__)
+
+    def critical_path(
+        self, weights: Mapping[Hashable, float], default: float = 0.0
+    ) -> tuple[float, list[Hashable]]:
+        """Heaviest path by summed node weight: (total, [first blocker, ..., last task]).
+
+        Missing weights count as `default`. O(V + E).
+        """
+        best: dict[Hashable, float] = {}
+        via: dict[Hashable, Hashable | None] = {}
+        end: Hashable | None = None
+        for node in self.topological_order():
+            prev = max(self._pred[node], key=best.__getitem__, default=None)
+            base = best[prev] if prev is not None else 0.0
+            best[node] = base + weights.get(node, default)
+            via[node] = prev
+            if end is None or best[node] > best[end]:
+                end = node
+        if end is None:
+            return 0.0, []
+        path = [end]
+        while via[path[-1]] is not None:
+            path.append(via[path[-1]])
+        path.reverse()
+        return best[end], path
+
+
+async def load_graph(batch_size: int = 5000) -> DependencyGraph:
+    """Build a DependencyGraph from every row of task_dependencies."""
+    edges: list[tuple[Any, Any]] = []
+    async for batch in Crud(task_dependencies, use_connection=True).iter(
+        batch_size=batch_size, columns=["blocker_task_id", "blocked_task_id"]
+    ):
+        edges.extend((row["blocker_task_id"], row["blocked_task_id"]) for row in batch)
+    return DependencyGraph.from_edges(edges)
+
+
+async def insert_dependency(graph: DependencyGraph, blocker_id: Any, blocked_id: Any) -> dict:
+    """Validate `blocker -> blocked` against `graph`, then insert the row.
+
+    Raises CycleError before touching the database. If the INSERT fails the
+    edge is removed from the graph again.
+    """
+    if not graph.add_edge(blocker_id, blocked_id):
+        raise ValueError(f"Dependency {blocker_id} -> {blocked_id} already exists")
+    try:
+        return await Crud(task_dependencies).create(
+            blocker_task_id=blocker_id, blocked_task_id=blocked_id
+        )
+    except BaseException:
+        graph.remove_edge(blocker_id, blocked_id)
+        raise
+
+
+async def load_task_weights(
+    by: Literal["cost", "duration"] = "cost", batch_size: int = 5000
+) -> dict[Any, float]:
+    """Per-task weights for `critical_path`.
+
+    "cost": estimated_cost_usd. "duration": seconds from started_at to
+    completed_at for finished tasks; unfinished tasks get the median duration
+    of finished tasks with the same assigned_agent (else of all finished tasks).
+    """
+    if by not in ("cost", "duration"):
+        raise ValueError(f"Unknown weight '{by}'. Expected 'cost' or 'duration'")
+    columns = (
+        ["estimated_cost_usd"] if by == "cost" else ["assigned_agent", "started_at", "completed_at"]
+    )
+    weights: dict[Any, float] = {}
+    pending: list[tuple[Any, str | None]] = []
+    history: dict[str | None, list[float]] = {}
+    async for batch in Crud(tasks, use_connection=True).iter(
+        batch_size=batch_size, columns=columns
+    ):
+        for row in batch:
+            if by == "cost":
+                weights[row["id"]] = float(row["estimated_cost_usd"] or 0.0)
+            elif row["started_at"] and row["completed_at"]:
+                seconds = (row["completed_at"] - row["started_at"]).total_seconds()
+                weights[row["id"]] = seconds
+                history.setdefault(row["assigned_agent"], []).append(seconds)
+            else:
+                pending.append((row["id"], row["assigned_agent"]))
+
+    if pending:
+        everything = [s for values in history.values() for s in values]
+        overall = statistics.median(everything) if everything else 0.0
+        medians = {agent: statistics.median(values) for agent, values in history.items()}
+        for task_id, agent in pending:
+            weights[task_id] = medians.get(agent, overall)
+    return weights
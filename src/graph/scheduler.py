@@ -0,0 +1,268 @@
+"""Dependency-aware ready queue over tasks and task_dependencies.
+
+depends_on:
+  - src/db/crud.py
+  - src/db/tables.py
+  - src/graph/closure.py
+  - src/graph/dag.py
+  - src/models/enums.py
+depended_by:
+  - src/graph/__init__.py
+  - tests/test_graph.py
+semver: minor
+
+Usage:
+    from src.graph.scheduler import load_scheduler
+
+    scheduler = await load_scheduler()          # one pass over tasks + edges
+    for task_id in scheduler.ready_tasks():     # critical first, then oldest
+        dispatch(task_id)
+        scheduler.mark_started(task_id)
+
+    newly_ready = scheduler.mark_completed(task_id)   # O(out-degree)
+    scheduler.add_dependency(a, b)                    # CycleError if b reaches a
+
+    scheduler = await load_scheduler(track_closure=True)
+    cancelled = scheduler.mark_failed(task_id, cancel_dependents=True)
+
+The DAG is loaded once; afterwards every update is in memory. Each task keeps
+a count of its unfinished blockers, and completing a task decrements only its
+direct dependents, so no completion re-reads or re-walks the graph. The
+caller still persists status changes (e.g. Crud(tasks).update).
+
+A blocker counts as finished only when completed. Tasks blocked by a failed or
+cancelled task stay waiting until that blocker is retried and completed.
+
+Edges live in a DependencyGraph (src/graph/dag.py), so new dependencies are
+checked for cycles incrementally and `scheduler.graph.critical_path(...)`
+works on the same structure.
+
+With `track_closure=True` the scheduler also maintains a ClosureIndex
+(src/graph/closure.py). `mark_failed(..., cancel_dependents=True)` then
+cancels every transitive dependent with one set lookup instead of a walk.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from src.db.crud import Crud
+from src.db.tables import task_dependencies, tasks
+from src.graph.closure import ClosureIndex
+from src.graph.dag import DependencyGraph
+from src.models.enums import TaskPriority, TaskStatus
+
+PRIORITY_RANK = {p.value: rank for rank, p in enumerate(TaskPriority)}
+
+_DONE = TaskStatus.completed.value
+_RUNNABLE = {TaskStatus.pending.value, TaskStatus.blocked.value}
+
+
+@dataclass
+class _Node:
+    priority: str
+    status: str
+    order: tuple[Any, ...]
+    waiting: int = 0
+
+
+class TaskScheduler:
+    """In-memory DAG with per-task unfinished-blocker counts and a priority ready queue."""
+
+    def __init__(self, *, track_closure: bool = False) -> None:
+        self.graph = DependencyGraph()
+        self.closure = ClosureIndex(self.graph) if track_closure else None
+        self._nodes: dict[UUID, _Node] = {}
+        self._ready: set[UUID] = set()
+        self._heap: list[tuple[tuple[Any, ...], UUID]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._nodes
+
+    @classmethod
+    def from_rows(
+        cls,
+        task_rows: Iterable[dict[str, Any]],
+        edge_rows: Iterable[dict[str, Any]],
+        *,
+        track_closure: bool = False,
+    ) -> TaskScheduler:
+        """Build from `tasks` rows (id, priority, status[, created_at]) and edge rows."""
+        scheduler = cls()
+        for row in task_rows:
+            scheduler.add_task(
+                row["id"],
+                priority=row.get("priority") or TaskPriority.medium.value,
+                status=row.get("status") or TaskStatus.pending.value,
+                created_at=row.get("created_at"),
+            )
+        edges = [(row["blocker_task_id"], row["blocked_task_id"]) for row in edge_rows]
+        for blocker_id, blocked_id in edges:
+            if blocker_id not in scheduler._nodes or blocked_id not in scheduler._nodes:
+                raise KeyError(f"Dependency {blocker_id} -> {blocked_id} names an unknown task")
+        # One O(V + E) sort instead of validating each edge incrementally.
+        scheduler.graph = DependencyGraph.from_edges(edges, scheduler._nodes)
+        for blocker_id in scheduler._nodes:
+            if scheduler._nodes[blocker_id].status == _DONE:
+                continue
+            for blocked_id in scheduler.graph.successors(blocker_id):
+                scheduler._nodes[blocked_id].waiting += 1
+                scheduler._ready.discard(blocked_id)
+        if track_closure:
+            scheduler.closure = ClosureIndex(scheduler.graph)
+        return scheduler
+
+    def _sort_key(self, task_id: UUID) -> tuple[Any, ...]:
+        node = self._nodes[task_id]
+        return (PRIORITY_RANK.get(node.priority, len(PRIORITY_RANK)), *node.order)
+
+    def _push_ready(self, task_id: UUID) -> None:
+        self._ready.add(task_id)
+        heapq.heappush(self._heap, (self._sort_key(task_id), task_id))
+
+    def _is_runnable(self, node: _Node) -> bool:
+        return node.status in _RUNNABLE and node.waiting == 0
+
+    def add_task(
+        self,
+        task_id: UUID,
+        *,
+        priority: str = TaskPriority.medium.value,
+        status: str = TaskStatus.pending.value,
+        created_at: datetime | None = None,
+    ) -> None:
+        """Register a task. Ties within a priority go to the oldest, then insertion order."""
+        if task_id in self._nodes:
+            raise ValueError(f"Task {task_id} already scheduled")
+        order = (created_at is None, created_at or 0, next(self._seq))
+        node = self._nodes[task_id] = _Node(str(priority), str(status), order)
+        if self.closure is not None:
+            self.closure.add_node(task_id)
+        else:
+            self.graph.add_node(task_id)
+        if self._is_runnable(node):
+            self._push_ready(task_id)
+
+    def add_dependency(self, blocker_id: UUID, blocked_id: UUID) -> None:
+        """Record that `blocked_id` waits for `blocker_id`. Both must be registered.
+
+        Raises CycleError (a ValueError) if `blocker_id` already depends on
+        `blocked_id`, directly or transitively. Duplicate edges are ignored.
+        """
+        blocker = self._nodes[blocker_id]
+        blocked = self._nodes[blocked_id]
+        target = self.closure if self.closure is not None else self.graph
+        if not target.add_edge(blocker_id, blocked_id):
+            return
+        if blocker.status != _DONE:
+            blocked.waiting += 1
+            self._ready.discard(blocked_id)
+
+    def ready_tasks(self, limit: int | None = None) -> list[UUID]:
+        """Runnable tasks, highest priority first. Does not remove them from the queue."""
+        ordered = sorted(self._ready, key=self._sort_key)
+        return ordered if limit is None else ordered[:limit]
+
+    def pop_ready(self) -> UUID | None:
+        """Take the highest-priority runnable task and mark it started, in O(log n)."""
+        while self._heap:
+            _, task_id = heapq.heappop(self._heap)
+            if task_id in self._ready:
+                self.mark_started(task_id)
+                return task_id
+        return None
+
+    def mark_started(self, task_id: UUID) -> None:
+        """Move a task to in_progress so it leaves the ready queue."""
+        self._nodes[task_id].status = TaskStatus.in_progress.value
+        self._ready.discard(task_id)
+
+    def mark_completed(self, task_id: UUID) -> list[UUID]:
+        """Complete a task and return the dependents it unblocked, by priority.
+
+        Costs O(out-degree + k log k) for k newly ready tasks. Completing an
+        already-completed task is a no-op.
+        """
+        node = self._nodes[task_id]
+        if node.status == _DONE:
+            return []
+        node.status = _DONE
+        self._ready.discard(task_id)
+        newly_ready = []
+        for dep_id in self.graph.successors(task_id):
+            dep = self._nodes[dep_id]
+            dep.waiting -= 1
+            if self._is_runnable(dep):
+                self._push_ready(dep_id)
+                newly_ready.append(dep_id)
+        newly_ready.sort(key=self._sort_key)
+        return newly_ready
+
+    def mark_failed(self, task_id: UUID, *, cancel_dependents: bool = False) -> list[UUID]:
+        """Record a failure. Dependents keep waiting until the task is completed.
+
+        With `cancel_dependents=True`, every transitive dependent that has not
+        started yet is marked cancelled instead. Returns those tasks, by priority.
+        The dependents come from the ClosureIndex when tracked, else a DFS.
+        """
+        self._nodes[task_id].status = TaskStatus.failed.value
+        self._ready.discard(task_id)
+        if not cancel_dependents:
+            return []
+        stranded = self.dependents(task_id)
+        cancelled = sorted(
+            (dep_id for dep_id in stranded if self._nodes[dep_id].status in _RUNNABLE),
+            key=self._sort_key,
+        )
+        for dep_id in cancelled:
+            self._nodes[dep_id].status = TaskStatus.cancelled.value
+        self._ready.difference_update(cancelled)
+        return cancelled
+
+    def dependents(self, task_id: UUID) -> set[UUID]:
+        """Every task waiting on `task_id`, directly or transitively."""
+        if self.closure is not None:
+            return self.closure.dependents(task_id)
+        return self.graph.descendants(task_id)
+
+    def retry(self, task_id: UUID) -> bool:
+        """Put a failed/cancelled/in-progress task back to pending. Returns True if ready."""
+        node = self._nodes[task_id]
+        if node.status == _DONE:
+            raise ValueError(f"Task {task_id} is already completed")
+        node.status = TaskStatus.pending.value
+        if self._is_runnable(node) and task_id not in self._ready:
+            self._push_ready(task_id)
+        return task_id in self._ready
+
+    def status(self, task_id: UUID) -> str:
+        return self._nodes[task_id].status
+
+    def waiting_on(self, task_id: UUID) -> int:
+        """Number of direct blockers not yet completed."""
+        return self._nodes[task_id].waiting
+
+
+async def load_scheduler(batch_size: int = 5000, *, track_closure: bool = False) -> TaskScheduler:
+    """Load every task and dependency edge once (keyset pages) into a TaskScheduler."""
+    task_rows: list[dict[str, Any]] = []
+    async for batch in Crud(tasks, use_connection=True).iter(
+        batch_size=batch_size, order_by="+created_at", columns=["priority", "status"]
+    ):
+        task_rows.extend(batch)
+    edge_rows: list[dict[str, Any]] = []
+    async for batch in Crud(task_dependencies, use_connection=True).iter(
+        batch_size=batch_size, columns=["blocker_task_id", "blocked_task_id"]
+    ):
+        edge_rows.extend(batch)
+    return TaskScheduler.from_rows(task_rows, edge_rows, track_closure=track_closure)
@@ -1,6 +1,23 @@
 """Claude Agent SDK hooks for activity and cost tracking."""
 
 from src.hooks.activity_tracker import get_activity_hooks
-from src.hooks.cost_tracker import update_task_cost_from_result
+from src.hooks.activity_writer import ActivityWriter
+from src.hooks.collector import ActivityCollector, CollectorClient, get_collector_client
+from src.hooks.cost_tracker import CostLedger, update_task_cost_from_result
+from src.hooks.latency import LatencyRecorder, get_latency_recorder
+from src.hooks.outbox import ActivityOutbox
+from src.hooks.tool_timer import ToolTimer
 
-__all__ = ["get_activity_hooks", "update_task_cost_from_result"]
+__all__ = [
+    "ActivityCollector",
+    "ActivityOutbox",
+    "ActivityWriter",
+    "CollectorClient",
+    "CostLedger",
+    "LatencyRecorder",
+    "ToolTimer",
+    "get_activity_hooks",
+    "get_collector_client",
+    "get_latency_recorder",
+    "update_task_cost_from_result",
+]
@@ -3,6 +3,12 @@
 depends_on:
   - src/db/engine.py
   - src/db/tables.py
+  - src/hooks/activity_writer.py
+  - src/hooks/collector.py
+  - src/hooks/latency.py
+  - src/hooks/outbox.py
+  - src/hooks/serialize.py
+  - src/hooks/tool_timer.py
 depended_by:
   - src/hooks/__init__.py
   - tests/test_hooks.py
@@ -14,23 +20,44 @@ Usage:
     options = ClaudeAgentOptions(
         hooks=get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer"),
     )
+
+    # Opt-in batching: hooks enqueue rows, a background task bulk-inserts them
+    writer = ActivityWriter()
+    hooks = get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer", writer=writer)
+
+    # Durable: rows go to a local SQLite outbox first, survive DB outages
+    outbox = ActivityOutbox()
+    hooks = get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer", writer=outbox)
+
+    # Many agents per host: ship events to scripts/activity_collector.py instead
+    hooks = get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer", transport="uds")
+
+    # Live per-tool percentiles from this process, no database needed
+    get_latency_recorder().quantiles("Read")
 """
 
 from __future__ import annotations
 
-import time
 import logging
+from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID
 
 import sqlalchemy as sa
 
 from src.db.engine import get_session_factory
 from src.db.tables import agent_activity
+from src.hooks.activity_writer import ActivityWriter
+from src.hooks.collector import CollectorClient, get_collector_client
+from src.hooks.latency import LatencyRecorder, get_latency_recorder
+from src.hooks.outbox import ActivityOutbox
+from src.hooks.serialize import summarize_input, summarize_response
+from src.hooks.tool_timer import ToolTimer
 
 logger = logging.getLogger(__name__)
 
-# In-flight tool start times keyed by (session_id, tool_name)
-_tool_start_times: dict[tuple[str | None, str | None], float] = {}
+# Default in-flight tool start times, shared by hooks created without a timer
+_tool_timer = ToolTimer()
 
 
 def _truncate(text: str | None, max_len: int = 2000) -> str | None:
@@ -41,7 +68,7 @@ def _truncate(text: str | None, max_len: int = 2000) -> str | None:
     return text[: max_len - 3] + "..."
 
 
-async def _log_event(
+def _activity_row(
     *,
     task_id: UUID | None,
     agent_name: str,
@@ -54,26 +81,30 @@ async def _log_event(
     duration_ms: int | None = None,
     cost_usd: float | None = None,
     num_turns: int | None = None,
-) -> None:
+) -> dict:
+    """Build an agent_activity row. event_at is stamped here so batched rows keep their time."""
+    return {
+        "task_id": task_id,
+        "agent_name": agent_name,
+        "agent_role": agent_role,
+        "session_id": session_id,
+        "hook_event": hook_event,
+        "tool_name": tool_name,
+        "tool_input_summary": _truncate(tool_input_summary),
+        "tool_response_summary": _truncate(tool_response_summary),
+        "duration_ms": duration_ms,
+        "cost_usd": cost_usd,
+        "num_turns": num_turns,
+        "event_at": datetime.now(UTC),
+    }
+
+
+async def _log_event(**fields) -> None:
     """Insert a single agent_activity row. Silently catches DB errors."""
     try:
         session_factory = get_session_factory()
         async with session_factory() as session:
-            await session.execute(
-                sa.insert(agent_activity).values(
-                    task_id=task_id,
-                    agent_name=agent_name,
-                    agent_role=agent_role,
-                    session_id=session_id,
-                    hook_event=hook_event,
-                    tool_name=tool_name,
-                    tool_input_summary=_truncate(tool_input_summary),
-                    tool_response_summary=_truncate(tool_response_summary),
-                    duration_ms=duration_ms,
-                    cost_usd=cost_usd,
-                    num_turns=num_turns,
-                )
-            )
+            await session.execute(sa.insert(agent_activity).values(**_activity_row(**fields)))
             await session.commit()
     except Exception:
         logger.exception("Failed to log agent activity event")
@@ -83,56 +114,93 @@ def get_activity_hooks(
     task_id: UUID | None = None,
     agent_name: str = "unknown",
     agent_role: str | None = None,
+    writer: ActivityWriter | ActivityOutbox | CollectorClient | None = None,
+    timer: ToolTimer | None = None,
+    transport: str = "db",
+    latency: LatencyRecorder | None = None,
 ) -> dict:
     """Return a hooks dict for ClaudeAgentOptions.
 
+    Args:
+        task_id: Task to attribute events to.
+        agent_name: Agent name recorded on every event.
+        agent_role: Optional AgentRole value.
+        writer: Optional ActivityWriter (in-memory batching) or ActivityOutbox
+            (durable local queue). When given, hooks enqueue rows instead of
+            inserting them inline; the caller owns `await writer.aclose()`.
+        timer: Optional ToolTimer pairing PreToolUse/PostToolUse by tool_use_id.
+            Defaults to a process-wide instance.
+        transport: "db" writes from this process (inline or via `writer`).
+            "uds" sends events to the per-host ActivityCollector over a Unix
+            socket, so this process never opens a database connection.
+        latency: Optional LatencyRecorder fed with every paired tool duration.
+            Defaults to the process-wide `get_latency_recorder()`.
+
     Returns:
         Dict with PreToolUse, PostToolUse, SubagentStop, Stop callbacks.
     """
+    tool_timer = timer if timer is not None else _tool_timer
+    recorder = latency if latency is not None else get_latency_recorder()
+    if transport == "uds":
+        if writer is not None:
+            raise ValueError("transport='uds' does not take a writer")
+        writer = get_collector_client()
+    elif transport != "db":
+        raise ValueError(f"Unknown transport '{transport}'. Expected 'db' or 'uds'")
+
+    async def _record(**fields) -> None:
+        if writer is None:
+            await _log_event(
+                task_id=task_id, agent_name=agent_name, agent_role=agent_role, **fields
+            )
+        else:
+            writer.enqueue(
+                _activity_row(
+                    task_id=task_id, agent_name=agent_name, agent_role=agent_role, **fields
+                )
+            )
 
     async def on_pre_tool_use(
-        tool_name: str, tool_input: dict, *, session_id: str | None = None, **_kwargs
+        tool_name: str,
+        tool_input: dict,
+        *,
+        session_id: str | None = None,
+        tool_use_id: str | None = None,
+        **_kwargs,
     ) -> None:
-        _tool_start_times[(session_id, tool_name)] = time.monotonic()
-        await _log_event(
-            task_id=task_id,
-            agent_name=agent_name,
-            agent_role=agent_role,
+        tool_timer.start(ToolTimer.key(tool_use_id, session_id, tool_name))
+        await _record(
             session_id=session_id,
             hook_event="PreToolUse",
             tool_name=tool_name,
-            tool_input_summary=str(tool_input)[:2000],
+            tool_input_summary=summarize_input(tool_name, tool_input),
         )
 
     async def on_post_tool_use(
         tool_name: str,
         tool_input: dict,
-        tool_response: str | None = None,
+        tool_response: Any = None,
         *,
         session_id: str | None = None,
+        tool_use_id: str | None = None,
         **_kwargs,
     ) -> None:
-        start = _tool_start_times.pop((session_id, tool_name), None)
-        duration_ms = int((time.monotonic() - start) * 1000) if start else None
-        await _log_event(
-            task_id=task_id,
-            agent_name=agent_name,
-            agent_role=agent_role,
+        duration_ms = tool_timer.finish(ToolTimer.key(tool_use_id, session_id, tool_name))
+        if duration_ms is not None:
+            recorder.record(tool_name, duration_ms, agent_name)
+        await _record(
             session_id=session_id,
             hook_event="PostToolUse",
             tool_name=tool_name,
-            tool_input_summary=str(tool_input)[:2000],
-            tool_response_summary=_truncate(tool_response),
+            tool_input_summary=summarize_input(tool_name, tool_input),
+            tool_response_summary=summarize_response(tool_name, tool_response),
             duration_ms=duration_ms,
         )
 
     async def on_subagent_stop(
         *, session_id: str | None = None, num_turns: int | None = None, **_kwargs
     ) -> None:
-        await _log_event(
-            task_id=task_id,
-            agent_name=agent_name,
-            agent_role=agent_role,
+        await _record(
             session_id=session_id,
             hook_event="SubagentStop",
             num_turns=num_turns,
@@ -145,10 +213,7 @@ def get_activity_hooks(
         cost_usd: float | None = None,
         **_kwargs,
     ) -> None:
-        await _log_event(
-            task_id=task_id,
-            agent_name=agent_name,
-            agent_role=agent_role,
+        await _record(
             session_id=session_id,
             hook_event="Stop",
             num_turns=num_turns,
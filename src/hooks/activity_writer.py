@@ -0,0 +1,171 @@
+"""Batched background writer for agent_activity hook events.
+
+depends_on:
+  - src/db/crud.py
+  - src/db/tables.py
+depended_by:
+  - src/hooks/activity_tracker.py
+  - src/hooks/collector.py
+  - src/hooks/__init__.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    from src.hooks import ActivityWriter, get_activity_hooks
+
+    writer = ActivityWriter(max_batch=500, max_delay=0.2)
+    options = ClaudeAgentOptions(
+        hooks=get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer", writer=writer),
+    )
+    ...
+    await writer.aclose()  # flush remaining events on shutdown
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from src.db.crud import Crud
+from src.db.tables import agent_activity
+
+logger = logging.getLogger(__name__)
+
+_activity_crud = Crud(agent_activity, use_connection=True)
+
+# agent_activity's primary key, (id, event_at): the conflict target for idempotent inserts.
+ACTIVITY_KEY = tuple(c.name for c in agent_activity.primary_key.columns)
+
+# The keys of every hook row (activity_tracker._activity_row) once with_activity_key has run.
+ACTIVITY_FIELDS = (
+    "id",
+    "task_id",
+    "agent_name",
+    "agent_role",
+    "session_id",
+    "hook_event",
+    "tool_name",
+    "tool_input_summary",
+    "tool_response_summary",
+    "duration_ms",
+    "cost_usd",
+    "num_turns",
+    "event_at",
+)
+
+
+def with_activity_key(row: dict) -> dict:
+    """Fill in `id`/`event_at` client-side so replays of the same row conflict."""
+    if row.get("id") is not None and row.get("event_at") is not None:
+        return row
+    return {
+        **row,
+        "id": row.get("id") or uuid4(),
+        "event_at": row.get("event_at") or datetime.now(UTC),
+    }
+
+
+class ActivityWriter:
+    """Buffers agent_activity rows in memory and flushes them as multi-row INSERTs.
+
+    Hooks call `enqueue()`, which never touches the database. A background task
+    flushes the buffer once `max_batch` rows are waiting or `max_delay` seconds
+    have passed. The buffer is bounded by `max_queue`: rows beyond it are dropped
+    and counted in `dropped`, matching the hooks' rule that telemetry never
+    blocks or breaks an agent run.
+
+    All enqueued rows must share the same keys: each batch is written with
+    `Crud.create_many` (multi-row VALUES, no RETURNING) on a pooled connection.
+    With `idempotent=True` rows get `id`/`event_at` (the primary key) filled in
+    on enqueue and batches use `Crud.upsert_many(update_cols=[])`, so rows
+    re-sent with the same key are ignored.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_batch: int = 500,
+        max_delay: float = 0.2,
+        max_queue: int = 10_000,
+        idempotent: bool = False,
+    ) -> None:
+        if max_batch < 1 or max_queue < max_batch:
+            raise ValueError("Require 1 <= max_batch <= max_queue")
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.idempotent = idempotent
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self._buffer: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Number of rows buffered but not yet written."""
+        return len(self._buffer)
+
+    def enqueue(self, row: dict) -> None:
+        """Buffer a row for the next flush. Never blocks; drops when full or closed."""
+        if self._closed or len(self._buffer) >= self.max_queue:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Activity writer dropped %d events (buffer full)", self.dropped)
+            return
+        if self.idempotent:
+            row = with_activity_key(row)
+        self._buffer.append(row)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if len(self._buffer) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every buffered row now, in chunks of `max_batch`."""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.max_batch]
+                del self._buffer[: self.max_batch]
+                await self._write(batch)
+
+    async def aclose(self) -> None:
+        """Flush what is left and wait for the background task to finish. Idempotent.
+
+        The task is woken rather than cancelled: a cancel landing inside
+        `_write` would lose the batch already taken off the buffer.
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        # Exits when the buffer drains; enqueue() restarts it on the next event.
+        while self._buffer:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.max_delay)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _write(self, batch: list[dict]) -> None:
+        try:
+            if self.idempotent:
+                await _activity_crud.upsert_many(
+                    batch, conflict_cols=ACTIVITY_KEY, update_cols=[], returning=False
+                )
+            else:
+                await _activity_crud.create_many(batch, returning=False)
+            self.written += len(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to write %d agent activity events", len(batch))
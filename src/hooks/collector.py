@@ -0,0 +1,247 @@
+"""Per-host activity collector: agents send hook events over a Unix socket.
+
+depends_on:
+  - src/db/tables.py
+  - src/get_env.py
+  - src/hooks/activity_writer.py
+  - src/hooks/outbox.py
+  - src/hooks/serialize.py
+depended_by:
+  - src/hooks/activity_tracker.py
+  - src/hooks/__init__.py
+  - scripts/activity_collector.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    # once per host (owns the only connection pool)
+    python scripts/activity_collector.py
+
+    # in each agent process: no engine, no pool, just a socket
+    hooks = get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer", transport="uds")
+    ...
+    await get_collector_client().aclose()  # flush on shutdown
+
+Wire format: each event is a 4-byte big-endian length followed by the row as
+compact JSON (RowCodec). Clients stamp the primary key (`id`, `event_at`) on
+every row, and the collector inserts with ON CONFLICT DO NOTHING, so frames
+re-sent after a broken connection are written once. The writer needs the same
+keys on every row of a batch, so the collector projects each frame onto
+ACTIVITY_FIELDS, filling absent optional keys with NULL. Frames with unknown
+keys or without agent_name/hook_event are rejected and counted instead of
+failing a flush shared by every agent on the host.
+
+Clients never block a hook: frames are buffered in memory (bounded by
+`max_queue`, excess dropped and counted) and a background task writes them to
+the socket, reconnecting with a delay while the collector is down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+from pathlib import Path
+
+from src.db.tables import agent_activity
+from src.get_env import env
+from src.hooks.activity_writer import ACTIVITY_FIELDS, ActivityWriter, with_activity_key
+from src.hooks.outbox import ActivityOutbox
+from src.hooks.serialize import RowCodec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/team-agents-activity.sock"
+MAX_FRAME = 1 << 20
+_HEADER = 4
+
+_codec = RowCodec(agent_activity)
+_FIELDS = frozenset(ACTIVITY_FIELDS)
+_REQUIRED = ("agent_name", "hook_event")
+
+
+def socket_path(path: str | Path | None = None) -> Path:
+    """Explicit path, else PRJ_ACTIVITY_COLLECTOR_SOCKET, else DEFAULT_SOCKET."""
+    return Path(path or env("PRJ_ACTIVITY_COLLECTOR_SOCKET", default=None) or DEFAULT_SOCKET)
+
+
+def encode_frame(row: dict) -> bytes:
+    payload = _codec.encode(row).encode()
+    return len(payload).to_bytes(_HEADER, "big") + payload
+
+
+class CollectorClient:
+    """Hook-side writer that ships rows to an ActivityCollector.
+
+    Drop-in for ActivityWriter: hooks call `enqueue(row)`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        max_queue: int = 10_000,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.path = socket_path(path)
+        self.max_queue = max_queue
+        self.reconnect_delay = reconnect_delay
+        self.sent = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self._frames: list[bytes] = []
+        self._writer: asyncio.StreamWriter | None = None
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Frames buffered but not yet written to the socket."""
+        return len(self._frames)
+
+    def enqueue(self, row: dict) -> None:
+        """Buffer a row for the collector. Never blocks; drops when full or closed."""
+        if self._closed or len(self._frames) >= self.max_queue:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Collector client dropped %d events", self.dropped)
+            return
+        row = with_activity_key(row)
+        try:
+            self._frames.append(encode_frame(row))
+        except Exception:
+            self.dropped += 1
+            logger.exception("Failed to encode agent activity event")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def flush(self) -> None:
+        """Wait until every buffered frame has been handed to the socket."""
+        if self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        """Flush (up to `timeout` seconds) and close the connection. Idempotent."""
+        self._closed = True
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except TimeoutError:
+                logger.warning("Collector unreachable on close; %d events lost", self.pending)
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(OSError):
+                await self._writer.wait_closed()
+            self._writer = None
+
+    async def _run(self) -> None:
+        # Exits when the buffer drains; enqueue() restarts it on the next event.
+        while self._frames:
+            batch, self._frames = self._frames, []
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    _, self._writer = await asyncio.open_unix_connection(str(self.path))
+                self._writer.write(b"".join(batch))
+                await self._writer.drain()
+                self.sent += len(batch)
+            except OSError:
+                # Re-queue ahead of newer frames; duplicates are ignored by id.
+                keep = batch[: max(0, self.max_queue - len(self._frames))]
+                self._frames[:0] = keep
+                self.dropped += len(batch) - len(keep)
+                self._writer = None
+                self.reconnects += 1
+                logger.debug("Collector at %s unreachable, retrying", self.path, exc_info=True)
+                await asyncio.sleep(self.reconnect_delay)
+
+
+class ActivityCollector:
+    """Unix-socket server that funnels every client's rows into one writer/pool.
+
+    The default sink is an idempotent ActivityWriter; pass an ActivityOutbox to
+    also survive database outages and collector restarts.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        writer: ActivityWriter | ActivityOutbox | None = None,
+    ) -> None:
+        self.path = socket_path(path)
+        self.writer = writer or ActivityWriter(max_queue=100_000, idempotent=True)
+        self.received = 0
+        self.rejected = 0
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.Server | None = None
+
+    @property
+    def clients(self) -> int:
+        """Currently connected agent processes."""
+        return len(self._connections)
+
+    async def start(self) -> None:
+        """Bind the socket (replacing a stale one) and start accepting clients."""
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+        self._server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        os.chmod(self.path, 0o600)
+        logger.info("Activity collector listening on %s", self.path)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def aclose(self) -> None:
+        """Stop accepting clients, flush buffered rows, remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            for conn in list(self._connections):
+                conn.close()  # wait_closed() waits for open connections on 3.12+
+            await self._server.wait_closed()
+            self._server = None
+        await self.writer.aclose()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(_HEADER)
+                size = int.from_bytes(header, "big")
+                if size > MAX_FRAME:
+                    self.rejected += 1
+                    logger.warning("Dropping collector client: %d-byte frame", size)
+                    return
+                try:
+                    row = _codec.decode(await reader.readexactly(size))
+                except (TypeError, ValueError):
+                    self.rejected += 1
+                    continue
+                if row.keys() - _FIELDS or any(row.get(k) is None for k in _REQUIRED):
+                    self.rejected += 1
+                    logger.debug("Rejected collector frame with keys %s", sorted(row))
+                    continue
+                self.received += 1
+                self.writer.enqueue(with_activity_key({k: row.get(k) for k in ACTIVITY_FIELDS}))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client went away; a partial trailing frame is discarded
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+
+_client: CollectorClient | None = None
+
+
+def get_collector_client() -> CollectorClient:
+    """Process-wide CollectorClient shared by every `transport="uds"` hook set."""
+    global _client
+    if _client is None or _client._closed:
+        _client = CollectorClient()
+    return _client
@@ -7,10 +7,20 @@ depended_by:
   - src/hooks/__init__.py
   - tests/test_hooks.py
 semver: patch
+
+Usage:
+    await update_task_cost_from_result(task_id, result_message)  # one UPDATE per call
+
+    # Many subagents on one task: coalesce deltas in memory, flush periodically
+    ledger = CostLedger(interval=1.0)
+    await update_task_cost_from_result(task_id, result_message, ledger=ledger)
+    ledger.unflushed(task_id)  # cost not yet written to tasks.actual_cost_usd
+    await ledger.aclose()      # flush on shutdown
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from uuid import UUID
 
@@ -22,18 +32,107 @@ logger = logging.getLogger(__name__)
 _task_crud = Crud(tasks)
 
 
-async def update_task_cost_from_result(task_id: UUID, result_message) -> None:
+class CostLedger:
+    """Accumulates per-task cost deltas in memory and flushes them in one UPDATE.
+
+    With many parallel subagents reporting on the same task, one UPDATE per
+    ResultMessage serializes them all on that task's row lock. The ledger sums
+    deltas per task and a background task writes them every `interval` seconds
+    with a single `UPDATE tasks ... FROM (VALUES ...)` (Crud.increment_many).
+    A failed flush merges its deltas back, so they are retried on the next one.
+    Deltas added after `aclose()` are logged, counted in `dropped`, and
+    discarded: cost tracking never raises into the agent.
+    """
+
+    def __init__(self, *, interval: float = 1.0) -> None:
+        self.interval = interval
+        self.flushed_usd = 0.0
+        self.dropped = 0
+        self._pending: dict[UUID, float] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    def add(self, task_id: UUID, cost: float) -> None:
+        """Record a cost delta for a task. Never touches the database; drops when closed."""
+        if self._closed:
+            self.dropped += 1
+            logger.warning("CostLedger is closed; dropped $%.4f for task_id=%s", cost, task_id)
+            return
+        self._pending[task_id] = self._pending.get(task_id, 0.0) + cost
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unflushed(self, task_id: UUID | None = None) -> float:
+        """Cost recorded but not yet written, for one task or across all tasks."""
+        if task_id is None:
+            return sum(self._pending.values())
+        return self._pending.get(task_id, 0.0)
+
+    def unflushed_by_task(self) -> dict[UUID, float]:
+        """Snapshot of unflushed cost per task."""
+        return dict(self._pending)
+
+    async def flush(self) -> int:
+        """Write all pending deltas now. Returns the number of tasks updated."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            deltas, self._pending = self._pending, {}
+            try:
+                updated = await _task_crud.increment_many("actual_cost_usd", deltas)
+            except Exception:
+                for task_id, cost in deltas.items():
+                    self._pending[task_id] = self._pending.get(task_id, 0.0) + cost
+                logger.exception("Failed to flush cost ledger for %d tasks", len(deltas))
+                return 0
+            self.flushed_usd += sum(deltas.values())
+            return updated
+
+    async def aclose(self) -> None:
+        """Flush what is left and wait for the background task to finish. Idempotent.
+
+        The task is woken rather than cancelled, so a flush already in
+        progress completes instead of losing the deltas it took.
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        # Exits once everything is flushed or the ledger closes; add() restarts it.
+        while self._pending and not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+            await self.flush()
+
+
+async def update_task_cost_from_result(
+    task_id: UUID, result_message, *, ledger: CostLedger | None = None
+) -> None:
     """Atomically add result_message cost to tasks.actual_cost_usd.
 
     Args:
         task_id: The task to update.
         result_message: A claude_agent_sdk.ResultMessage (or any object with
             a `total_cost_usd` float attribute).
+        ledger: Optional CostLedger. When given, the cost is recorded in memory
+            and written by the ledger's next flush instead of immediately.
     """
     cost = getattr(result_message, "total_cost_usd", None)
     if cost is None or cost <= 0:
         return
 
+    if ledger is not None:
+        ledger.add(task_id, cost)
+        return
+
     try:
         await _task_crud.increment(task_id, "actual_cost_usd", cost)
     except Exception:
@@ -0,0 +1,126 @@
+"""In-process tool latency percentiles, updated from the PostToolUse hook.
+
+depends_on:
+  - src/analytics/sketch.py
+depended_by:
+  - src/hooks/activity_tracker.py
+  - src/hooks/__init__.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    from src.hooks import get_latency_recorder
+
+    recorder = get_latency_recorder()      # fed by every get_activity_hooks() set
+    recorder.quantiles("Read")             # {0.5: 38.2, 0.95: 121.7, 0.99: 480.3}
+    recorder.quantiles(agent_name="code-reviewer")
+
+    # Ship to another host / process and merge there
+    blob = recorder.snapshot(reset=True)   # {(agent_name, tool_name): bytes}
+    other.merge_snapshot(blob)
+
+One LatencySketch per (agent_name, tool_name), so memory is bounded by
+`max_keys` x the sketch's `max_bins` regardless of how many events are seen.
+Recording is a dict lookup plus one log(), cheap enough for the hook path.
+Durable, queryable percentiles come from the hourly rollups
+(src/analytics/rollup.py); this recorder answers "how is this process doing
+right now" without a database round-trip.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Mapping, Sequence
+
+from src.analytics.sketch import DEFAULT_ACCURACY, LatencySketch
+
+logger = logging.getLogger(__name__)
+
+RecorderKey = tuple[str, str]
+
+
+class LatencyRecorder:
+    """Bounded set of per-(agent, tool) latency sketches."""
+
+    def __init__(
+        self, *, max_keys: int = 1000, relative_accuracy: float = DEFAULT_ACCURACY
+    ) -> None:
+        if max_keys < 1:
+            raise ValueError("max_keys must be >= 1")
+        self.max_keys = max_keys
+        self.relative_accuracy = relative_accuracy
+        self.dropped = 0
+        self._sketches: dict[RecorderKey, LatencySketch] = {}
+
+    def __len__(self) -> int:
+        return len(self._sketches)
+
+    def _sketch(self, key: RecorderKey) -> LatencySketch | None:
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            if len(self._sketches) >= self.max_keys:
+                self.dropped += 1
+                if self.dropped == 1:
+                    logger.warning(
+                        "LatencyRecorder full (%d keys); dropping new keys", self.max_keys
+                    )
+                return None
+            sketch = self._sketches[key] = LatencySketch(self.relative_accuracy)
+        return sketch
+
+    def record(
+        self, tool_name: str, duration_ms: float | None, agent_name: str = "unknown"
+    ) -> None:
+        """Count one tool call; None or negative durations are ignored."""
+        if duration_ms is None or duration_ms < 0:
+            return
+        sketch = self._sketch((agent_name, tool_name))
+        if sketch is not None:
+            sketch.add(duration_ms)
+
+    def sketch(self, tool_name: str | None = None, agent_name: str | None = None) -> LatencySketch:
+        """Merged sketch of every key matching the given tool and/or agent."""
+        return LatencySketch.merged(
+            s
+            for (agent, tool), s in self._sketches.items()
+            if (tool_name is None or tool == tool_name)
+            and (agent_name is None or agent == agent_name)
+        )
+
+    def quantiles(
+        self,
+        tool_name: str | None = None,
+        agent_name: str | None = None,
+        qs: Sequence[float] = (0.5, 0.95, 0.99),
+    ) -> dict[float, float | None]:
+        """{q: duration_ms} for matching keys; values are None with no samples."""
+        sketch = self.sketch(tool_name, agent_name)
+        return {q: sketch.quantile(q) for q in qs}
+
+    def snapshot(self, *, reset: bool = False) -> dict[RecorderKey, bytes]:
+        """Encoded sketches per key, e.g. to flush to another process or host."""
+        out = {key: s.to_bytes() for key, s in self._sketches.items() if s.count}
+        if reset:
+            self._sketches.clear()
+        return out
+
+    def merge_snapshot(
+        self, snapshot: Mapping[RecorderKey, bytes] | Iterable[tuple[RecorderKey, bytes]]
+    ) -> None:
+        """Fold another recorder's `snapshot()` into this one."""
+        items = snapshot.items() if isinstance(snapshot, Mapping) else snapshot
+        for key, blob in items:
+            sketch = self._sketch(tuple(key))
+            if sketch is not None:
+                sketch.merge(LatencySketch.from_bytes(blob))
+
+
+_recorder: LatencyRecorder | None = None
+
+
+def get_latency_recorder() -> LatencyRecorder:
+    """Process-wide recorder shared by hook sets created without `latency=`."""
+    global _recorder
+    if _recorder is None:
+        _recorder = LatencyRecorder()
+    return _recorder
@@ -0,0 +1,244 @@
+"""Durable local outbox for agent_activity events (SQLite, WAL mode).
+
+depends_on:
+  - src/db/crud.py
+  - src/db/tables.py
+  - src/get_env.py
+  - src/hooks/activity_writer.py
+  - src/hooks/serialize.py
+depended_by:
+  - src/hooks/activity_tracker.py
+  - src/hooks/collector.py
+  - src/hooks/__init__.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    from src.hooks import ActivityOutbox, get_activity_hooks
+
+    outbox = ActivityOutbox()  # PRJ_ACTIVITY_OUTBOX_PATH or ./.activity_outbox.sqlite3
+    hooks = get_activity_hooks(task_id=my_task_id, agent_name="code-reviewer", writer=outbox)
+    ...
+    await outbox.aclose()  # final drain attempt; undelivered rows stay on disk
+
+Hooks append to a local SQLite file (one autocommit INSERT, tens of µs) and
+never wait on Postgres. A drainer task replays the outbox in batches with
+INSERT ... ON CONFLICT (id, event_at) DO NOTHING. Every row gets a client-side
+UUID and timestamp when enqueued, so a batch that is replayed after a crash or a timed-out-but-
+committed INSERT is written exactly once. While Postgres is unreachable the
+drainer backs off exponentially and rows accumulate on disk; the next process
+to open the same file delivers them.
+
+A batch is sent as one INSERT per distinct set of row keys, so a row enqueued
+with extra or missing keys cannot fail the rows around it. Errors are split
+by whether a retry could help: connection errors (OSError, OperationalError,
+InterfaceError and anything unrecognised) leave the batch queued for the
+back-off loop, while errors the same rows will always hit (an undecodable
+payload, an unknown column, a value Postgres rejects) are permanent. A group
+that fails permanently is bisected down to the offending rows, which move to
+the `outbox_dead` table instead of blocking the rows queued behind them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+from pathlib import Path
+
+from sqlalchemy import exc as sa_exc
+
+from src.db.crud import Crud
+from src.db.tables import agent_activity
+from src.get_env import env
+from src.hooks.activity_writer import ACTIVITY_KEY, with_activity_key
+from src.hooks.serialize import RowCodec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = ".activity_outbox.sqlite3"
+
+_activity_crud = Crud(agent_activity, use_connection=True)
+
+# Raised for the rows themselves, so resending them unchanged can never succeed.
+PERMANENT_ERRORS = (ValueError, sa_exc.CompileError, sa_exc.DataError, sa_exc.IntegrityError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox_dead (
+    seq INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    error TEXT NOT NULL
+);
+"""
+
+
+class ActivityOutbox:
+    """Append-only SQLite outbox with an async drainer into agent_activity.
+
+    Drop-in for ActivityWriter: hooks call `enqueue(row)`. The drainer starts
+    lazily on the first enqueue (or `start()`), sends up to `batch_size` rows per
+    round trip, and deletes them from the file only after Postgres accepted them.
+    Failed batches stay queued; the retry delay doubles from `interval` up to
+    `max_backoff` and resets after the next success.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        batch_size: int = 500,
+        interval: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.path = Path(path or env("PRJ_ACTIVITY_OUTBOX_PATH", default=None) or DEFAULT_PATH)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.written = 0
+        self.failed_attempts = 0
+        self.dropped = 0
+        self.quarantined = 0
+        self._codec = RowCodec(agent_activity)
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._drain_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Rows on disk not yet delivered to Postgres."""
+        return self._db.execute("SELECT count(*) FROM outbox").fetchone()[0]
+
+    def enqueue(self, row: dict) -> None:
+        """Append a row to the outbox. Never raises; assigns `id`/`event_at` if missing."""
+        if self._closed:
+            self.dropped += 1
+            return
+        row = with_activity_key(row)
+        try:
+            payload = self._codec.encode(row)
+            self._db.execute("INSERT INTO outbox (payload) VALUES (?)", (payload,))
+        except Exception:
+            self.dropped += 1
+            logger.exception("Failed to append agent activity event to outbox")
+            return
+        self.start()
+
+    def start(self) -> None:
+        """Start the background drainer if it is not already running."""
+        if self._closed or (self._task is not None and not self._task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; rows wait on disk for the next start()
+        self._task = loop.create_task(self._run())
+
+    async def drain(self) -> int:
+        """Deliver queued rows until the outbox is empty or a batch fails.
+
+        Returns the number of rows delivered. Raises the transient error of a
+        failed batch; its undelivered rows stay queued. Rows that fail with one
+        of PERMANENT_ERRORS are quarantined in `outbox_dead` and counted in
+        `quarantined`.
+        """
+        delivered = 0
+        async with self._drain_lock:
+            while True:
+                batch = self._db.execute(
+                    "SELECT seq, payload FROM outbox ORDER BY seq LIMIT ?", (self.batch_size,)
+                ).fetchall()
+                if not batch:
+                    return delivered
+                groups: dict[frozenset[str], list[tuple[int, str, dict]]] = {}
+                for seq, payload in batch:
+                    try:
+                        row = self._codec.decode(payload)
+                    except (TypeError, ValueError) as e:
+                        self._quarantine([(seq, payload)], e)
+                        continue
+                    groups.setdefault(frozenset(row), []).append((seq, payload, row))
+                for group in groups.values():
+                    delivered += await self._deliver(group)
+
+    async def _deliver(self, group: list[tuple[int, str, dict]]) -> int:
+        """Insert one group, bisecting a permanent failure down to the bad rows.
+
+        Returns the rows delivered; transient errors propagate with the group
+        still queued. Re-sending rows that did land is harmless: the insert is
+        ON CONFLICT DO NOTHING on their client-assigned keys.
+        """
+        try:
+            await _activity_crud.upsert_many(
+                [row for _, _, row in group],
+                conflict_cols=ACTIVITY_KEY,
+                update_cols=[],
+                returning=False,
+            )
+        except PERMANENT_ERRORS as e:
+            if len(group) == 1:
+                self._quarantine([(seq, payload) for seq, payload, _ in group], e)
+                return 0
+            mid = len(group) // 2
+            return await self._deliver(group[:mid]) + await self._deliver(group[mid:])
+        self._db.executemany("DELETE FROM outbox WHERE seq = ?", [(seq,) for seq, _, _ in group])
+        self.written += len(group)
+        return len(group)
+
+    def _quarantine(self, entries: list[tuple[int, str]], error: Exception) -> None:
+        """Move rows that can never be delivered out of the queue."""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO outbox_dead (seq, payload, error) VALUES (?, ?, ?)",
+            [(seq, payload, str(error)) for seq, payload in entries],
+        )
+        self._db.executemany("DELETE FROM outbox WHERE seq = ?", [(seq,) for seq, _ in entries])
+        self.quarantined += len(entries)
+        logger.error("Quarantined %d undeliverable outbox rows: %s", len(entries), error)
+
+    async def aclose(self) -> None:
+        """Stop the drainer, try one final drain, and close the file. Idempotent."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.drain()
+        except Exception:
+            logger.warning(
+                "Outbox drain on close failed; %d events kept on disk", self.pending, exc_info=True
+            )
+        self._db.close()
+
+    async def _run(self) -> None:
+        # Sleeping before each drain lets events from the interval share a batch.
+        delay = self.interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.drain()
+            except Exception:
+                self.failed_attempts += 1
+                delay = min(delay * 2, self.max_backoff)
+                logger.warning(
+                    "Outbox drain failed (%d pending), retrying in %.1fs",
+                    self.pending,
+                    delay,
+                    exc_info=True,
+                )
+                continue
+            return  # drained; enqueue() restarts the drainer
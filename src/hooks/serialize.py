@@ -0,0 +1,258 @@
+"""Size-capped summaries of tool inputs/responses, and the JSON row codec for hooks.
+
+depends_on: []
+depended_by:
+  - src/hooks/activity_tracker.py
+  - src/hooks/collector.py
+  - src/hooks/outbox.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    from src.hooks.serialize import bounded_repr, register_summarizer, summarize_input
+
+    bounded_repr({"content": "x" * 10_000_000}, limit=80)  # stops after ~80 chars
+
+    @register_summarizer("MyTool")
+    def _my_tool(tool_input: dict) -> str:
+        return f"target={tool_input.get('target')}"
+
+Cost per event is bounded by `limit`, not by payload size: strings are sliced
+before repr(), containers stop iterating once the budget is spent, and
+unrecognised objects are summarised by type name instead of calling repr().
+
+RowCodec turns agent_activity rows into compact JSON and back (UUIDs and
+timestamps restored from the table's column types) for the outbox file and the
+collector socket.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import sqlalchemy as sa
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_LIMIT = 2000
+MAX_DEPTH = 6
+_ELLIPSIS = "..."
+_SCALARS = (int, float, bool, type(None))
+
+Summarizer = Callable[[Any], str]
+
+_INPUT_SUMMARIZERS: dict[str, Summarizer] = {}
+_RESPONSE_SUMMARIZERS: dict[str, Summarizer] = {}
+
+
+class _Full(Exception):
+    """Raised internally once the output budget is exhausted."""
+
+
+class _Writer:
+    __slots__ = ("parts", "remaining")
+
+    def __init__(self, limit: int) -> None:
+        self.parts: list[str] = []
+        self.remaining = limit
+
+    def write(self, text: str) -> None:
+        if len(text) >= self.remaining:
+            self.parts.append(text[: self.remaining])
+            self.remaining = 0
+            raise _Full
+        self.parts.append(text)
+        self.remaining -= len(text)
+
+
+def _emit(value: Any, out: _Writer, depth: int) -> None:
+    if isinstance(value, str):
+        # +2 leaves room for the quotes; escapes only make repr() longer.
+        out.write(repr(value[: out.remaining + 2]))
+    elif isinstance(value, _SCALARS):
+        out.write(repr(value))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out.write(f"<{len(value)} bytes>")
+    elif depth >= MAX_DEPTH:
+        out.write(_ELLIPSIS)
+    elif isinstance(value, dict):
+        out.write("{")
+        for i, (k, v) in enumerate(value.items()):
+            if i:
+                out.write(", ")
+            _emit(k, out, depth + 1)
+            out.write(": ")
+            _emit(v, out, depth + 1)
+        out.write("}")
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        if isinstance(value, list):
+            open_, close = "[", "]"
+        elif isinstance(value, tuple):
+            open_, close = "(", ",)" if len(value) == 1 else ")"
+        elif value:
+            open_, close = "{", "}"
+        else:
+            open_, close = "set(", ")"
+        out.write(open_)
+        for i, item in enumerate(value):
+            if i:
+                out.write(", ")
+            _emit(item, out, depth + 1)
+        out.write(close)
+    else:
+        out.write(f"<{type(value).__name__}>")
+
+
+def bounded_repr(value: Any, limit: int = SUMMARY_LIMIT) -> str:
+    """repr()-like rendering that stops as soon as `limit` characters are produced.
+
+    Output matches `str(value)` for JSON-shaped data that fits. Longer output is
+    cut to `limit` characters ending in "...", like `_truncate`.
+    """
+    out = _Writer(limit + 1)  # one extra char detects overflow
+    try:
+        _emit(value, out, 0)
+    except _Full:
+        pass
+    text = "".join(out.parts)
+    if len(text) <= limit:
+        return text
+    return text[: limit - len(_ELLIPSIS)] + _ELLIPSIS
+
+
+def bounded_text(text: str, limit: int = SUMMARY_LIMIT) -> str:
+    """Slice a string to `limit` characters (ending in "..."), without copying the rest."""
+    if len(text) <= limit:
+        return text
+    return text[: limit - len(_ELLIPSIS)] + _ELLIPSIS
+
+
+def register_summarizer(
+    tool_name: str, *, response: bool = False
+) -> Callable[[Summarizer], Summarizer]:
+    """Decorator registering a summarizer for a tool's input (or response).
+
+    Summarizers should only read cheap attributes (keys, len()) so their cost
+    stays independent of payload size. Output is still capped by the caller.
+    """
+    registry = _RESPONSE_SUMMARIZERS if response else _INPUT_SUMMARIZERS
+
+    def decorator(fn: Summarizer) -> Summarizer:
+        registry[tool_name] = fn
+        return fn
+
+    return decorator
+
+
+def _summarize(registry: dict[str, Summarizer], tool_name: str | None, value: Any, limit: int):
+    if value is None:
+        return None
+    fn = registry.get(tool_name) if tool_name else None
+    if fn is not None:
+        try:
+            return bounded_text(fn(value), limit)
+        except Exception:
+            logger.debug("Summarizer for %s failed; using bounded repr", tool_name, exc_info=True)
+    if isinstance(value, str):
+        return bounded_text(value, limit)
+    return bounded_repr(value, limit)
+
+
+def summarize_input(
+    tool_name: str | None, tool_input: Any, limit: int = SUMMARY_LIMIT
+) -> str | None:
+    """Summary of a tool input: registered summarizer, else bounded repr."""
+    return _summarize(_INPUT_SUMMARIZERS, tool_name, tool_input, limit)
+
+
+def summarize_response(
+    tool_name: str | None, tool_response: Any, limit: int = SUMMARY_LIMIT
+) -> str | None:
+    """Summary of a tool response: registered summarizer, else bounded text/repr."""
+    return _summarize(_RESPONSE_SUMMARIZERS, tool_name, tool_response, limit)
+
+
+# ── Built-in summarizers ────────────────────────────────────────────
+
+
+def _size(value: Any) -> str:
+    return f"<{len(value)} chars>" if isinstance(value, str) else bounded_repr(value, 200)
+
+
+@register_summarizer("Read")
+def _read_input(tool_input: dict) -> str:
+    parts = [f"file_path={tool_input.get('file_path')}"]
+    for key in ("offset", "limit"):
+        if tool_input.get(key) is not None:
+            parts.append(f"{key}={tool_input[key]}")
+    return " ".join(parts)
+
+
+@register_summarizer("Read", response=True)
+def _read_response(tool_response: Any) -> str:
+    return _size(tool_response)
+
+
+@register_summarizer("Write")
+def _write_input(tool_input: dict) -> str:
+    return f"file_path={tool_input.get('file_path')} content={_size(tool_input.get('content', ''))}"
+
+
+@register_summarizer("Edit")
+def _edit_input(tool_input: dict) -> str:
+    return (
+        f"file_path={tool_input.get('file_path')}"
+        f" old_string={_size(tool_input.get('old_string', ''))}"
+        f" new_string={_size(tool_input.get('new_string', ''))}"
+    )
+
+
+@register_summarizer("MultiEdit")
+def _multi_edit_input(tool_input: dict) -> str:
+    return f"file_path={tool_input.get('file_path')} edits={len(tool_input.get('edits') or ())}"
+
+
+# ── Row codec ───────────────────────────────────────────────────────
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Unsupported row value type: {type(value).__name__}")
+
+
+class RowCodec:
+    """Compact JSON encoding of table rows that restores UUID and timestamp columns."""
+
+    def __init__(self, table: sa.Table) -> None:
+        self.table = table
+        self._decoders: dict[str, Callable[[str], Any]] = {}
+        for col in table.c:
+            if isinstance(col.type, sa.UUID):
+                self._decoders[col.name] = UUID
+            elif isinstance(col.type, sa.DateTime):
+                self._decoders[col.name] = datetime.fromisoformat
+
+    def encode(self, row: dict) -> str:
+        return json.dumps(row, default=_json_default, separators=(",", ":"))
+
+    def decode(self, payload: str | bytes) -> dict:
+        """Parse one encoded row.
+
+        Raises ValueError for malformed JSON and TypeError for valid JSON that is
+        not an object.
+        """
+        row = json.loads(payload)
+        if not isinstance(row, dict):
+            raise TypeError(f"Expected a JSON object, got {type(row).__name__}")
+        for key, parse in self._decoders.items():
+            if row.get(key) is not None:
+                row[key] = parse(row[key])
+        return row
@@ -0,0 +1,99 @@
+"""Bounded, TTL-evicting start-time map pairing PreToolUse with PostToolUse.
+
+depends_on: []
+depended_by:
+  - src/hooks/activity_tracker.py
+  - src/hooks/__init__.py
+  - tests/test_hooks.py
+semver: minor
+
+Usage:
+    from src.hooks import ToolTimer, get_activity_hooks
+
+    timer = ToolTimer(max_entries=10_000, ttl_s=3600)
+    hooks = get_activity_hooks(agent_name="code-reviewer", timer=timer)
+    ...
+    timer.stats()  # {"in_flight": 3, "orphaned": 0, "unmatched": 0}
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class ToolTimer:
+    """Tracks in-flight tool calls and returns their duration on completion.
+
+    Entries are keyed by the SDK's `tool_use_id`, which is unique per call, so
+    parallel calls of the same tool in one session don't overwrite each other.
+    Callers without an id fall back to `(session_id, tool_name)`.
+
+    Memory is bounded: starts older than `ttl_s` are evicted lazily on the next
+    `start()`, and the oldest entry is evicted once `max_entries` is reached.
+    Either way the entry is counted in `orphaned` (a PreToolUse whose PostToolUse
+    never arrived). `finish()` calls with no matching start count as `unmatched`.
+    """
+
+    def __init__(self, *, max_entries: int = 10_000, ttl_s: float = 3600.0) -> None:
+        if max_entries < 1 or ttl_s <= 0:
+            raise ValueError("Require max_entries >= 1 and ttl_s > 0")
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.orphaned = 0
+        self.unmatched = 0
+        # Insertion order == start order, so the oldest entry is always first.
+        self._starts: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @staticmethod
+    def key(tool_use_id: str | None, session_id: str | None, tool_name: str | None) -> Hashable:
+        """Correlation key: the tool-use id when present, else (session_id, tool_name)."""
+        return tool_use_id if tool_use_id is not None else (session_id, tool_name)
+
+    def start(self, key: Hashable, now: float | None = None) -> None:
+        """Record a start time for `key`, evicting expired or excess entries first."""
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        if key in self._starts:
+            # Re-used key (fallback keys only): the earlier call never finished.
+            del self._starts[key]
+            self.orphaned += 1
+        self._starts[key] = now
+
+    def finish(self, key: Hashable, now: float | None = None) -> int | None:
+        """Pop `key` and return elapsed milliseconds, or None if it was never started."""
+        start = self._starts.pop(key, None)
+        if start is None:
+            self.unmatched += 1
+            return None
+        now = time.monotonic() if now is None else now
+        return int((now - start) * 1000)
+
+    def stats(self) -> dict[str, int]:
+        """In-flight count plus orphaned/unmatched counters."""
+        return {
+            "in_flight": len(self._starts),
+            "orphaned": self.orphaned,
+            "unmatched": self.unmatched,
+        }
+
+    def _evict(self, now: float) -> None:
+        starts = self._starts
+        cutoff = now - self.ttl_s
+        evicted = 0
+        while starts:
+            key, started = next(iter(starts.items()))
+            if started > cutoff and len(starts) < self.max_entries:
+                break
+            del starts[key]
+            evicted += 1
+        if evicted:
+            self.orphaned += evicted
+            logger.debug("Evicted %d orphaned tool start times", evicted)
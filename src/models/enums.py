@@ -7,6 +7,9 @@ depended_by:
   - src/models/subtask.py
   - src/models/agent_activity.py
   - src/db/tables.py
+  - src/graph/scheduler.py
+  - src/sync/github_project.py
+  - src/sync/rate_limit.py
 semver: major
 """
 
@@ -38,6 +38,8 @@ class Task(BaseEntity):
     due_at: datetime | None = None
     github_issue_number: int | None = Field(default=None, ge=1)
     github_project_item_id: str | None = Field(default=None, max_length=50)
+    github_sync_hash: str | None = Field(default=None, max_length=64)
+    github_synced_at: datetime | None = None
     blocker_ids: list[UUID] = Field(default_factory=list)
     subtask_ids: list[UUID] = Field(default_factory=list)
 
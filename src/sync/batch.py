@@ -0,0 +1,182 @@
+"""Concurrent GitHub sync of many tasks with bounded parallelism.
+
+depends_on:
+  - src/sync/github_project.py
+  - src/sync/graphql.py
+  - src/sync/rate_limit.py
+depended_by:
+  - scripts/sync_github.py
+  - tests/test_sync.py
+semver: minor
+
+Usage:
+    from src.sync.batch import sync_tasks
+
+    summary = await sync_tasks(task_ids, concurrency=8, timeout=300)
+    summary = await sync_tasks(task_ids, client=GraphQLClient.from_env())  # batched
+    print(summary.to_dict())   # {"total": 500, "succeeded": 497, "failed": 2, "timed_out": 1, ...}
+
+Each task still runs its gh calls in order (create issue, add to project, set
+status), but up to `concurrency` tasks are in flight at once. So end-to-end
+time drops roughly linearly with concurrency until the shared Pacer
+(src/sync/rate_limit.py) becomes the bottleneck, which GitHub's rate limits
+require anyway. Tasks start in input order. When the Pacer is the bottleneck,
+in-progress and high-priority tasks' requests go first.
+
+With a GraphQLClient, tasks go out in aliased batches
+(src/sync/github_project.py: sync_tasks_graphql), a handful of HTTP requests
+per 25 tasks instead of ~100 gh processes. A batch that fails before sending
+any mutation (no API access, unknown project) is retried through gh, task by
+task. Later failures stay per-task errors: gh would create duplicate issues.
+
+A failing or timed-out task never stops the batch. Every task gets a
+SyncResult, and the summary aggregates them. Timeouts count only time a
+task or batch spends working, not time queued in the shared Pacer: with
+hundreds of tasks most of the run is spent waiting for write tokens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from src.sync.github_project import sync_task_to_github, sync_tasks_graphql
+from src.sync.graphql import GraphQLClient
+from src.sync.rate_limit import Pacer, wait_for_active
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncResult:
+    task_id: UUID
+    ok: bool
+    seconds: float
+    github_issue_number: int | None = None
+    error: str | None = None
+    timed_out: bool = False
+
+
+@dataclass
+class SyncSummary:
+    total: int
+    concurrency: int
+    elapsed: float = 0.0
+    results: list[SyncResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(r.ok for r in self.results)
+
+    @property
+    def timed_out(self) -> int:
+        return sum(r.timed_out for r in self.results)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded - self.timed_out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "concurrency": self.concurrency,
+            "elapsed_s": round(self.elapsed, 2),
+            "tasks_per_s": round(len(self.results) / self.elapsed, 2) if self.elapsed else None,
+            "errors": {str(r.task_id): r.error for r in self.results if not r.ok},
+        }
+
+
+async def sync_tasks(
+    task_ids: Iterable[UUID],
+    *,
+    concurrency: int = 8,
+    timeout: float | None = 300.0,
+    pacer: Pacer | None = None,
+    client: GraphQLClient | None = None,
+    on_result: Callable[[SyncResult, int, int], None] | None = None,
+) -> SyncSummary:
+    """Sync tasks to GitHub with at most `concurrency` in flight.
+
+    Args:
+        task_ids: Tasks to sync.
+        concurrency: Maximum tasks (or, with `client`, batches) syncing at once.
+        timeout: Per-task (or per-batch) limit in seconds, None for no limit.
+            Time queued in the Pacer is not counted. A timed-out task's
+            running gh process is killed.
+        pacer: Request spacing for the gh path; defaults to a new Pacer().
+            The GraphQL path uses `client.pacer`.
+        client: Sync in batches of `client.max_batch` over GraphQL. A batch
+            that fails before any mutation is sent falls back to gh per task.
+        on_result: Progress callback, called as on_result(result, done, total).
+
+    Returns:
+        SyncSummary with one SyncResult per task, in input order.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    ids = list(task_ids)
+    pacer = pacer or Pacer()
+    semaphore = asyncio.Semaphore(concurrency)
+    summary = SyncSummary(total=len(ids), concurrency=concurrency)
+    done = 0
+
+    def finish(task_id: UUID, outcome: dict | BaseException, seconds: float) -> SyncResult:
+        nonlocal done
+        if isinstance(outcome, TimeoutError):
+            result = SyncResult(
+                task_id, False, seconds, error=f"timed out after {timeout}s", timed_out=True
+            )
+        elif isinstance(outcome, BaseException):
+            logger.warning("GitHub sync failed for task %s: %s", task_id, outcome)
+            result = SyncResult(task_id, False, seconds, error=str(outcome))
+        else:
+            result = SyncResult(
+                task_id, True, seconds, github_issue_number=outcome["github_issue_number"]
+            )
+        done += 1
+        if on_result is not None:
+            on_result(result, done, len(ids))
+        return result
+
+    async def run_one(task_id: UUID) -> list[SyncResult]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                outcome = await wait_for_active(sync_task_to_github(task_id, pacer=pacer), timeout)
+            except Exception as e:  # noqa: BLE001 - any failure becomes this task's SyncResult
+                outcome = e
+        return [finish(task_id, outcome, time.perf_counter() - start)]
+
+    async def run_chunk(chunk: list[UUID]) -> list[SyncResult]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                outcomes = await wait_for_active(sync_tasks_graphql(chunk, client), timeout)
+            except TimeoutError as e:
+                outcomes = dict.fromkeys(chunk, e)
+            except Exception as e:  # noqa: BLE001 - raised only before any mutation was sent
+                logger.warning("GraphQL sync failed (%s); using gh for %d tasks", e, len(chunk))
+                outcomes = None
+        if outcomes is None:
+            return [r for rs in await asyncio.gather(*(run_one(t) for t in chunk)) for r in rs]
+        seconds = time.perf_counter() - start
+        return [finish(task_id, outcomes[task_id], seconds) for task_id in chunk]
+
+    if client is None:
+        jobs = [run_one(task_id) for task_id in ids]
+    else:
+        size = client.max_batch
+        jobs = [run_chunk(ids[i : i + size]) for i in range(0, len(ids), size)]
+
+    start = time.perf_counter()
+    summary.results = [r for results in await asyncio.gather(*jobs) for r in results]
+    summary.elapsed = time.perf_counter() - start
+    return summary
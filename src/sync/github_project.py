@@ -1,30 +1,76 @@
-"""Sync tasks to GitHub Issues + Projects v2 via gh CLI.
+"""Sync tasks to GitHub Issues + Projects v2 via gh CLI or batched GraphQL.
 
 depends_on:
   - src/get_env.py
   - src/db/engine.py
   - src/db/tables.py
+  - src/sync/graphql.py
+  - src/sync/rate_limit.py
 depended_by:
+  - src/sync/batch.py
   - scripts/sync_github.py
+  - tests/test_sync.py
 semver: minor
+
+Usage:
+    from src.sync.github_project import sync_task_to_github, sync_tasks_graphql
+
+    await sync_task_to_github(task_id)                  # 3-4 gh processes, one task
+    results = await sync_tasks_graphql(task_ids, client) # a few aliased GraphQL requests
+
+    for row in await select_tasks_to_sync(["pending", "in_progress", "blocked"]):
+        ...                                              # only tasks whose content changed
+
+Both paths store the same issue number and project item node id, so a task
+can move between them freely. sync_tasks_graphql runs each step for all tasks
+at once: look up issue ids, create or update issues, add project items, set
+statuses. Each step is one request per 25 tasks. A failure is recorded per
+task and drops only that task from later steps; when a whole request fails,
+only the tasks in that request fail, and the results of the step's other
+requests are kept. On both paths a new issue's number is stored as soon as the issue is
+created, so a failure in a later step does not create a second issue on the
+next run.
+
+Change detection: each sync stores github_sync_hash (SHA-256 of title,
+description, status) and github_synced_at. select_tasks_to_sync reads only
+tasks with `updated_at > github_synced_at`, i.e. touched since their last
+sync, and returns those whose hash differs. So a steady-state run costs one
+indexed read plus work proportional to churn. Tasks touched without a
+relevant change (e.g. a cost update) have github_synced_at bumped so they
+are not re-read next time.
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 from uuid import UUID
 
 import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.db.engine import get_session_factory
-from src.db.tables import tasks, subtasks
+from src.db.tables import subtasks, tasks
 from src.get_env import env
 from src.models.enums import SubtaskType, TaskStatus
+from src.sync.graphql import GraphQLClient, GraphQLError, Operation
+from src.sync.rate_limit import Pacer, Priority, is_rate_limited, sync_priority
 
 logger = logging.getLogger(__name__)
 
+
+def sync_hash(title: str, description: str | None, status: str) -> str:
+    """SHA-256 over the fields that are pushed to GitHub."""
+    payload = json.dumps([title, description or "", getattr(status, "value", status)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _row_hash(row) -> str:
+    return sync_hash(row["title"], row["description"], row["status"])
+
+
 # Map TaskStatus → GitHub Project status field value
 _STATUS_MAP = {
     TaskStatus.pending: "Todo",
@@ -36,23 +82,50 @@ _STATUS_MAP = {
 }
 
 
-async def _run_gh(*args: str) -> str:
-    """Run a gh CLI command and return stdout."""
-    proc = await asyncio.create_subprocess_exec(
-        "gh",
-        *args,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await proc.communicate()
-    if proc.returncode != 0:
-        raise RuntimeError(f"gh {' '.join(args)} failed: {stderr.decode().strip()}")
-    return stdout.decode().strip()
+async def _run_gh(
+    *args: str,
+    pacer: Pacer | None = None,
+    priority: Priority = Priority.normal,
+    retries: int = 3,
+) -> str:
+    """Run a gh CLI command and return stdout.
 
+    With a pacer, calls are queued by `priority` and paced, and a rate limit
+    response is retried up to `retries` times after a jittered exponential
+    pause. A cancelled call (e.g. a timeout) kills its gh process.
+    """
+    attempt = 0
+    while True:
+        if pacer is not None:
+            await pacer.wait(priority=priority)
+        proc = await asyncio.create_subprocess_exec(
+            "gh",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+        if proc.returncode == 0:
+            return stdout.decode().strip()
+        error = stderr.decode().strip()
+        if pacer is None or not is_rate_limited(error) or attempt == retries:
+            raise RuntimeError(f"gh {' '.join(args)} failed: {error}")
+        wait = pacer.retry_delay(attempt)
+        logger.warning("GitHub rate limit hit; pausing sync for %.0fs", wait)
+        pacer.back_off(wait)
+        attempt += 1
 
-async def sync_task_to_github(task_id: UUID) -> dict:
+
+async def sync_task_to_github(task_id: UUID, *, pacer: Pacer | None = None) -> dict:
     """Create or update a GitHub issue and project item for a task.
 
+    Pass a shared Pacer when syncing tasks concurrently (see src/sync/batch.py).
+
     Returns dict with github_issue_number and github_project_item_id.
     """
     repo = env("PRJ_GITHUB_REPO")
@@ -67,9 +140,11 @@ async def sync_task_to_github(task_id: UUID) -> dict:
         )
         if row is None:
             raise ValueError(f"Task {task_id} not found")
+        row = dict(row)
 
     title = row["title"]
     description = row["description"] or ""
+    priority = sync_priority(row["status"], row["priority"])
     status = row["status"]
     issue_number = row["github_issue_number"]
     project_item_id = row["github_project_item_id"]
@@ -87,9 +162,12 @@ async def sync_task_to_github(task_id: UUID) -> dict:
             description,
             "--json",
             "number",
+            pacer=pacer,
+            priority=priority,
         )
         issue_number = json.loads(result)["number"]
         logger.info("Created issue #%d for task %s", issue_number, task_id)
+        await asyncio.shield(_store_issue_numbers({task_id: row}, {task_id: issue_number}))
     else:
         await _run_gh(
             "issue",
@@ -101,6 +179,8 @@ async def sync_task_to_github(task_id: UUID) -> dict:
             title,
             "--body",
             description,
+            pacer=pacer,
+            priority=priority,
         )
 
     # Add to project if not already
@@ -115,6 +195,8 @@ async def sync_task_to_github(task_id: UUID) -> dict:
             f"https://github.com/{repo}/issues/{issue_number}",
             "--format",
             "json",
+            pacer=pacer,
+            priority=priority,
         )
         project_item_id = json.loads(result).get("id")
 
@@ -133,33 +215,371 @@ async def sync_task_to_github(task_id: UUID) -> dict:
                 "Status",
                 "--text",
                 gh_status,
+                pacer=pacer,
+                priority=priority,
             )
         except RuntimeError:
             logger.warning("Could not update project status for item %s", project_item_id)
 
     # Persist back to DB
     async with session_factory() as session:
-        await session.execute(
-            sa.update(tasks)
-            .where(tasks.c.id == task_id)
-            .values(
-                github_issue_number=issue_number,
-                github_project_item_id=project_item_id,
-            )
-        )
-        # Create a git_hook subtask to record this sync
-        await session.execute(
-            sa.insert(subtasks).values(
-                parent_task_id=task_id,
-                subtask_type=SubtaskType.git_hook,
-                title=f"GitHub sync: issue #{issue_number}",
-                status=TaskStatus.completed,
-                output_summary=f"Synced to {repo}#{issue_number}, project item {project_item_id}",
-            )
-        )
+        await _record_sync(session, row, issue_number, project_item_id, repo)
         await session.commit()
 
     return {
         "github_issue_number": issue_number,
         "github_project_item_id": project_item_id,
     }
+
+
+async def _store_issue_numbers(rows: dict[UUID, dict], numbers: dict[UUID, int]) -> None:
+    """Persist just-created issue numbers before any later step can fail.
+
+    Otherwise a failure after the issue is created leaves github_issue_number
+    NULL and the next sync creates a second issue. The write is guarded on the
+    updated_at read with each task. If it matches, `rows` gets the new
+    updated_at so _record_sync still sees the task as unedited.
+    """
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        for task_id, number in numbers.items():
+            row = rows[task_id]
+            seen = (
+                await session.execute(
+                    sa.update(tasks)
+                    .where(tasks.c.id == task_id, tasks.c.updated_at == row["updated_at"])
+                    .values(github_issue_number=number)
+                    .returning(tasks.c.updated_at)
+                )
+            ).scalar_one_or_none()
+            if seen is None:  # edited since the read: store anyway, keep the stale updated_at
+                await session.execute(
+                    sa.update(tasks).where(tasks.c.id == task_id).values(github_issue_number=number)
+                )
+            else:
+                row["updated_at"] = seen
+        await session.commit()
+
+
+async def _record_sync(
+    session, row, issue_number: int, project_item_id: str | None, repo: str
+) -> None:
+    """Store the GitHub ids and sync hash on the task and log a git_hook subtask.
+
+    `row` is the task as read before pushing. If it was edited since
+    (updated_at moved), the hash is cleared and github_synced_at is left
+    alone. The edit's updated_at is then still past the watermark, so the
+    next sync pushes again.
+    """
+    task_id = row["id"]
+    unedited = tasks.c.updated_at == row["updated_at"]
+    await session.execute(
+        sa.update(tasks)
+        .where(tasks.c.id == task_id)
+        .values(
+            github_issue_number=issue_number,
+            github_project_item_id=project_item_id,
+            github_sync_hash=sa.case((unedited, _row_hash(row)), else_=None),
+            github_synced_at=sa.case((unedited, sa.func.now()), else_=tasks.c.github_synced_at),
+        )
+    )
+    # Create a git_hook subtask to record this sync
+    await session.execute(
+        sa.insert(subtasks).values(
+            parent_task_id=task_id,
+            subtask_type=SubtaskType.git_hook,
+            title=f"GitHub sync: issue #{issue_number}",
+            status=TaskStatus.completed,
+            output_summary=f"Synced to {repo}#{issue_number}, project item {project_item_id}",
+        )
+    )
+
+
+_PROJECT_SELECTION = """... on ProjectV2Owner {{
+      projectV2(number: {number}) {{
+        id
+        field(name: "Status") {{ ... on ProjectV2SingleSelectField {{ id options {{ id name }} }} }}
+      }}
+    }}"""
+
+
+async def _project_context(
+    client: GraphQLClient, repo: str, project_num: int, priority: Priority = Priority.normal
+) -> dict:
+    """Node ids of the repository, the project, and its Status field options."""
+    owner, name = repo.split("/")
+    repository, project_owner = await client.batch(
+        "query",
+        [
+            Operation("repository", {"owner": ("String!", owner), "name": ("String!", name)}, "id"),
+            Operation(
+                "repositoryOwner",
+                {"login": ("String!", owner)},
+                _PROJECT_SELECTION.format(number=int(project_num)),
+            ),
+        ],
+        priority=priority,
+    )
+    for result in (repository, project_owner):
+        if isinstance(result, GraphQLError):
+            raise result
+    project = project_owner.get("projectV2")
+    if project is None:
+        raise ValueError(f"Project {project_num} not found for {owner}")
+    status_field = project.get("field") or {}
+    return {
+        "repository_id": repository["id"],
+        "project_id": project["id"],
+        "status_field_id": status_field.get("id"),
+        "status_options": {o["name"]: o["id"] for o in status_field.get("options", [])},
+    }
+
+
+async def sync_tasks_graphql(
+    task_ids: list[UUID], client: GraphQLClient
+) -> dict[UUID, dict | Exception]:
+    """Create or update issues and project items for many tasks in batched requests.
+
+    Returns {task_id: {"github_issue_number", "github_project_item_id"}} for
+    synced tasks, or the exception that stopped that task. Status updates are
+    best effort, as in sync_task_to_github.
+
+    Raises only before anything was sent to GitHub (reading the tasks or the
+    project), so callers may safely retry a raising call another way.
+    """
+    repo = env("PRJ_GITHUB_REPO")
+    project_num = int(env("PRJ_GITHUB_PROJECT_NUMBER"))
+
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        rows = {
+            row["id"]: dict(row)
+            for row in (await session.execute(sa.select(tasks).where(tasks.c.id.in_(task_ids))))
+            .mappings()
+            .all()
+        }
+    results: dict[UUID, dict | Exception] = {
+        task_id: ValueError(f"Task {task_id} not found")
+        for task_id in task_ids
+        if task_id not in rows
+    }
+    if not rows:
+        return results
+
+    def urgency(task_list) -> Priority:
+        """A batch waits in the Pacer queue at its most urgent task's priority."""
+        return min(
+            (sync_priority(rows[t]["status"], rows[t]["priority"]) for t in task_list),
+            default=Priority.normal,
+        )
+
+    ctx = await _project_context(client, repo, project_num, urgency(rows))
+    state = {
+        task_id: {
+            "issue_number": row["github_issue_number"],
+            "item_id": row["github_project_item_id"],
+        }
+        for task_id, row in rows.items()
+    }
+
+    def active() -> list[UUID]:
+        return [task_id for task_id in rows if task_id not in results]
+
+    async def send(kind, task_list, ops) -> list[dict | Exception]:
+        """Outcome per task, one request per chunk; a failed request fails only its chunk."""
+        outcomes: list[dict | Exception] = []
+        for start in range(0, len(ops), client.max_batch):
+            chunk = task_list[start : start + client.max_batch]
+            try:
+                outcomes += await client.batch(
+                    kind, ops[start : start + client.max_batch], priority=urgency(chunk)
+                )
+            except (GraphQLError, OSError, ValueError) as e:  # HTTP, network, malformed JSON
+                outcomes += [e] * len(chunk)
+        return outcomes
+
+    async def step(kind, task_list, ops, on_ok) -> None:
+        for task_id, out in zip(task_list, await send(kind, task_list, ops)):
+            if isinstance(out, Exception):
+                results[task_id] = out
+            else:
+                on_ok(state[task_id], out)
+
+    # Issue node ids for tasks that already have an issue
+    existing = [t for t in active() if state[t]["issue_number"] is not None]
+    await step(
+        "query",
+        existing,
+        [
+            Operation(
+                "resource",
+                {"url": ("URI!", f"https://github.com/{repo}/issues/{state[t]['issue_number']}")},
+                "... on Issue { id }",
+            )
+            for t in existing
+        ],
+        lambda s, out: s.update(issue_id=out["id"]),
+    )
+
+    # Create or update issues
+    pending = active()
+    issue_ops = []
+    for t in pending:
+        fields = {"title": rows[t]["title"], "body": rows[t]["description"] or ""}
+        if state[t]["issue_number"] is None:
+            payload = ("CreateIssueInput!", {"repositoryId": ctx["repository_id"], **fields})
+            issue_ops.append(Operation("createIssue", {"input": payload}, "issue { id number }"))
+        else:
+            payload = ("UpdateIssueInput!", {"id": state[t]["issue_id"], **fields})
+            issue_ops.append(Operation("updateIssue", {"input": payload}, "issue { id number }"))
+    await step(
+        "mutation",
+        pending,
+        issue_ops,
+        lambda s, out: s.update(issue_id=out["issue"]["id"], issue_number=out["issue"]["number"]),
+    )
+    created = {
+        t: state[t]["issue_number"]
+        for t in active()
+        if rows[t]["github_issue_number"] is None and state[t]["issue_number"] is not None
+    }
+    if created:
+        try:
+            await asyncio.shield(_store_issue_numbers(rows, created))
+        except (SQLAlchemyError, OSError) as e:
+            logger.error("Could not store new issue numbers %s: %s", sorted(created.values()), e)
+            for t in created:
+                results[t] = e
+
+    # Add to project if not already
+    adding = [t for t in active() if state[t]["item_id"] is None]
+    await step(
+        "mutation",
+        adding,
+        [
+            Operation(
+                "addProjectV2ItemById",
+                {
+                    "input": (
+                        "AddProjectV2ItemByIdInput!",
+                        {"projectId": ctx["project_id"], "contentId": state[t]["issue_id"]},
+                    )
+                },
+                "item { id }",
+            )
+            for t in adding
+        ],
+        lambda s, out: s.update(item_id=out["item"]["id"]),
+    )
+
+    # Update project item status (best effort)
+    synced = active()
+    updating = [
+        (t, ctx["status_options"].get(_STATUS_MAP.get(rows[t]["status"], "Todo"))) for t in synced
+    ]
+    updating = [(t, option) for t, option in updating if option]
+    if ctx["status_field_id"] and updating:
+        outcomes = await send(
+            "mutation",
+            [t for t, _ in updating],
+            [
+                Operation(
+                    "updateProjectV2ItemFieldValue",
+                    {
+                        "input": (
+                            "UpdateProjectV2ItemFieldValueInput!",
+                            {
+                                "projectId": ctx["project_id"],
+                                "itemId": state[t]["item_id"],
+                                "fieldId": ctx["status_field_id"],
+                                "value": {"singleSelectOptionId": option},
+                            },
+                        )
+                    },
+                    "projectV2Item { id }",
+                )
+                for t, option in updating
+            ],
+        )
+        for (t, _), out in zip(updating, outcomes):
+            if isinstance(out, Exception):
+                logger.warning("Could not update project status for item %s", state[t]["item_id"])
+
+    # Persist back to DB
+    try:
+        if synced:
+            async with session_factory() as session:
+                for t in synced:
+                    await _record_sync(
+                        session, rows[t], state[t]["issue_number"], state[t]["item_id"], repo
+                    )
+                await session.commit()
+    except (SQLAlchemyError, OSError) as e:
+        logger.exception("Could not record GitHub sync for %d tasks", len(synced))
+        results.update(dict.fromkeys(synced, e))
+        return results
+    for t in synced:
+        results[t] = {
+            "github_issue_number": state[t]["issue_number"],
+            "github_project_item_id": state[t]["item_id"],
+        }
+    return results
+
+
+async def select_tasks_to_sync(
+    statuses: list[str] | None = None, *, force: bool = False
+) -> list[dict]:
+    """Tasks whose title, description or status changed since their last sync.
+
+    Args:
+        statuses: Only consider tasks in these statuses (None for all).
+        force: Return every matching task, changed or not.
+
+    Returns:
+        Rows with id, title, status, priority: in-progress tasks first, then
+        by task priority (see sync_priority), then oldest first.
+    """
+    query = sa.select(
+        tasks.c.id,
+        tasks.c.title,
+        tasks.c.description,
+        tasks.c.status,
+        tasks.c.priority,
+        tasks.c.github_sync_hash,
+        tasks.c.updated_at,
+    ).order_by(tasks.c.created_at)
+    if statuses:
+        query = query.where(tasks.c.status.in_(statuses))
+    if not force:
+        query = query.where(
+            sa.or_(
+                tasks.c.github_synced_at.is_(None),
+                tasks.c.updated_at > tasks.c.github_synced_at,
+            )
+        )
+
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        rows = (await session.execute(query)).mappings().all()
+        changed, unchanged = [], []
+        for row in rows:
+            (changed if force or row["github_sync_hash"] != _row_hash(row) else unchanged).append(
+                row
+            )
+        if unchanged:
+            # Touched but nothing GitHub shows changed: move the watermark past
+            # them, unless they were edited again since the read above.
+            await session.execute(
+                sa.update(tasks)
+                .where(tasks.c.id == sa.bindparam("task_id"))
+                .where(tasks.c.updated_at == sa.bindparam("seen"))
+                .values(github_synced_at=sa.func.now()),
+                [{"task_id": row["id"], "seen": row["updated_at"]} for row in unchanged],
+            )
+            await session.commit()
+    logger.info("%d tasks changed since last GitHub sync (%d touched)", len(changed), len(rows))
+    changed.sort(key=lambda r: sync_priority(r["status"], r["priority"]))
+    return [
+        {"id": r["id"], "title": r["title"], "status": r["status"], "priority": r["priority"]}
+        for r in changed
+    ]
@@ -0,0 +1,325 @@
+"""Pooled GitHub GraphQL client that batches operations into aliased requests.
+
+depends_on:
+  - src/get_env.py
+  - src/sync/rate_limit.py
+depended_by:
+  - src/sync/github_project.py
+  - src/sync/batch.py
+  - scripts/sync_github.py
+  - tests/test_sync.py
+semver: minor
+
+Usage:
+    from src.sync.graphql import GraphQLClient, Operation
+
+    client = GraphQLClient.from_env()          # None if no token: use the gh CLI path
+    data = await client.execute("query { viewer { login } }")
+
+    ops = [
+        Operation("createIssue", {"input": ("CreateIssueInput!", {...})}, "issue { id number }"),
+        Operation("createIssue", {"input": ("CreateIssueInput!", {...})}, "issue { id number }"),
+    ]
+    results = await client.batch("mutation", ops)   # one POST; dict or GraphQLError per op
+    client.close()
+
+`batch` renders each operation as an aliased root field (`op0: createIssue(...)`)
+with its own variables, so N mutations cost one HTTP round trip instead of N
+gh processes. GraphQL reports errors per alias, so one failing operation does
+not fail its neighbours.
+
+Connections are stdlib http.client keep-alive connections, reused from a
+small pool. Requests run in worker threads so the event loop never blocks.
+Every request goes through the same Pacer (src/sync/rate_limit.py) as the gh
+path, and its x-ratelimit-* headers feed the Pacer's quota tracking. Mutations
+take one token per operation because GitHub's secondary limits count content
+creation per mutation, not per request. Rate-limit replies (403/429, or a
+200 with a RATE_LIMITED error) pause every caller and retry: GitHub rejected
+the request, so nothing ran. Queries also retry 5xx and connection errors
+after jittered back-off. Mutations retry those only when the request
+provably never reached the server (connection refused, or the socket failed
+while sending), because a createIssue that timed out may still have run.
+
+Token lookup: ORG_GITHUB_TOKEN, then GH_TOKEN, then `gh auth token`.
+PRJ_GITHUB_GRAPHQL_URL overrides the endpoint (GitHub Enterprise, tests).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import logging
+import shutil
+import subprocess
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
+from urllib.parse import urlsplit
+
+from src.get_env import env
+from src.sync.rate_limit import Pacer, Priority, is_rate_limited
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "https://api.github.com/graphql"
+DEFAULT_MAX_BATCH = 25
+GH_TOKEN_TIMEOUT = 10.0  # seconds to wait for `gh auth token`
+IDLE_TIMEOUT = 20.0  # seconds; reconnect rather than reuse a connection the server may have closed
+
+
+class GraphQLError(RuntimeError):
+    """A GraphQL or HTTP error. `status` is set for HTTP-level failures."""
+
+    def __init__(
+        self, message: str, *, errors: list[dict] | None = None, status: int | None = None
+    ) -> None:
+        super().__init__(message)
+        self.errors = errors or []
+        self.status = status
+
+
+@dataclass
+class Operation:
+    """One root field: `field(arg: $var, ...) { selection }`.
+
+    `arguments` maps argument name to (GraphQL type, value), e.g.
+    {"input": ("CreateIssueInput!", {"repositoryId": ..., "title": ...})}.
+    """
+
+    field: str
+    arguments: dict[str, tuple[str, Any]]
+    selection: str = ""
+
+
+def render_batch(
+    kind: Literal["query", "mutation"], ops: Sequence[Operation]
+) -> tuple[str, dict[str, Any]]:
+    """Document and variables running `ops` as aliases op0, op1, ..."""
+    declarations: list[str] = []
+    fields: list[str] = []
+    variables: dict[str, Any] = {}
+    for i, op in enumerate(ops):
+        args = []
+        for name, (gql_type, value) in op.arguments.items():
+            var = f"op{i}_{name}"
+            declarations.append(f"${var}: {gql_type}")
+            args.append(f"{name}: ${var}")
+            variables[var] = value
+        call = f"op{i}: {op.field}" + (f"({', '.join(args)})" if args else "")
+        fields.append(f"  {call} {{ {op.selection} }}" if op.selection else f"  {call}")
+    header = f"{kind}({', '.join(declarations)})" if declarations else kind
+    return header + " {\n" + "\n".join(fields) + "\n}", variables
+
+
+class GraphQLClient:
+    """Keep-alive HTTP pool for GitHub's GraphQL endpoint."""
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        url: str = DEFAULT_URL,
+        pool_size: int = 4,
+        timeout: float = 30.0,
+        pacer: Pacer | None = None,
+        retries: int = 3,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported GraphQL URL scheme or host: {url!r}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path or "/graphql"
+        self._headers = {
+            "Authorization": f"bearer {token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "User-Agent": "jadecli-team-agents-sdk",
+        }
+        self.timeout = timeout
+        self.pacer = pacer or Pacer()
+        self.retries = retries
+        self.max_batch = max_batch
+        self.requests = 0
+        self._idle: list[tuple[http.client.HTTPConnection, float]] = []  # (conn, last used)
+        self._slots = asyncio.Semaphore(pool_size)
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> GraphQLClient | None:
+        """Client using the first token found, or None (callers fall back to gh)."""
+        token = env("ORG_GITHUB_TOKEN", default=None) or env("GH_TOKEN", default=None)
+        if not token and shutil.which("gh"):
+            try:
+                proc = subprocess.run(
+                    ["gh", "auth", "token"],
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                    timeout=GH_TOKEN_TIMEOUT,
+                )
+            except subprocess.TimeoutExpired:
+                logger.warning("`gh auth token` timed out after %.0fs", GH_TOKEN_TIMEOUT)
+                proc = None
+            token = proc.stdout.strip() if proc is not None and proc.returncode == 0 else None
+        if not token:
+            return None
+        kwargs.setdefault("url", env("PRJ_GITHUB_GRAPHQL_URL", default=DEFAULT_URL))
+        return cls(token, **kwargs)
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[0].close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return cls(self._host, self._port, timeout=self.timeout)
+
+    def _checkout(self) -> http.client.HTTPConnection:
+        while self._idle:
+            conn, last_used = self._idle.pop()
+            if time.monotonic() - last_used < IDLE_TIMEOUT:
+                return conn
+            conn.close()
+        return self._connect()
+
+    def _send(self, body: bytes, idempotent: bool) -> tuple[int, dict, bytes]:
+        """Blocking POST on a pooled connection (runs in a worker thread).
+
+        A reused connection the server has closed is retried on a fresh one
+        when the failure happens while sending, or, for idempotent requests,
+        while waiting for the response. Errors are marked `unsent` when the
+        request provably never reached the server.
+        """
+        conn = self._checkout()
+        try:
+            try:
+                try:
+                    conn.request("POST", self._path, body=body, headers=self._headers)
+                except (ConnectionResetError, BrokenPipeError):
+                    conn.close()  # stale keep-alive connection; the body never went out
+                    conn = self._connect()
+                    conn.request("POST", self._path, body=body, headers=self._headers)
+            except OSError as exc:
+                exc.unsent = True  # the body was not fully written, so nothing ran
+                raise
+            try:
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                if not idempotent:
+                    raise
+                conn.close()
+                conn = self._connect()
+                conn.request("POST", self._path, body=body, headers=self._headers)
+                resp = conn.getresponse()
+            headers = {k.lower(): v for k, v in resp.getheaders()}
+            result = resp.status, headers, resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        self._idle.append((conn, time.monotonic()))
+        return result
+
+    async def _request(
+        self, query: str, variables: dict[str, Any], cost: int, priority: Priority
+    ) -> dict:
+        body = json.dumps({"query": query, "variables": variables}).encode()
+        idempotent = not query.lstrip().startswith("mutation")
+        attempt = 0
+        while True:
+            await self.pacer.wait(cost, priority=priority)
+            try:
+                async with self._slots:
+                    status, headers, raw = await asyncio.to_thread(self._send, body, idempotent)
+            except OSError as exc:  # connection refused/reset, socket timeout
+                unsent = getattr(exc, "unsent", False) or isinstance(exc, ConnectionRefusedError)
+                if attempt == self.retries or not (idempotent or unsent):
+                    raise
+                status, headers, raw = 0, {}, str(exc).encode()
+            self.requests += 1
+            self.pacer.observe(headers)
+            text = raw.decode(errors="replace")
+            payload = json.loads(text) if status == 200 else None
+            # Primary GraphQL limits come back as 200 with a RATE_LIMITED error.
+            limited = (status in (403, 429) and (
+                "retry-after" in headers
+                or headers.get("x-ratelimit-remaining") == "0"
+                or is_rate_limited(text)
+            )) or (
+                payload is not None
+                and any(e.get("type") == "RATE_LIMITED" for e in payload.get("errors") or [])
+            )  # fmt: skip
+            if payload is not None and not limited:
+                return payload
+            # A mutation that failed server-side may have run: never resend it.
+            transient = status == 0 or (status >= 500 and idempotent)
+            if not (limited or transient) or attempt == self.retries:
+                raise GraphQLError(f"GitHub GraphQL HTTP {status}: {text[:200]}", status=status)
+            if limited:
+                retry_after = headers.get("retry-after")
+                wait = self.pacer.retry_delay(
+                    attempt, retry_after=float(retry_after) if retry_after else None
+                )
+                logger.warning("GitHub rate limit hit; pausing GraphQL for %.0fs", wait)
+                self.pacer.back_off(wait)
+            else:
+                await asyncio.sleep(self.pacer.retry_delay(attempt, transient=True))
+            attempt += 1
+
+    async def execute(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        *,
+        cost: int = 0,
+        priority: Priority = Priority.normal,
+    ) -> dict[str, Any]:
+        """Run one document and return `data`. Raises GraphQLError on any error.
+
+        `cost` is the number of content-creating mutations, for pacing (0 = a read).
+        """
+        payload = await self._request(query, variables or {}, cost, priority)
+        if payload.get("errors"):
+            errors = payload["errors"]
+            raise GraphQLError("; ".join(e.get("message", "?") for e in errors), errors=errors)
+        return payload.get("data") or {}
+
+    async def batch(
+        self,
+        kind: Literal["query", "mutation"],
+        ops: Sequence[Operation],
+        *,
+        priority: Priority = Priority.normal,
+    ) -> list[dict | GraphQLError]:
+        """Run `ops` in aliased requests of up to `max_batch` each.
+
+        Returns, in order, each operation's selected object or the
+        GraphQLError for that alias. Errors not tied to an alias raise.
+        """
+        results: list[dict | GraphQLError] = []
+        for start in range(0, len(ops), self.max_batch):
+            chunk = ops[start : start + self.max_batch]
+            query, variables = render_batch(kind, chunk)
+            cost = len(chunk) if kind == "mutation" else 0
+            payload = await self._request(query, variables, cost, priority)
+            data = payload.get("data") or {}
+            per_alias: dict[str, list[dict]] = {}
+            for error in payload.get("errors") or []:
+                path = error.get("path") or []
+                if not path or path[0] not in {f"op{i}" for i in range(len(chunk))}:
+                    raise GraphQLError(error.get("message", "GraphQL error"), errors=[error])
+                per_alias.setdefault(path[0], []).append(error)
+            for i in range(len(chunk)):
+                alias = f"op{i}"
+                if alias in per_alias:
+                    errors = per_alias[alias]
+                    message = "; ".join(e.get("message", "?") for e in errors)
+                    results.append(GraphQLError(message, errors=errors))
+                elif data.get(alias) is None:
+                    results.append(GraphQLError(f"{chunk[i].field} returned null"))
+                else:
+                    results.append(data[alias])
+        return results
@@ -0,0 +1,328 @@
+"""Rate-limit-aware request scheduling for GitHub's primary and secondary limits.
+
+depends_on:
+  - src/models/enums.py
+depended_by:
+  - src/sync/github_project.py
+  - src/sync/graphql.py
+  - src/sync/batch.py
+  - scripts/sync_github.py
+  - tests/test_sync.py
+semver: minor
+
+Usage:
+    from src.sync.rate_limit import Pacer, Priority, is_rate_limited, sync_priority
+
+    pacer = Pacer(0.75, burst=4)                     # shared by every concurrent sync
+    await pacer.wait()                               # before one write request
+    await pacer.wait(25, priority=Priority.status)   # a batch of 25 mutations, goes first
+    await pacer.wait(0)                              # a read: primary quota only
+    pacer.observe(response_headers)                  # x-ratelimit-remaining / -reset
+    if is_rate_limited(error_text):
+        pacer.back_off(pacer.retry_delay(attempt))   # pause all callers, jittered
+
+    await wait_for_active(sync_batch(), timeout=300)  # queueing in a Pacer is not counted
+
+GitHub enforces two kinds of limit:
+
+- Primary: a quota per hour, reported on every API response in
+  x-ratelimit-remaining and x-ratelimit-reset. `observe()` records them. When
+  the remaining quota falls below `reserve`, requests are spread evenly over
+  the time left until the reset. At zero they wait for the reset.
+- Secondary: about 80 content-creating requests per minute, plus abuse
+  detection for bursts. A token bucket refills `1 / min_interval` writes per
+  second and holds up to `burst`. A request costing n writes takes n tokens,
+  so a batch of mutations is paced like the same number of single calls.
+
+When a limit trips anyway, `back_off()` pauses every caller. `retry_delay()`
+gives exponential back-off with jitter, so concurrent retries don't arrive
+together. Callers queue by Priority, then arrival: status updates for
+in-progress tasks go ahead of low-priority backlog when quota is scarce.
+
+When many syncs share one Pacer, most of their wall time is spent queued
+behind each other's writes. `wait_for_active` times out a coroutine on the
+time it spends doing its own work, so a long queue does not make every
+caller time out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Coroutine, Mapping
+from enum import IntEnum
+from typing import TypeVar
+
+from src.models.enums import TaskPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# gh surfaces GitHub's rate limits only through the error text.
+SECONDARY_LIMIT_MARKERS = ("secondary rate limit", "submitted too quickly", "abuse detection")
+PRIMARY_LIMIT_MARKERS = ("api rate limit exceeded",)
+
+
+def is_secondary_limit(text: str) -> bool:
+    """True if an error message is GitHub's secondary rate limit response."""
+    lowered = text.lower()
+    return any(marker in lowered for marker in SECONDARY_LIMIT_MARKERS)
+
+
+def is_rate_limited(text: str) -> bool:
+    """True if an error message reports a primary or secondary rate limit."""
+    lowered = text.lower()
+    return is_secondary_limit(lowered) or any(m in lowered for m in PRIMARY_LIMIT_MARKERS)
+
+
+class Priority(IntEnum):
+    """Queue order for waiting requests; lower goes first."""
+
+    status = 0  # status of in-progress work, what people are watching
+    high = 1
+    normal = 2
+    backlog = 3
+
+
+def sync_priority(status: str, priority: str | None = None) -> Priority:
+    """Priority of syncing a task: in-progress first, low-priority backlog last."""
+    status = getattr(status, "value", status)
+    priority = getattr(priority, "value", priority)
+    if status == TaskStatus.in_progress.value:
+        return Priority.status
+    if priority in (TaskPriority.critical.value, TaskPriority.high.value):
+        return Priority.high
+    if priority == TaskPriority.low.value:
+        return Priority.backlog
+    return Priority.normal
+
+
+class Pacer:
+    """Token bucket plus primary-quota tracking, shared by concurrent GitHub requests.
+
+    Args:
+        min_interval: Seconds per content-creating request at steady state
+            (0.75 is GitHub's ~80 per minute).
+        burst: Writes that may go out back to back after an idle period.
+        cooldown: Base pause after a rate limit (GitHub asks for >= 60s).
+        base_delay: Base pause before retrying a transient (5xx, network) error.
+        reserve: Primary quota to keep; below it, requests are spread until reset.
+        max_backoff: Cap on one back-off pause, in seconds.
+        jitter: Back-off is scaled by a random factor in [1, 1 + jitter].
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.75,
+        *,
+        burst: int = 1,
+        cooldown: float = 60.0,
+        base_delay: float = 1.0,
+        reserve: int = 50,
+        max_backoff: float = 900.0,
+        jitter: float = 0.25,
+    ) -> None:
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.min_interval = min_interval
+        self.burst = burst
+        self.cooldown = cooldown
+        self.base_delay = base_delay
+        self.reserve = reserve
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.remaining: int | None = None
+        self.reset_at: float | None = None  # epoch seconds
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._last_quota_grant = 0.0
+        self._queue: list[tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    async def wait(self, cost: int = 1, *, priority: Priority = Priority.normal) -> None:
+        """Block until this caller may issue a request worth `cost` writes.
+
+        `cost=0` is a read: it skips the token bucket but still counts
+        against the primary quota.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), cost, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+        else:
+            self._wakeup.set()  # a higher-priority waiter may now be first
+        start = time.monotonic()
+        clock = _queue_clock.get()
+        if clock is not None:
+            clock.enter()
+        try:
+            await future
+        finally:
+            if clock is not None:
+                clock.leave()
+        self.waited += time.monotonic() - start
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Record primary quota from response headers (lower-cased keys)."""
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        self.remaining = int(remaining)
+        self.reset_at = float(reset)
+        if self.remaining < self.reserve:
+            logger.info(
+                "GitHub quota low: %d left, resets in %.0fs",
+                self.remaining,
+                self.reset_at - time.time(),
+            )
+
+    def back_off(self, seconds: float) -> None:
+        """Hold every caller for at least `seconds` from now."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def retry_delay(
+        self, attempt: int, *, transient: bool = False, retry_after: float | None = None
+    ) -> float:
+        """Back-off before retry `attempt` (0-based).
+
+        Retry-After wins if given. Otherwise `cooldown * 2**attempt` for rate
+        limits (`base_delay` for transient errors), capped at `max_backoff` and
+        scaled by a random factor in [1, 1 + jitter].
+        """
+        if retry_after is not None:
+            return float(retry_after)
+        base = self.base_delay if transient else self.cooldown
+        delay = min(self.max_backoff, base * 2**attempt)
+        return delay * (1 + self.jitter * random.random())
+
+    def _refill(self, now: float) -> None:
+        rate = 1 / self.min_interval if self.min_interval > 0 else float("inf")
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+
+    def _delay(self, cost: int, now: float) -> float:
+        """Seconds until a request worth `cost` writes may go out."""
+        delay = self._paused_until - now
+        if cost and self.min_interval > 0:
+            self._refill(now)
+            need = min(cost, self.burst)
+            if self._tokens < need:
+                delay = max(delay, (need - self._tokens) * self.min_interval)
+        if self.remaining is not None and self.reset_at is not None:
+            until_reset = self.reset_at - time.time()
+            if until_reset > 0 and self.remaining <= 0:
+                delay = max(delay, until_reset + 1)
+            elif until_reset > 0 and self.remaining < self.reserve:
+                spacing = until_reset / self.remaining
+                delay = max(delay, self._last_quota_grant + spacing - now)
+        return delay
+
+    def _grant(self, cost: int, now: float) -> None:
+        if cost:
+            self._tokens -= cost  # may go negative: later callers repay the debt
+        if self.remaining is not None:
+            self.remaining -= 1  # estimate until the next observe()
+        self._last_quota_grant = now
+
+    async def _dispatch(self) -> None:
+        """Release queued waiters one at a time, highest priority first."""
+        while self._queue:
+            _, _, cost, future = self._queue[0]
+            if future.done():  # caller was cancelled
+                heapq.heappop(self._queue)
+                continue
+            now = time.monotonic()
+            delay = self._delay(cost, now)
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._queue)
+            self._grant(cost, now)
+            future.set_result(None)
+
+
+class _QueueClock:
+    """Time one wait_for_active call has spent queued in Pacer.wait()."""
+
+    def __init__(self) -> None:
+        self.queued = 0.0
+        self._since: float | None = None
+        self.resumed = asyncio.Event()
+
+    def enter(self) -> None:
+        self._since = time.monotonic()
+        self.resumed.clear()
+
+    def leave(self) -> None:
+        if self._since is not None:
+            self.queued += time.monotonic() - self._since
+            self._since = None
+        self.resumed.set()
+
+    @property
+    def waiting(self) -> bool:
+        return self._since is not None
+
+    def active(self, start: float) -> float:
+        """Seconds since `start` not spent queued."""
+        now = time.monotonic()
+        queued = self.queued + (now - self._since if self._since is not None else 0.0)
+        return now - start - queued
+
+
+_queue_clock: contextvars.ContextVar[_QueueClock | None] = contextvars.ContextVar(
+    "pacer_queue_clock", default=None
+)
+
+
+async def wait_for_active(coro: Coroutine[object, object, T], timeout: float | None) -> T:
+    """Like asyncio.wait_for, but time spent queued in Pacer.wait() is not counted.
+
+    Raises TimeoutError once `coro` has run for `timeout` seconds outside the
+    Pacer queue; it is cancelled first, as with wait_for.
+    """
+    if timeout is None:
+        return await coro
+    clock = _QueueClock()
+    context = contextvars.copy_context()
+    context.run(_queue_clock.set, clock)
+    task = asyncio.get_running_loop().create_task(coro, context=context)
+    start = time.monotonic()
+    try:
+        while not task.done():
+            if clock.waiting:  # the budget is paused; resume when the Pacer lets us go
+                resumed = asyncio.ensure_future(clock.resumed.wait())
+                await asyncio.wait({task, resumed}, return_when=asyncio.FIRST_COMPLETED)
+                resumed.cancel()
+                continue
+            remaining = timeout - clock.active(start)
+            if remaining <= 0:
+                task.cancel()
+                await asyncio.wait({task})
+                if task.cancelled():
+                    raise TimeoutError
+                break  # finished while being cancelled
+            await asyncio.wait({task}, timeout=remaining)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    return task.result()
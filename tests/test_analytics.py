@@ -0,0 +1,444 @@
+"""Tests for latency sketches, hourly rollups, rollup queries, and Parquet export."""
+
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, create_autospec, patch
+from uuid import UUID, uuid4
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.analytics.export import export_activity, load_state
+from src.analytics.query import agent_cost, query_rollups, tool_latency
+from src.analytics.rollup import Bucket, aggregate, run_rollup
+from src.analytics.sketch import LatencySketch
+from src.db.crud import MAX_BIND_PARAMS, Crud
+from src.db.tables import agent_activity
+
+HOUR = datetime(2026, 10, 17, 13, tzinfo=UTC)
+_ACTIVITY_COLUMNS = [c.name for c in agent_activity.columns]
+
+
+def _exact_quantile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def _event(minute: int, tool: str | None = "Read", duration: int | None = 10, **extra):
+    return {
+        "id": uuid4(),
+        "agent_name": "reviewer",
+        "tool_name": tool,
+        "hook_event": "PostToolUse" if tool else "Stop",
+        "duration_ms": duration,
+        "cost_usd": None,
+        "event_at": HOUR + timedelta(minutes=minute),
+        "created_at": HOUR + timedelta(minutes=minute, seconds=1),
+        **extra,
+    }
+
+
+def _mock_engine(watermarks=(), existing=()):
+    """Engine whose watermark SELECTs return `watermarks` in order."""
+    watermarks = list(watermarks)
+    conn = AsyncMock()
+
+    async def execute(stmt, params=None):
+        result = MagicMock()
+        if isinstance(stmt, sa.Select):
+            table = stmt.get_final_froms()[0].name
+            if table == "rollup_watermarks":
+                result.first.return_value = watermarks.pop(0)
+            else:
+                result.mappings.return_value.all.return_value = list(existing)
+        return result
+
+    conn.execute = AsyncMock(side_effect=execute)
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    engine = MagicMock()
+    engine.begin = MagicMock(return_value=ctx)
+    engine.connect = MagicMock(return_value=ctx)
+    return engine, conn
+
+
+def _batches(*batches):
+    """Crud.iter stand-in, autospecced so calls are checked against its real signature."""
+    calls = []
+
+    async def iter_(self, **kwargs):
+        calls.append(kwargs)
+        for batch in batches:
+            yield batch
+
+    return create_autospec(Crud.iter, side_effect=iter_), calls
+
+
+def _statements(conn, kind):
+    return [c.args[0] for c in conn.execute.call_args_list if isinstance(c.args[0], kind)]
+
+
+class TestLatencySketch:
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 1.2) for _ in range(20_000)]
+        sketch = LatencySketch(0.01)
+        sketch.extend(values)
+
+        for q in (0.5, 0.9, 0.95, 0.99):
+            exact = _exact_quantile(values, q)
+            assert abs(sketch.quantile(q) - exact) <= 0.0101 * exact
+
+    def test_merge_equals_sketch_of_union(self):
+        a, b, both = LatencySketch(), LatencySketch(), LatencySketch()
+        for v in range(1, 500):
+            (a if v % 3 else b).add(v)
+            both.add(v)
+        a.merge(b)
+        assert a.bins == both.bins
+        assert a.quantile(0.95) == both.quantile(0.95)
+
+    def test_bytes_round_trip_is_compact(self):
+        sketch = LatencySketch()
+        sketch.extend([0, 0.4, 3, 3, 250, 12_000, 90_000])
+        blob = sketch.to_bytes()
+        restored = LatencySketch.from_bytes(blob)
+
+        assert restored.bins == sketch.bins
+        assert restored.zero_count == 1
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+        assert restored.quantile(0) == 0.0
+        assert len(blob) < 40
+        assert LatencySketch.from_bytes(None).quantile(0.5) is None
+        assert LatencySketch.from_bytes(None).count == 0
+        with pytest.raises(ValueError):
+            LatencySketch.from_bytes(blob[:-1])
+
+    def test_max_bins_collapses_lowest(self):
+        sketch = LatencySketch(max_bins=16)
+        sketch.extend(range(1, 10_001))
+
+        assert len(sketch.bins) == 16
+        assert sketch.count == 10_000
+        assert sketch.quantile(0.99) == pytest.approx(9900, rel=0.01)
+
+    def test_merged_across_many(self):
+        parts = [LatencySketch() for _ in range(4)]
+        for i, v in enumerate(range(1, 401)):
+            parts[i % 4].add(v)
+        assert LatencySketch.merged(parts).count == 400
+        assert LatencySketch.merged([]).count == 0
+
+    def test_rejects_mismatched_merge_and_negatives(self):
+        with pytest.raises(ValueError):
+            LatencySketch(0.01).merge(LatencySketch(0.02))
+        with pytest.raises(ValueError):
+            LatencySketch().add(-1)
+
+
+class TestAggregate:
+    def test_buckets_by_hour_agent_tool_event(self):
+        rows = [
+            _event(1, duration=10),
+            _event(59, duration=30),
+            _event(61, duration=20),
+            _event(5, tool=None, duration=None, cost_usd=0.25),
+        ]
+        buckets = aggregate(rows)
+
+        read = buckets[(HOUR, "reviewer", "Read", "PostToolUse")]
+        assert (read.event_count, read.duration_sum_ms) == (2, 40)
+        assert (read.duration_min_ms, read.duration_max_ms) == (10, 30)
+        assert (HOUR + timedelta(hours=1), "reviewer", "Read", "PostToolUse") in buckets
+        stop = buckets[(HOUR, "reviewer", "", "Stop")]
+        assert stop.duration_count == 0 and stop.cost_usd_sum == 0.25
+
+    def test_row_round_trip(self):
+        bucket = aggregate([_event(1, duration=10), _event(2, duration=50)])[
+            (HOUR, "reviewer", "Read", "PostToolUse")
+        ]
+        restored = Bucket.from_row(bucket.to_row())
+        assert restored.to_row() == bucket.to_row()
+        assert restored.avg_ms == 30
+
+
+class TestRunRollup:
+    @patch("src.analytics.rollup.get_engine")
+    async def test_merges_existing_bucket_and_advances_watermark(self, mock_get_engine):
+        existing = {
+            "bucket_start": HOUR,
+            "agent_name": "reviewer",
+            "tool_name": "Read",
+            "hook_event": "PostToolUse",
+            **aggregate([_event(0, duration=100)])[
+                (HOUR, "reviewer", "Read", "PostToolUse")
+            ].to_row(),
+        }
+        engine, conn = _mock_engine(watermarks=[None, (None, None)], existing=[existing])
+        mock_get_engine.return_value = engine
+        batch = [_event(1, duration=10), _event(2, tool=None, duration=None)]
+        iter_, calls = _batches(batch)
+
+        with patch.object(Crud, "iter", iter_):
+            report = await run_rollup(now=HOUR + timedelta(hours=1))
+
+        assert report["rows"] == 2
+        assert report["buckets"] == 2
+        assert report["watermark"] == (batch[-1]["created_at"], batch[-1]["id"])
+        assert calls[0]["after"] is None
+        assert calls[0]["order_by"] == "+created_at"
+
+        upsert = next(
+            s
+            for s in _statements(conn, postgresql.Insert)
+            if s.table.name == "activity_rollup_hourly"
+        )
+        params = upsert.compile(dialect=postgresql.dialect()).params
+        read = next(i for i in range(2) if params[f"tool_name_m{i}"] == "Read")
+        assert params[f"event_count_m{read}"] == 2
+        assert params[f"duration_min_ms_m{read}"] == 10
+        assert params[f"duration_max_ms_m{read}"] == 100
+        sketch = LatencySketch.from_bytes(params[f"duration_sketch_m{read}"])
+        assert sketch.count == 2 and sketch.quantile(1) == pytest.approx(100, rel=0.01)
+
+        (update,) = _statements(conn, sa.Update)
+        assert update.compile().params["last_id"] == batch[-1]["id"]
+
+    @patch("src.analytics.rollup.get_engine")
+    async def test_many_buckets_stay_under_the_bind_limit(self, mock_get_engine):
+        engine, conn = _mock_engine(watermarks=[None, (None, None)])
+        mock_get_engine.return_value = engine
+        batch = [_event(i % 60, tool=f"tool{i}") for i in range(4000)]  # 4000 buckets
+        iter_, _ = _batches(batch)
+
+        with patch.object(Crud, "iter", iter_):
+            report = await run_rollup(now=HOUR + timedelta(hours=1))
+
+        assert report["buckets"] == 4000
+        upserts = [
+            s
+            for s in _statements(conn, postgresql.Insert)
+            if s.table.name == "activity_rollup_hourly"
+        ]
+        params = [len(s.compile(dialect=postgresql.dialect()).params) for s in upserts]
+        assert len(upserts) == 2
+        assert max(params) <= MAX_BIND_PARAMS
+        assert sum(params) == 4000 * 11
+
+    @patch("src.analytics.rollup.get_engine")
+    async def test_concurrent_run_detected(self, mock_get_engine):
+        engine, conn = _mock_engine(watermarks=[None, (HOUR, uuid4())])
+        mock_get_engine.return_value = engine
+        iter_, _ = _batches([_event(1)])
+
+        with (
+            patch.object(Crud, "iter", iter_),
+            pytest.raises(RuntimeError, match="concurrently"),
+        ):
+            await run_rollup(now=HOUR + timedelta(hours=1))
+        assert not _statements(conn, sa.Update)
+
+    @patch("src.analytics.rollup.get_engine")
+    async def test_resumes_from_saved_watermark(self, mock_get_engine):
+        saved = (HOUR, uuid4())
+        engine, _ = _mock_engine(watermarks=[saved])
+        mock_get_engine.return_value = engine
+        iter_, calls = _batches()
+
+        with patch.object(Crud, "iter", iter_):
+            report = await run_rollup(now=HOUR + timedelta(hours=1))
+
+        assert calls[0]["after"] == saved
+        assert report == {
+            "name": "activity_rollup_hourly",
+            "rows": 0,
+            "buckets": 0,
+            "watermark": saved,
+        }
+
+
+def _rollup_row(hour: int, agent: str, tool: str, durations: list[int], cost: float = 0.0):
+    bucket = Bucket()
+    for d in durations:
+        bucket.add(d, None)
+    bucket.cost_usd_sum = cost
+    return {
+        "bucket_start": HOUR + timedelta(hours=hour),
+        "agent_name": agent,
+        "tool_name": tool,
+        "hook_event": "PostToolUse",
+        **bucket.to_row(),
+    }
+
+
+class TestQueryRollups:
+    @patch("src.analytics.query.get_engine")
+    async def test_merges_hours_into_days(self, mock_get_engine):
+        rows = [
+            _rollup_row(0, "reviewer", "Read", [10, 20], cost=0.5),
+            _rollup_row(1, "reviewer", "Read", [30, 1000], cost=0.25),
+            _rollup_row(1, "lead", "", [], cost=1.0),
+        ]
+        engine, _ = _mock_engine(existing=rows)
+        mock_get_engine.return_value = engine
+
+        result = await query_rollups(HOUR, HOUR + timedelta(days=1), granularity="day")
+
+        assert [(r["agent_name"], r["tool_name"]) for r in result] == [
+            ("lead", None),
+            ("reviewer", "Read"),
+        ]
+        reviewer = result[1]
+        assert reviewer["period_start"] == HOUR.replace(hour=0)
+        assert reviewer["event_count"] == 4
+        assert (reviewer["min_ms"], reviewer["max_ms"]) == (10, 1000)
+        assert reviewer["p50_ms"] == pytest.approx(20, rel=0.01)
+        assert reviewer["cost_usd"] == 0.75
+        assert result[0]["p50_ms"] is None
+
+    @patch("src.analytics.query.get_engine")
+    async def test_helpers_filter_and_group(self, mock_get_engine):
+        engine, conn = _mock_engine(existing=[_rollup_row(0, "reviewer", "Read", [10])])
+        mock_get_engine.return_value = engine
+
+        latency = await tool_latency(HOUR, HOUR + timedelta(hours=1))
+        cost = await agent_cost(HOUR, HOUR + timedelta(hours=1), tool_name=None)
+
+        assert latency[0]["p95_ms"] == pytest.approx(10, rel=0.01)
+        assert set(cost[0]) >= {"agent_name", "cost_usd"} and "tool_name" not in cost[0]
+        first, second = (c.args[0] for c in conn.execute.call_args_list)
+        assert first.compile().params["hook_event_1"] == "PostToolUse"
+        assert second.compile().params["tool_name_1"] == ""
+
+    async def test_rejects_unknown_dimensions(self):
+        with pytest.raises(ValueError, match="dimension"):
+            await query_rollups(HOUR, HOUR, group_by=["session_id"])
+        with pytest.raises(ValueError, match="granularity"):
+            await query_rollups(HOUR, HOUR, granularity="week")
+
+
+def _copy_engine(driver):
+    conn = AsyncMock()
+    conn.get_raw_connection = AsyncMock(return_value=MagicMock(driver_connection=driver))
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    engine = MagicMock()
+    engine.begin = MagicMock(return_value=ctx)
+    return engine
+
+
+def _csv_row(minute: int, tool: str = "Read", summary: str | None = None) -> bytes:
+    """One agent_activity row as COPY ... (FORMAT csv) prints it."""
+    at = HOUR + timedelta(minutes=minute)
+    stamp = at.strftime("%Y-%m-%d %H:%M:%S+00")
+    quoted = "" if summary is None else f'"{summary}"'
+    fields = [
+        str(uuid4()), "", "", "reviewer", "", "s1", "PostToolUse", tool, quoted, "",
+        str(minute), "", "", stamp, stamp,
+    ]  # fmt: skip
+    return (",".join(fields) + "\n").encode()
+
+
+class TestExportActivity:
+    @pytest.fixture(autouse=True)
+    def _pyarrow(self):
+        pytest.importorskip("pyarrow")
+
+    @patch("src.analytics.export.get_engine")
+    async def test_copy_writes_date_partitions_and_watermark(self, mock_get_engine, tmp_path):
+        import pyarrow.dataset as ds
+
+        rows = [_csv_row(0, summary=""), _csv_row(30), _csv_row(11 * 60, "Bash")]
+        driver = MagicMock()
+
+        async def copy_from_query(query, *args, output, format):
+            assert format == "csv"
+            driver.args = args
+            await output(b"".join(rows[:2]))
+            await output(rows[2])
+
+        driver.copy_from_query = copy_from_query
+        mock_get_engine.return_value = _copy_engine(driver)
+
+        report = await export_activity(tmp_path, now=HOUR + timedelta(days=1))
+
+        assert report["rows"] == 3
+        assert [Path(f).parent.name for f in report["files"]] == [
+            "event_date=2026-10-17",
+            "event_date=2026-10-18",
+        ]
+        table = ds.dataset(tmp_path, partitioning="hive").to_table()
+        assert table.num_rows == 3
+        summaries = table.sort_by("duration_ms").column("tool_input_summary").to_pylist()
+        assert summaries[0] == "" and summaries[1] is None  # '' and NULL stay distinct
+        state = load_state(tmp_path)
+        assert state["rows_exported"] == 3
+        assert state["last_created_at"] == (HOUR + timedelta(minutes=660)).isoformat()
+        assert len(driver.args) == 1  # first run: only the cutoff
+
+        await export_activity(tmp_path, now=HOUR + timedelta(days=1))
+        assert driver.args[1:] == (HOUR + timedelta(minutes=660), UUID(state["last_id"]))
+
+    @patch("src.analytics.export.get_engine")
+    async def test_copy_spanning_blocks_keeps_multiline_summaries(self, mock_get_engine, tmp_path):
+        import pyarrow.dataset as ds
+
+        rows = [_csv_row(i % 60, summary=f"line one\nline two {i}") for i in range(2000)]
+        driver = MagicMock()
+
+        async def copy_from_query(query, *args, output, format):
+            await output(b"".join(rows))
+
+        driver.copy_from_query = copy_from_query
+        mock_get_engine.return_value = _copy_engine(driver)
+
+        # 16-row batches give 4 KiB CSV blocks, so the spool spans dozens of them.
+        report = await export_activity(tmp_path, batch_rows=16, now=HOUR + timedelta(days=1))
+
+        assert report["rows"] == 2000
+        summaries = (
+            ds.dataset(tmp_path, partitioning="hive").to_table().column("tool_input_summary")
+        )
+        assert sorted(summaries.to_pylist()) == sorted(
+            f"line one\nline two {i}" for i in range(2000)
+        )
+
+    @patch("src.analytics.export.get_engine")
+    async def test_cursor_fallback_without_copy(self, mock_get_engine, tmp_path):
+        import pyarrow.parquet as pq
+
+        mock_get_engine.return_value = _copy_engine(object())
+        batch = [
+            {c: None for c in _ACTIVITY_COLUMNS}
+            | {k: v for k, v in _event(m).items() if k != "tool_name"}
+            | {"tool_name": "Read"}
+            for m in (1, 2)
+        ]
+        iter_, calls = _batches(batch)
+
+        with patch.object(Crud, "iter", iter_):
+            report = await export_activity(tmp_path, now=HOUR + timedelta(hours=1))
+
+        assert calls[0]["stream"] is True
+        assert calls[0]["batch_size"] == 65_536
+        assert report["rows"] == 2
+        (path,) = report["files"]
+        assert pq.read_table(path).column("id").to_pylist() == [str(r["id"]) for r in batch]
+        assert not list(tmp_path.rglob(".*.inprogress"))
+
+    @patch("src.analytics.export.get_engine")
+    async def test_no_new_rows_keeps_state(self, mock_get_engine, tmp_path):
+        driver = MagicMock()
+        driver.copy_from_query = AsyncMock()
+        mock_get_engine.return_value = _copy_engine(driver)
+
+        report = await export_activity(tmp_path)
+
+        assert report == {"dest": str(tmp_path), "rows": 0, "files": [], "watermark": [None, None]}
+        assert load_state(tmp_path) == {}
@@ -0,0 +1,67 @@
+"""Tests for COPY-based bulk ingest with a mocked engine."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from src.db.bulk import bulk_copy_activity
+
+
+def _mock_engine(driver):
+    conn = AsyncMock()
+    conn.get_raw_connection = AsyncMock(return_value=MagicMock(driver_connection=driver))
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    engine = MagicMock()
+    engine.begin = MagicMock(return_value=ctx)
+    return engine, conn
+
+
+def _rows(n):
+    return [
+        {"task_id": uuid4(), "agent_name": "bench", "hook_event": "PostToolUse", "duration_ms": i}
+        for i in range(n)
+    ]
+
+
+class TestBulkCopy:
+    @patch("src.db.bulk.get_engine")
+    async def test_copy_records(self, mock_get_engine):
+        copied = []
+        driver = MagicMock()
+        driver.copy_records_to_table = AsyncMock(
+            side_effect=lambda name, records, columns: copied.extend(records)
+        )
+        mock_get_engine.return_value, conn = _mock_engine(driver)
+
+        count = await bulk_copy_activity(iter(_rows(3)))
+
+        assert count == 3
+        args, kwargs = driver.copy_records_to_table.call_args
+        assert args == ("agent_activity",)
+        # Column order follows the table definition, not the dict order
+        assert kwargs["columns"] == ["task_id", "agent_name", "hook_event", "duration_ms"]
+        assert [r[3] for r in copied] == [0, 1, 2]
+        conn.execute.assert_not_called()
+
+    @patch("src.db.bulk.get_engine")
+    async def test_falls_back_to_executemany(self, mock_get_engine):
+        driver = object()  # no copy_records_to_table
+        mock_get_engine.return_value, conn = _mock_engine(driver)
+
+        count = await bulk_copy_activity(_rows(2))
+
+        assert count == 2
+        conn.execute.assert_called_once()
+        assert len(conn.execute.call_args.args[1]) == 2
+
+    async def test_empty_is_noop(self):
+        assert await bulk_copy_activity([]) == 0
+
+    async def test_unknown_column_rejected(self):
+        with pytest.raises(ValueError, match="bogus"):
+            await bulk_copy_activity([{"agent_name": "a", "bogus": 1}])
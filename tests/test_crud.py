@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
-from src.db.crud import Crud
+from src.db.crud import MAX_BIND_PARAMS, Crud
 from src.db.tables import tasks
 
 
@@ -125,6 +128,24 @@ class TestCrudIncrement:
         mock_session.commit.assert_called_once()
 
 
+class TestCrudIncrementMany:
+    @patch("src.db.crud.get_session_factory")
+    async def test_single_update_from_values(self, mock_factory, crud, mock_session):
+        mock_session.execute.return_value = MagicMock(rowcount=2)
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        updated = await crud.increment_many("actual_cost_usd", {uuid4(): 0.1, uuid4(): 0.2})
+
+        assert updated == 2
+        mock_session.execute.assert_called_once()
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "SET actual_cost_usd=(tasks.actual_cost_usd + v.amount)" in sql
+        assert "WHERE tasks.id = v.id" in sql
+
+    async def test_empty_is_noop(self, crud):
+        assert await crud.increment_many("actual_cost_usd", {}) == 0
+
+
 class TestCrudCount:
     @patch("src.db.crud.get_session_factory")
     async def test_count(self, mock_factory, crud, mock_session):
@@ -133,3 +154,248 @@ class TestCrudCount:
 
         result = await crud.count(status="pending")
         assert result == 5
+
+
+class TestCrudConnectionPath:
+    @patch("src.db.crud.get_session_factory")
+    @patch("src.db.crud.get_engine")
+    async def test_use_connection_skips_session(self, mock_engine, mock_factory, mock_session):
+        task_id = uuid4()
+        mock_session.execute.return_value = MagicMock(
+            mappings=lambda: MagicMock(first=lambda: {"id": task_id, "status": "completed"})
+        )
+        mock_engine.return_value.connect = MagicMock(return_value=mock_session)
+
+        result = await Crud(tasks, use_connection=True).update(task_id, status="completed")
+
+        assert result["status"] == "completed"
+        mock_session.commit.assert_called_once()
+        mock_factory.assert_not_called()
+
+
+class TestCrudCreateMany:
+    @patch("src.db.crud.get_session_factory")
+    async def test_chunks_stay_under_param_limit(self, mock_factory, crud, mock_session):
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+        rows = [{"title": f"t{i}", "priority": "low"} for i in range(MAX_BIND_PARAMS // 2 + 10)]
+
+        result = await crud.create_many(rows, returning=False)
+
+        assert result == []
+        assert mock_session.execute.call_count == 2
+        first_stmt = mock_session.execute.call_args_list[0].args[0]
+        assert len(first_stmt._multi_values[0]) * 2 <= MAX_BIND_PARAMS
+        mock_session.commit.assert_called_once()
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_chunk_size_and_returning(self, mock_factory, crud, mock_session):
+        mock_session.execute.return_value = MagicMock(
+            mappings=lambda: MagicMock(all=lambda: [{"id": uuid4(), "title": "x"}])
+        )
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        result = await crud.create_many(
+            [{"title": "a"}, {"title": "b"}, {"title": "c"}], chunk_size=1
+        )
+
+        assert mock_session.execute.call_count == 3
+        assert len(result) == 3
+
+    async def test_mismatched_columns_rejected(self, crud):
+        with pytest.raises(ValueError, match="same columns"):
+            await crud.create_many([{"title": "a"}, {"title": "b", "priority": "high"}])
+
+    async def test_empty_is_noop(self, crud):
+        assert await crud.create_many([]) == []
+
+
+class TestCrudUpsertMany:
+    @patch("src.db.crud.get_session_factory")
+    async def test_on_conflict_update(self, mock_factory, crud, mock_session):
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        await crud.upsert_many(
+            [{"id": uuid4(), "title": "a", "status": "pending"}],
+            update_cols=["title"],
+            returning=False,
+        )
+
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO UPDATE SET title = excluded.title" in sql
+        assert "RETURNING" not in sql
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_empty_update_cols_does_nothing(self, mock_factory, crud, mock_session):
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        await crud.upsert_many([{"id": uuid4(), "title": "a"}], update_cols=[], returning=False)
+
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO NOTHING" in sql
+
+
+class TestCrudIter:
+    @patch("src.db.crud.get_session_factory")
+    async def test_keyset_pages_until_short_batch(self, mock_factory, crud, mock_session):
+        pages = [
+            [{"id": uuid4(), "created_at": i} for i in range(2)],
+            [{"id": uuid4(), "created_at": 2}],
+        ]
+        mock_session.execute.side_effect = [
+            MagicMock(mappings=lambda p=p: MagicMock(all=lambda: p)) for p in pages
+        ]
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        batches = [b async for b in crud.iter(batch_size=2, order_by="+created_at")]
+
+        assert [len(b) for b in batches] == [2, 1]
+        first, second = (c.args[0] for c in mock_session.execute.call_args_list)
+        assert first.whereclause is None
+        sql = str(second.compile(dialect=postgresql.dialect()))
+        assert "(tasks.created_at, tasks.id) >" in sql
+        assert "ORDER BY tasks.created_at ASC, tasks.id ASC" in sql
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_descending_uses_less_than(self, mock_factory, crud, mock_session):
+        page = [{"id": uuid4(), "created_at": 1}]
+        mock_session.execute.side_effect = [
+            MagicMock(mappings=lambda: MagicMock(all=lambda: page)),
+            MagicMock(mappings=lambda: MagicMock(all=list)),
+        ]
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        batches = [b async for b in crud.iter(batch_size=1, status="pending")]
+
+        assert len(batches) == 1
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "(tasks.created_at, tasks.id) <" in sql
+        assert "tasks.status =" in sql
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_stream_uses_server_side_cursor(self, mock_factory, crud, mock_session):
+        async def partitions(size):
+            yield [{"id": uuid4()}, {"id": uuid4()}]
+            yield [{"id": uuid4()}]
+
+        mock_session.stream = AsyncMock(
+            return_value=MagicMock(mappings=lambda: MagicMock(partitions=partitions))
+        )
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        batches = [b async for b in crud.iter(batch_size=2, stream=True)]
+
+        assert [len(b) for b in batches] == [2, 1]
+        stmt = mock_session.stream.call_args.args[0]
+        assert stmt.get_execution_options()["yield_per"] == 2
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_resumes_after_cursor_with_extra_conditions(
+        self, mock_factory, crud, mock_session
+    ):
+        mock_session.execute.return_value = MagicMock(mappings=lambda: MagicMock(all=list))
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        cursor = (datetime(2026, 1, 1, tzinfo=UTC), uuid4())
+        where = [tasks.c.created_at < datetime(2026, 2, 1, tzinfo=UTC)]
+        batches = [b async for b in crud.iter(order_by="+created_at", after=cursor, where=where)]
+
+        assert batches == []
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "(tasks.created_at, tasks.id) >" in sql
+        assert "tasks.created_at <" in sql
+
+    async def test_unknown_order_column(self, crud):
+        with pytest.raises(ValueError, match="order_by"):
+            [b async for b in crud.iter(order_by="nope")]
+
+
+class TestCrudGetMany:
+    @patch("src.db.crud.get_session_factory")
+    async def test_single_any_query(self, mock_factory, crud, mock_session):
+        a, b = uuid4(), uuid4()
+        mock_session.execute.return_value = MagicMock(
+            mappings=lambda: MagicMock(all=lambda: [{"id": a, "title": "A"}])
+        )
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        result = await crud.get_many([a, b, a])
+
+        assert result == {a: {"id": a, "title": "A"}}
+        stmt = mock_session.execute.call_args.args[0]
+        assert "= ANY (%(ids)s::UUID[])" in str(stmt.compile(dialect=postgresql.dialect()))
+        assert stmt.compile().params["ids"] == [a, b]
+
+    async def test_empty_is_noop(self, crud):
+        assert await crud.get_many([]) == {}
+
+
+class TestCrudLoader:
+    async def test_coalesces_concurrent_loads(self, crud):
+        a, b, missing = uuid4(), uuid4(), uuid4()
+        with patch.object(
+            crud, "get_many", AsyncMock(return_value={a: {"id": a}, b: {"id": b}})
+        ) as get_many:
+            loader = crud.loader()
+            results = await asyncio.gather(
+                loader.load(a), loader.load(b), loader.load(a), loader.load(missing)
+            )
+            assert results == [{"id": a}, {"id": b}, {"id": a}, None]
+            get_many.assert_called_once()
+            assert list(get_many.call_args.args[0]) == [a, b, missing]
+
+            # Memoized: no second query
+            assert await loader.load(a) == {"id": a}
+            get_many.assert_called_once()
+
+    async def test_max_batch_splits_queries(self, crud):
+        ids = [uuid4() for _ in range(5)]
+        with patch.object(crud, "get_many", AsyncMock(return_value={})) as get_many:
+            assert await crud.loader(max_batch=2).load_many(ids) == [None] * 5
+            assert get_many.call_count == 3
+
+    async def test_failure_propagates_and_is_not_cached(self, crud):
+        task_id = uuid4()
+        with patch.object(crud, "get_many", AsyncMock(side_effect=RuntimeError("DB down"))):
+            loader = crud.loader()
+            with pytest.raises(RuntimeError):
+                await loader.load(task_id)
+        with patch.object(crud, "get_many", AsyncMock(return_value={task_id: {"id": task_id}})):
+            assert await loader.load(task_id) == {"id": task_id}
+
+
+class TestCrudProjection:
+    @patch("src.db.crud.get_session_factory")
+    async def test_find_selects_only_named_columns(self, mock_factory, crud, mock_session):
+        mock_session.execute.return_value = MagicMock(
+            mappings=lambda: MagicMock(all=lambda: [{"id": uuid4(), "title": "a"}])
+        )
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        await crud.find(columns=["id", "title"], status="pending")
+
+        stmt = mock_session.execute.call_args.args[0]
+        assert [c.name for c in stmt.selected_columns] == ["id", "title"]
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_get_many_always_includes_id(self, mock_factory, crud, mock_session):
+        mock_session.execute.return_value = MagicMock(mappings=lambda: MagicMock(all=list))
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        await crud.get_many([uuid4()], columns=["status"])
+
+        stmt = mock_session.execute.call_args.args[0]
+        assert [c.name for c in stmt.selected_columns] == ["status", "id"]
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_iter_includes_keyset_columns(self, mock_factory, crud, mock_session):
+        mock_session.execute.return_value = MagicMock(mappings=lambda: MagicMock(all=list))
+        mock_factory.return_value = MagicMock(return_value=mock_session)
+
+        [b async for b in crud.iter(columns=["actual_cost_usd"], order_by="+updated_at")]
+
+        stmt = mock_session.execute.call_args.args[0]
+        assert [c.name for c in stmt.selected_columns] == ["actual_cost_usd", "updated_at", "id"]
+
+    async def test_unknown_column_rejected(self, crud):
+        with pytest.raises(ValueError, match="bogus"):
+            await crud.get(uuid4(), columns=["title", "bogus"])
@@ -0,0 +1,108 @@
+"""Tests for engine and session factory lifecycle (no database needed)."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from src.db import engine as engine_mod
+from src.db.pool import POOL_PROFILES, InstrumentedAsyncPool, PoolStatsMixin, pool_settings
+
+
+@pytest.fixture
+async def dummy_url(monkeypatch):
+    monkeypatch.setenv("PRJ_NEON_DATABASE_URL", "postgresql://bench@localhost:1/none")
+    await engine_mod.dispose_engine()
+    yield
+    await engine_mod.dispose_engine()
+
+
+class TestSessionFactory:
+    async def test_factory_is_cached(self, dummy_url):
+        assert engine_mod.get_session_factory() is engine_mod.get_session_factory()
+
+    async def test_dispose_resets_factory(self, dummy_url):
+        first = engine_mod.get_session_factory()
+        await engine_mod.dispose_engine()
+        second = engine_mod.get_session_factory()
+        assert first is not second
+        assert second.kw["bind"] is engine_mod.get_engine()
+
+
+@pytest.fixture
+def clean_pool_env(monkeypatch):
+    for key in (
+        "PRJ_DB_POOL_PROFILE",
+        "PRJ_DB_POOL_SIZE",
+        "PRJ_DB_MAX_OVERFLOW",
+        "PRJ_DB_POOL_RECYCLE",
+        "PRJ_DB_POOL_TIMEOUT",
+        "PRJ_DB_POOL_PRE_PING",
+    ):
+        monkeypatch.delenv(key, raising=False)
+    return monkeypatch
+
+
+class TestPoolSettings:
+    def test_default_profile_matches_original_settings(self, clean_pool_env):
+        name, settings = pool_settings()
+        assert name == "api"
+        assert settings["pool_size"] == 5
+        assert settings["max_overflow"] == 2
+        assert settings["pool_pre_ping"] is True
+
+    def test_profile_from_env(self, clean_pool_env):
+        clean_pool_env.setenv("PRJ_DB_POOL_PROFILE", "hook-writer")
+        name, settings = pool_settings()
+        assert name == "hook-writer"
+        assert settings == POOL_PROFILES["hook-writer"]
+
+    def test_env_overrides(self, clean_pool_env):
+        clean_pool_env.setenv("PRJ_DB_POOL_SIZE", "12")
+        clean_pool_env.setenv("PRJ_DB_POOL_PRE_PING", "false")
+        _, settings = pool_settings("batch")
+        assert settings["pool_size"] == 12
+        assert settings["pool_pre_ping"] is False
+        assert settings["max_overflow"] == POOL_PROFILES["batch"]["max_overflow"]
+
+    def test_unknown_profile_rejected(self, clean_pool_env):
+        with pytest.raises(ValueError, match="Unknown pool profile"):
+            pool_settings("huge")
+
+    async def test_engine_uses_instrumented_pool(self, clean_pool_env, dummy_url):
+        clean_pool_env.setenv("PRJ_DB_POOL_PROFILE", "batch")
+        pool = engine_mod.get_engine().pool
+        assert isinstance(pool, InstrumentedAsyncPool)
+        assert pool.size() == POOL_PROFILES["batch"]["pool_size"]
+        stats = engine_mod.get_pool_stats()
+        assert stats["profile"] == "batch"
+        assert stats["checked_out"] == 0
+
+
+class _StatsQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class TestPoolStats:
+    def test_checkout_overflow_and_age(self):
+        pool = _StatsQueuePool(MagicMock, pool_size=1, max_overflow=1, timeout=0.01)
+        first = pool.connect()
+        second = pool.connect()  # beyond pool_size → overflow
+
+        stats = pool.stats()
+        assert stats["checkouts"] == 2
+        assert stats["checked_out"] == 2
+        assert stats["overflow_hits"] == 1
+        assert stats["wait_ms"]["count"] == 2
+        assert stats["connection_age_s"]["count"] == 2
+
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        assert pool.stats()["timeouts"] == 1
+
+        first.close()
+        second.close()
+        assert pool.stats()["checked_out"] == 0
@@ -0,0 +1,366 @@
+"""Tests for the task dependency graph: DAG checks, closure index, and scheduler."""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, create_autospec, patch
+from uuid import uuid4
+
+import pytest
+
+from src.db.crud import Crud
+from src.graph.closure import ClosureIndex
+from src.graph.dag import (
+    CycleError,
+    DependencyGraph,
+    insert_dependency,
+    load_graph,
+    load_task_weights,
+)
+from src.graph.scheduler import TaskScheduler, load_scheduler
+
+T0 = datetime(2026, 10, 17, tzinfo=UTC)
+
+
+def _ids(n):
+    return [uuid4() for _ in range(n)]
+
+
+def _scheduler(priorities, edges, statuses=None):
+    """Scheduler over tasks 0..n-1 with the given priorities and (blocker, blocked) edges."""
+    ids = _ids(len(priorities))
+    statuses = statuses or {}
+    rows = [
+        {
+            "id": ids[i],
+            "priority": p,
+            "status": statuses.get(i, "pending"),
+            "created_at": T0 + timedelta(minutes=i),
+        }
+        for i, p in enumerate(priorities)
+    ]
+    edge_rows = [{"blocker_task_id": ids[a], "blocked_task_id": ids[b]} for a, b in edges]
+    return TaskScheduler.from_rows(rows, edge_rows), ids
+
+
+def _reaches(graph, src, dst):
+    seen, stack = {src}, [src]
+    while stack:
+        node = stack.pop()
+        if node == dst:
+            return True
+        for nxt in graph.successors(node) - seen:
+            seen.add(nxt)
+            stack.append(nxt)
+    return False
+
+
+def _assert_order_valid(graph):
+    position = {node: i for i, node in enumerate(graph.topological_order())}
+    assert len(position) == len(graph)
+    for u, i in position.items():
+        for v in graph.successors(u):
+            assert i < position[v]
+
+
+def _patch_iter(pages):
+    """Patch Crud.iter to yield `pages[table.name]`, checking calls against its real signature."""
+
+    async def iter_(self, **kwargs):
+        for page in pages[self.table.name]:
+            yield page
+
+    return patch.object(Crud, "iter", create_autospec(Crud.iter, side_effect=iter_))
+
+
+class TestDependencyGraph:
+    def test_cycle_is_rejected_with_path_and_graph_unchanged(self):
+        graph = DependencyGraph.from_edges([("a", "b"), ("b", "c"), ("c", "d")])
+        before = graph.topological_order()
+
+        with pytest.raises(CycleError) as exc:
+            graph.add_edge("d", "a")
+
+        assert exc.value.cycle == ["d", "a", "b", "c", "d"]
+        assert not graph.has_edge("d", "a")
+        assert graph.topological_order() == before
+        assert graph.would_create_cycle("c", "b")
+        assert not graph.would_create_cycle("a", "d")
+        with pytest.raises(CycleError):
+            graph.add_edge("a", "a")
+
+    def test_reorders_when_edge_disagrees_with_order(self):
+        graph = DependencyGraph()
+        for node in "abcd":
+            graph.add_node(node)
+        assert graph.add_edge("d", "a") is True
+        assert graph.add_edge("c", "d") is True
+        assert graph.add_edge("c", "d") is False  # duplicate
+
+        _assert_order_valid(graph)
+
+    def test_from_edges_rejects_existing_cycle(self):
+        with pytest.raises(CycleError) as exc:
+            DependencyGraph.from_edges([(1, 2), (2, 3), (3, 1), (0, 1)])
+
+        cycle = exc.value.cycle
+        assert cycle[0] == cycle[-1] and set(cycle) == {1, 2, 3}
+
+    def test_random_inserts_match_naive_reachability(self):
+        rng = random.Random(7)
+        graph = DependencyGraph()
+        for node in range(60):
+            graph.add_node(node)
+        for _ in range(600):
+            u, v = rng.sample(range(60), 2)
+            expected_cycle = _reaches(graph, v, u)
+            assert graph.would_create_cycle(u, v) is expected_cycle
+            if expected_cycle:
+                with pytest.raises(CycleError):
+                    graph.add_edge(u, v)
+            else:
+                graph.add_edge(u, v)
+            if rng.random() < 0.1:
+                edges = [(a, b) for a in range(60) for b in graph.successors(a)]
+                if edges:
+                    graph.remove_edge(*rng.choice(edges))
+        _assert_order_valid(graph)
+
+    def test_critical_path_uses_node_weights(self):
+        #  a(1) -> b(5) -> d(1)
+        #  a(1) -> c(2) -> d(1)
+        graph = DependencyGraph.from_edges([("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+        graph.add_node("e")
+
+        total, path = graph.critical_path({"a": 1, "b": 5, "c": 2, "d": 1, "e": 3})
+
+        assert (total, path) == (7, ["a", "b", "d"])
+        assert DependencyGraph().critical_path({}) == (0.0, [])
+
+    def test_100k_node_graph_checks_edges_quickly(self):
+        n = 100_000
+        rng = random.Random(1)
+        edges = [(rng.randrange(max(0, j - 50), j), j) for j in range(1, n) for _ in range(2)]
+        graph = DependencyGraph.from_edges(edges)
+
+        start = time.perf_counter()
+        for _ in range(200):
+            j = rng.randrange(1000, n)
+            i = rng.randrange(j - 500, j)
+            try:
+                graph.add_edge(j, i)
+            except CycleError:
+                pass
+        assert time.perf_counter() - start < 2.0
+        _assert_order_valid(graph)
+
+    @patch("src.graph.dag.Crud")
+    async def test_insert_dependency_rolls_back_edge_on_db_error(self, mock_crud):
+        graph = DependencyGraph.from_edges([("a", "b")])
+        mock_crud.return_value.create = AsyncMock(side_effect=RuntimeError("db down"))
+
+        with pytest.raises(RuntimeError):
+            await insert_dependency(graph, "b", "c")
+        assert not graph.has_edge("b", "c")
+
+        with pytest.raises(CycleError):
+            await insert_dependency(graph, "b", "a")
+        mock_crud.return_value.create.assert_awaited_once()
+
+    async def test_load_graph_and_duration_weights(self):
+        ids = _ids(3)
+        pages = {
+            "task_dependencies": [[{"blocker_task_id": ids[0], "blocked_task_id": ids[1]}],
+                                  [{"blocker_task_id": ids[1], "blocked_task_id": ids[2]}]],
+            "tasks": [[
+                {"id": ids[0], "assigned_agent": "x", "started_at": T0,
+                 "completed_at": T0 + timedelta(seconds=30)},
+                {"id": ids[1], "assigned_agent": "x", "started_at": T0, "completed_at": None},
+                {"id": ids[2], "assigned_agent": "y", "started_at": None, "completed_at": None},
+            ]],
+        }  # fmt: skip
+        with _patch_iter(pages):
+            graph = await load_graph()
+            weights = await load_task_weights("duration")
+
+        assert graph.topological_order() == ids
+        assert weights == {ids[0]: 30.0, ids[1]: 30.0, ids[2]: 30.0}
+        assert graph.critical_path(weights) == (90.0, ids)
+        with pytest.raises(ValueError):
+            await load_task_weights("tokens")
+
+
+class TestClosureIndex:
+    def test_blockers_and_dependents_are_transitive(self):
+        #  a -> b -> d
+        #  c ------> d -> e
+        index = ClosureIndex(
+            DependencyGraph.from_edges([("a", "b"), ("b", "d"), ("c", "d"), ("d", "e")])
+        )
+
+        assert index.blockers("e") == {"a", "b", "c", "d"}
+        assert index.dependents("a") == {"b", "d", "e"}
+        assert index.open_blockers("e", {"a", "b", "c"}) == {"d"}
+        assert index.depends_on("e", "a") and not index.depends_on("a", "e")
+
+    def test_remove_edge_keeps_alternative_paths(self):
+        index = ClosureIndex()
+        for u, v in [("a", "b"), ("b", "c"), ("a", "c"), ("c", "d")]:
+            index.add_edge(u, v)
+
+        index.remove_edge("b", "c")
+        assert index.blockers("d") == {"a", "c"}
+        assert index.dependents("b") == set()
+
+        index.remove_node("c")
+        assert index.dependents("a") == {"b"}
+        assert index.blockers("d") == set()
+
+    def test_cycle_leaves_index_unchanged(self):
+        index = ClosureIndex(DependencyGraph.from_edges([(1, 2), (2, 3)]))
+
+        with pytest.raises(CycleError):
+            index.add_edge(3, 1)
+        assert index.dependents(3) == set()
+        assert index.blockers(1) == set()
+
+    def test_random_updates_match_naive_reachability(self):
+        rng = random.Random(11)
+        index = ClosureIndex()
+        for node in range(40):
+            index.add_node(node)
+        for _ in range(400):
+            edges = [(a, b) for a in range(40) for b in index.graph.successors(a)]
+            if edges and rng.random() < 0.3:
+                index.remove_edge(*rng.choice(edges))
+            else:
+                u, v = rng.sample(range(40), 2)
+                try:
+                    index.add_edge(u, v)
+                except CycleError:
+                    pass
+        for node in range(40):
+            expected = {
+                other for other in range(40) if other != node and _reaches(index.graph, node, other)
+            }
+            assert index.dependents(node) == expected
+            assert all(node in index.blockers(other) for other in expected)
+
+
+class TestTaskScheduler:
+    def test_ready_tasks_respect_dependencies_and_priority(self):
+        #  0 ─┬─> 2
+        #  1 ─┘   3 (no deps)
+        scheduler, ids = _scheduler(["low", "medium", "critical", "high"], [(0, 2), (1, 2)])
+
+        assert scheduler.ready_tasks() == [ids[3], ids[1], ids[0]]
+        assert scheduler.waiting_on(ids[2]) == 2
+
+    def test_mark_completed_emits_newly_ready_by_priority(self):
+        scheduler, ids = _scheduler(
+            ["medium", "low", "critical", "high"], [(0, 1), (0, 2), (0, 3), (3, 2)]
+        )
+
+        assert scheduler.mark_completed(ids[0]) == [ids[3], ids[1]]
+        assert scheduler.mark_completed(ids[3]) == [ids[2]]
+        assert scheduler.mark_completed(ids[3]) == []  # idempotent
+
+    def test_completed_blockers_are_already_satisfied(self):
+        scheduler, ids = _scheduler(["medium", "medium"], [(0, 1)], statuses={0: "completed"})
+
+        assert scheduler.ready_tasks() == [ids[1]]
+
+    def test_ties_break_by_created_at(self):
+        scheduler, ids = _scheduler(["high", "high", "high"], [])
+        assert scheduler.ready_tasks() == ids
+
+    def test_pop_ready_dispatches_in_order(self):
+        scheduler, ids = _scheduler(["low", "critical", "medium"], [(1, 2)])
+
+        assert scheduler.pop_ready() == ids[1]
+        assert scheduler.status(ids[1]) == "in_progress"
+        assert scheduler.pop_ready() == ids[0]
+        assert scheduler.pop_ready() is None
+        assert scheduler.mark_completed(ids[1]) == [ids[2]]
+        assert scheduler.pop_ready() == ids[2]
+
+    def test_failed_blocker_keeps_dependents_waiting_until_retried(self):
+        scheduler, ids = _scheduler(["medium", "medium"], [(0, 1)])
+        scheduler.mark_started(ids[0])
+        scheduler.mark_failed(ids[0])
+
+        assert scheduler.ready_tasks() == []
+        assert scheduler.retry(ids[0]) is True
+        assert scheduler.mark_completed(ids[0]) == [ids[1]]
+
+    @pytest.mark.parametrize("track_closure", [False, True])
+    def test_failure_cancels_transitive_dependents(self, track_closure):
+        #  0 -> 1 -> 2      3 (independent)
+        #       1 -> 4 (already in progress)
+        ids = _ids(5)
+        rows = [{"id": i, "priority": "medium", "status": "pending"} for i in ids]
+        rows[4]["status"] = "in_progress"
+        edges = [(0, 1), (1, 2), (1, 4)]
+        scheduler = TaskScheduler.from_rows(
+            rows,
+            [{"blocker_task_id": ids[a], "blocked_task_id": ids[b]} for a, b in edges],
+            track_closure=track_closure,
+        )
+
+        cancelled = scheduler.mark_failed(ids[0], cancel_dependents=True)
+
+        assert set(cancelled) == {ids[1], ids[2]}
+        assert scheduler.status(ids[2]) == "cancelled"
+        assert scheduler.status(ids[4]) == "in_progress"
+        assert scheduler.ready_tasks() == [ids[3]]
+        assert (scheduler.closure is not None) is track_closure
+
+    def test_tracked_closure_follows_new_dependencies(self):
+        scheduler = TaskScheduler(track_closure=True)
+        ids = _ids(3)
+        for task_id in ids:
+            scheduler.add_task(task_id)
+        scheduler.add_dependency(ids[0], ids[1])
+        scheduler.add_dependency(ids[1], ids[2])
+
+        assert scheduler.closure.blockers(ids[2]) == {ids[0], ids[1]}
+        assert scheduler.mark_failed(ids[1]) == []
+        assert scheduler.status(ids[2]) == "pending"
+
+    def test_rejects_self_dependency_and_duplicates(self):
+        scheduler, ids = _scheduler(["medium"], [])
+        with pytest.raises(ValueError):
+            scheduler.add_dependency(ids[0], ids[0])
+        with pytest.raises(ValueError):
+            scheduler.add_task(ids[0])
+
+    def test_rejects_cycles_and_ignores_duplicate_edges(self):
+        scheduler, ids = _scheduler(["medium"] * 3, [(0, 1), (1, 2)])
+        scheduler.add_dependency(ids[0], ids[1])
+
+        with pytest.raises(CycleError):
+            scheduler.add_dependency(ids[2], ids[0])
+        assert scheduler.waiting_on(ids[1]) == 1
+        assert scheduler.waiting_on(ids[0]) == 0
+
+    def test_chain_of_10k_completes_incrementally(self):
+        n = 10_000
+        scheduler, ids = _scheduler(["medium"] * n, [(i, i + 1) for i in range(n - 1)])
+
+        for i in range(n - 1):
+            assert scheduler.mark_completed(ids[i]) == [ids[i + 1]]
+
+    async def test_load_reads_tasks_and_edges_once(self):
+        ids = _ids(2)
+        pages = {
+            "tasks": [[{"id": ids[0], "priority": "high", "status": "pending", "created_at": T0}],
+                      [{"id": ids[1], "priority": "low", "status": "pending", "created_at": T0}]],
+            "task_dependencies": [[{"blocker_task_id": ids[0], "blocked_task_id": ids[1]}]],
+        }  # fmt: skip
+        with _patch_iter(pages):
+            scheduler = await load_scheduler()
+
+        assert len(scheduler) == 2
+        assert scheduler.ready_tasks() == [ids[0]]
@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.dialects import postgresql
 
 from src.hooks.activity_tracker import get_activity_hooks
-from src.hooks.cost_tracker import update_task_cost_from_result
+from src.hooks.activity_writer import ACTIVITY_FIELDS, ActivityWriter, with_activity_key
+from src.hooks.collector import ActivityCollector, CollectorClient
+from src.hooks.cost_tracker import CostLedger, update_task_cost_from_result
+from src.hooks.latency import LatencyRecorder
+from src.hooks.outbox import ActivityOutbox
+from src.hooks.serialize import bounded_repr, summarize_input, summarize_response
+from src.hooks.tool_timer import ToolTimer
 
 
 @pytest.fixture
@@ -84,14 +94,15 @@ class TestCostTracker:
         session.__aenter__ = AsyncMock(return_value=session)
         session.__aexit__ = AsyncMock(return_value=False)
         mock_factory.return_value = MagicMock(return_value=session)
+        session.execute.return_value = MagicMock()  # sync .mappings().first(), like a Result
 
         result = MagicMock()
         result.total_cost_usd = 0.05
 
         await update_task_cost_from_result(uuid4(), result)
 
-        session.execute.assert_called_once()
-        session.commit.assert_called_once()
+        session.execute.assert_awaited_once()
+        session.commit.assert_awaited_once()
 
     @patch("src.db.crud.get_session_factory")
     async def test_zero_cost_skipped(self, mock_factory):
@@ -124,3 +135,541 @@ class TestCostTracker:
 
         # Should not raise
         await update_task_cost_from_result(uuid4(), result)
+
+
+class TestActivityWriter:
+    @patch("src.db.crud.get_engine")
+    async def test_hooks_enqueue_without_db_round_trip(self, mock_engine, mock_session):
+        factory, session = mock_session
+        mock_engine.return_value.connect = factory
+
+        writer = ActivityWriter(max_batch=100, max_delay=60)
+        hooks = get_activity_hooks(task_id=uuid4(), agent_name="reviewer", writer=writer)
+        await hooks["PreToolUse"]("Read", {"file_path": "/test.py"})
+        await hooks["PostToolUse"]("Read", {"file_path": "/test.py"}, "file contents")
+
+        session.execute.assert_not_called()
+        assert writer.pending == 2
+
+        await writer.aclose()
+        session.execute.assert_called_once()
+        session.commit.assert_called_once()
+        assert writer.written == 2
+        assert writer.pending == 0
+
+    @patch("src.db.crud.get_engine")
+    async def test_flush_chunks_by_max_batch(self, mock_engine, mock_session):
+        factory, session = mock_session
+        mock_engine.return_value.connect = factory
+
+        writer = ActivityWriter(max_batch=2, max_delay=60)
+        hooks = get_activity_hooks(agent_name="lead", writer=writer)
+        for _ in range(5):
+            await hooks["Stop"](num_turns=1)
+        await writer.flush()
+
+        assert session.execute.await_count == 3
+        assert writer.written == 5
+        await writer.aclose()
+
+    @patch("src.db.crud.get_engine")
+    async def test_idempotent_writer_ignores_duplicate_ids(self, mock_engine, mock_session):
+        factory, session = mock_session
+        mock_engine.return_value.connect = factory
+
+        writer = ActivityWriter(max_delay=60, idempotent=True)
+        writer.enqueue({"agent_name": "a", "hook_event": "Stop"})
+        await writer.aclose()
+
+        stmt = session.execute.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id, event_at) DO NOTHING" in sql
+        assert "(id, agent_name, hook_event, event_at)" in sql  # key filled in on enqueue
+
+    @patch("src.db.crud.get_engine")
+    async def test_background_flush_after_max_delay(self, mock_engine, mock_session):
+        factory, session = mock_session
+        mock_engine.return_value.connect = factory
+
+        writer = ActivityWriter(max_batch=100, max_delay=0.01)
+        hooks = get_activity_hooks(agent_name="lead", writer=writer)
+        await hooks["Stop"](num_turns=1)
+        await asyncio.sleep(0.05)
+
+        session.execute.assert_called_once()
+        assert writer.pending == 0
+        await writer.aclose()
+
+    async def test_drops_when_full(self):
+        writer = ActivityWriter(max_batch=1, max_delay=60, max_queue=1)
+        writer._closed = True  # keep the background task from starting
+        writer.enqueue({"agent_name": "a", "hook_event": "Stop"})
+        assert writer.dropped == 1
+        assert writer.pending == 0
+
+    @patch("src.db.crud.get_engine")
+    async def test_db_failure_does_not_raise(self, mock_engine, mock_session):
+        factory, session = mock_session
+        session.execute.side_effect = RuntimeError("DB down")
+        mock_engine.return_value.connect = factory
+
+        writer = ActivityWriter(max_delay=60)
+        hooks = get_activity_hooks(agent_name="test", writer=writer)
+        await hooks["PreToolUse"]("Read", {})
+        await writer.aclose()
+
+        assert writer.failed == 1
+
+    async def test_close_during_slow_write_keeps_in_flight_batch(self):
+        writer = ActivityWriter(max_batch=2, max_delay=60)
+        started = asyncio.Event()
+        written: list[dict] = []
+
+        async def slow_write(batch):
+            started.set()
+            await asyncio.sleep(0.05)
+            written.extend(batch)
+
+        with patch.object(writer, "_write", side_effect=slow_write):
+            for i in range(4):
+                writer.enqueue({"agent_name": "a", "hook_event": "Stop", "num_turns": i})
+            await started.wait()  # the background task holds the first batch
+            await writer.aclose()
+
+        assert [row["num_turns"] for row in written] == [0, 1, 2, 3]
+        assert writer.pending == 0
+
+
+class TestCostLedger:
+    @patch("src.db.crud.get_session_factory")
+    async def test_coalesces_deltas_into_one_update(self, mock_factory, mock_session):
+        factory, session = mock_session
+        session.execute.return_value = MagicMock(rowcount=2)
+        mock_factory.return_value = factory
+
+        ledger = CostLedger(interval=60)
+        a, b = uuid4(), uuid4()
+        for task_id, cost in ((a, 0.05), (a, 0.10), (b, 0.02)):
+            result = MagicMock(total_cost_usd=cost)
+            await update_task_cost_from_result(task_id, result, ledger=ledger)
+
+        session.execute.assert_not_called()
+        assert ledger.unflushed(a) == pytest.approx(0.15)
+        assert ledger.unflushed() == pytest.approx(0.17)
+
+        await ledger.aclose()
+
+        session.execute.assert_called_once()
+        session.commit.assert_called_once()
+        assert "FROM (VALUES" in str(session.execute.call_args.args[0])
+        assert ledger.unflushed() == 0
+        assert ledger.flushed_usd == pytest.approx(0.17)
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_failed_flush_keeps_deltas(self, mock_factory, mock_session):
+        factory, session = mock_session
+        session.execute.side_effect = RuntimeError("DB down")
+        mock_factory.return_value = factory
+
+        ledger = CostLedger(interval=60)
+        task_id = uuid4()
+        ledger.add(task_id, 0.05)
+        assert await ledger.flush() == 0
+        ledger.add(task_id, 0.01)
+
+        assert ledger.unflushed(task_id) == pytest.approx(0.06)
+        ledger._task.cancel()
+
+    @patch("src.db.crud.get_session_factory")
+    async def test_background_flush_after_interval(self, mock_factory, mock_session):
+        factory, session = mock_session
+        session.execute.return_value = MagicMock(rowcount=1)
+        mock_factory.return_value = factory
+
+        ledger = CostLedger(interval=0.01)
+        ledger.add(uuid4(), 0.05)
+        await asyncio.sleep(0.05)
+
+        session.execute.assert_called_once()
+        assert ledger.unflushed() == 0
+        await ledger.aclose()
+
+    async def test_close_during_slow_flush_keeps_deltas(self):
+        ledger = CostLedger(interval=0)
+        started = asyncio.Event()
+        written: dict = {}
+
+        async def slow_increment(column, deltas):
+            started.set()
+            await asyncio.sleep(0.05)
+            written.update(deltas)
+            return len(deltas)
+
+        task_id = uuid4()
+        with patch("src.hooks.cost_tracker._task_crud.increment_many", slow_increment):
+            ledger.add(task_id, 1.50)
+            await started.wait()  # the background flush has taken the delta
+            await ledger.aclose()
+
+        assert written == {task_id: 1.50}
+        assert ledger.unflushed() == 0
+        assert ledger.flushed_usd == pytest.approx(1.50)
+
+    async def test_cost_after_close_is_dropped_not_raised(self):
+        ledger = CostLedger(interval=60)
+        await ledger.aclose()
+
+        await update_task_cost_from_result(uuid4(), MagicMock(total_cost_usd=0.25), ledger=ledger)
+
+        assert ledger.dropped == 1
+        assert ledger.unflushed() == 0
+        assert ledger._task is None
+
+
+class TestToolTimer:
+    def test_parallel_calls_keep_separate_start_times(self):
+        timer = ToolTimer()
+        timer.start(ToolTimer.key("toolu_a", "s1", "Read"), now=10.0)
+        timer.start(ToolTimer.key("toolu_b", "s1", "Read"), now=11.0)
+
+        assert timer.finish(ToolTimer.key("toolu_b", "s1", "Read"), now=11.5) == 500
+        assert timer.finish(ToolTimer.key("toolu_a", "s1", "Read"), now=12.0) == 2000
+        assert timer.stats() == {"in_flight": 0, "orphaned": 0, "unmatched": 0}
+
+    def test_falls_back_to_session_and_tool_name(self):
+        assert ToolTimer.key(None, "s1", "Read") == ("s1", "Read")
+        assert ToolTimer.key("toolu_a", "s1", "Read") == "toolu_a"
+
+    def test_expired_starts_are_evicted_as_orphans(self):
+        timer = ToolTimer(ttl_s=60)
+        timer.start("toolu_old", now=0.0)
+        timer.start("toolu_new", now=100.0)
+
+        assert len(timer) == 1
+        assert timer.orphaned == 1
+        assert timer.finish("toolu_old", now=101.0) is None
+        assert timer.unmatched == 1
+
+    def test_bounded_by_max_entries(self):
+        timer = ToolTimer(max_entries=3)
+        for i in range(10):
+            timer.start(f"toolu_{i}", now=float(i))
+
+        assert len(timer) == 3
+        assert timer.orphaned == 7
+        assert timer.finish("toolu_9", now=10.0) == 1000
+
+    @patch("src.hooks.activity_tracker.get_session_factory")
+    async def test_hooks_correlate_by_tool_use_id(self, mock_factory, mock_session):
+        mock_factory.return_value, session = mock_session
+        timer = ToolTimer()
+        hooks = get_activity_hooks(agent_name="reviewer", timer=timer)
+
+        await hooks["PreToolUse"]("Read", {}, session_id="s1", tool_use_id="toolu_a")
+        await hooks["PreToolUse"]("Read", {}, session_id="s1", tool_use_id="toolu_b")
+        assert len(timer) == 2
+
+        await hooks["PostToolUse"]("Read", {}, "ok", session_id="s1", tool_use_id="toolu_a")
+        await hooks["PostToolUse"]("Read", {}, "ok", session_id="s1", tool_use_id="toolu_b")
+
+        assert len(timer) == 0
+        assert timer.stats()["unmatched"] == 0
+        durations = [
+            c.args[0].compile().params["duration_ms"] for c in session.execute.call_args_list[2:]
+        ]
+        assert all(d is not None for d in durations)
+
+
+class TestLatencyRecorder:
+    def test_quantiles_per_tool_and_agent(self):
+        recorder = LatencyRecorder()
+        for ms in range(1, 101):
+            recorder.record("Read", ms, "reviewer")
+        recorder.record("Bash", 5000, "lead")
+        recorder.record("Bash", None, "lead")
+
+        read = recorder.quantiles("Read")
+        assert read[0.5] == pytest.approx(50, rel=0.02)
+        assert read[0.99] == pytest.approx(99, rel=0.02)
+        assert recorder.quantiles(agent_name="lead")[0.5] == pytest.approx(5000, rel=0.01)
+        assert recorder.quantiles("Grep") == {0.5: None, 0.95: None, 0.99: None}
+
+    def test_snapshot_merges_across_recorders(self):
+        a, b = LatencyRecorder(), LatencyRecorder()
+        a.record("Read", 10, "reviewer")
+        b.record("Read", 1000, "reviewer")
+
+        a.merge_snapshot(b.snapshot(reset=True))
+
+        assert len(b) == 0
+        assert a.sketch("Read").count == 2
+        assert a.quantiles("Read", qs=[1.0])[1.0] == pytest.approx(1000, rel=0.01)
+
+    def test_bounded_keys(self):
+        recorder = LatencyRecorder(max_keys=2)
+        for tool in ("Read", "Write", "Edit"):
+            recorder.record(tool, 10)
+        assert len(recorder) == 2
+        assert recorder.dropped == 1
+
+    @patch("src.hooks.activity_tracker.get_session_factory")
+    async def test_post_tool_use_feeds_recorder(self, mock_factory, mock_session):
+        mock_factory.return_value, _ = mock_session
+        recorder = LatencyRecorder()
+        hooks = get_activity_hooks(agent_name="reviewer", latency=recorder)
+
+        await hooks["PreToolUse"]("Read", {}, session_id="s1", tool_use_id="toolu_a")
+        await hooks["PostToolUse"]("Read", {}, "ok", session_id="s1", tool_use_id="toolu_a")
+        await hooks["PostToolUse"]("Read", {}, "ok", session_id="s1", tool_use_id="toolu_x")
+
+        assert recorder.sketch("Read", "reviewer").count == 1
+
+
+class TestSerialize:
+    def test_bounded_repr_matches_str_when_small(self):
+        value = {"file_path": "/a.py", "n": 3, "flags": [True, None], "t": ("x",)}
+        assert bounded_repr(value) == str(value)
+
+    def test_bounded_repr_caps_huge_payloads(self):
+        value = {"content": "x" * 5_000_000, "items": list(range(1_000_000))}
+        out = bounded_repr(value, limit=100)
+        assert len(out) == 100
+        assert out.startswith("{'content': 'xxx")
+        assert out.endswith("...")
+
+    def test_bounded_repr_does_not_repr_unknown_objects(self):
+        class Huge:
+            def __repr__(self):
+                raise AssertionError("repr should not be called")
+
+        assert bounded_repr({"obj": Huge(), "raw": b"abc"}) == "{'obj': <Huge>, 'raw': <3 bytes>}"
+
+    def test_builtin_summarizers(self):
+        assert summarize_input("Read", {"file_path": "/a.py", "limit": 10}) == (
+            "file_path=/a.py limit=10"
+        )
+        assert summarize_input("Write", {"file_path": "/a.py", "content": "x" * 10_000}) == (
+            "file_path=/a.py content=<10000 chars>"
+        )
+        assert summarize_response("Read", "y" * 1_000_000) == "<1000000 chars>"
+
+    def test_unregistered_tool_falls_back_to_bounded_repr(self):
+        assert summarize_input("Grep", {"pattern": "foo"}) == "{'pattern': 'foo'}"
+        assert len(summarize_response("Bash", "z" * 10_000, limit=50)) == 50
+        assert summarize_response("Bash", None) is None
+
+
+class TestActivityOutbox:
+    @patch("src.hooks.outbox._activity_crud")
+    async def test_hooks_append_locally_and_drain_in_batches(self, mock_crud, tmp_path):
+        mock_crud.upsert_many = AsyncMock()
+        outbox = ActivityOutbox(tmp_path / "outbox.db", batch_size=2, interval=60)
+        task_id = uuid4()
+        hooks = get_activity_hooks(task_id=task_id, agent_name="reviewer", writer=outbox)
+
+        await hooks["PreToolUse"]("Read", {"file_path": "/a.py"}, tool_use_id="toolu_a")
+        await hooks["PostToolUse"]("Read", {"file_path": "/a.py"}, "ok", tool_use_id="toolu_a")
+        await hooks["Stop"](num_turns=1)
+        assert outbox.pending == 3
+        mock_crud.upsert_many.assert_not_called()
+
+        assert await outbox.drain() == 3
+        assert mock_crud.upsert_many.call_count == 2  # batches of 2 + 1
+        rows = mock_crud.upsert_many.call_args_list[0].args[0]
+        assert rows[0]["task_id"] == task_id
+        assert isinstance(rows[0]["id"], type(task_id))
+        assert isinstance(rows[0]["event_at"], datetime)
+        assert mock_crud.upsert_many.call_args.kwargs["update_cols"] == []
+        assert outbox.pending == 0
+        await outbox.aclose()
+
+    @patch("src.hooks.outbox._activity_crud")
+    async def test_failed_drain_keeps_rows_for_replay_with_same_ids(self, mock_crud, tmp_path):
+        mock_crud.upsert_many = AsyncMock(side_effect=RuntimeError("Neon cold start"))
+        path = tmp_path / "outbox.db"
+        outbox = ActivityOutbox(path, interval=60)
+        outbox.enqueue({"agent_name": "a", "hook_event": "Stop"})
+
+        with pytest.raises(RuntimeError):
+            await outbox.drain()
+        first_id = mock_crud.upsert_many.call_args.args[0][0]["id"]
+        await outbox.aclose()  # final drain fails too; row stays on disk
+
+        mock_crud.upsert_many = AsyncMock()
+        reopened = ActivityOutbox(path, interval=60)
+        assert reopened.pending == 1
+        assert await reopened.drain() == 1
+        assert mock_crud.upsert_many.call_args.args[0][0]["id"] == first_id
+        await reopened.aclose()
+
+    @patch("src.db.crud.get_engine")
+    async def test_poison_rows_are_quarantined_not_blocking(self, mock_engine, tmp_path):
+        delivered = []
+
+        async def execute(stmt):
+            # Compile the real statement (unknown keys fail here), then apply
+            # the VARCHAR(50) check Postgres would.
+            params = stmt.compile(dialect=postgresql.dialect()).params
+            names = [v for k, v in params.items() if k.startswith("agent_name")]
+            if any(len(name) > 50 for name in names):
+                raise sa_exc.DataError("INSERT", params, Exception("value too long"))
+            delivered.extend(names)
+
+        conn = AsyncMock()
+        conn.__aenter__ = AsyncMock(return_value=conn)
+        conn.__aexit__ = AsyncMock(return_value=False)
+        conn.execute = AsyncMock(side_effect=execute)
+        mock_engine.return_value.connect = MagicMock(return_value=conn)
+
+        outbox = ActivityOutbox(tmp_path / "outbox.db", interval=60)
+        hooks = get_activity_hooks(task_id=None, agent_name="a", writer=outbox)
+        for _ in range(3):
+            await hooks["Stop"](num_turns=1)
+        outbox.enqueue({"agent_name": "x" * 51, "hook_event": "Stop"})
+        await hooks["Stop"](num_turns=1)
+        outbox.enqueue({"agent_name": "a", "hook_event": "Stop", "bogus": 1})
+        outbox._db.execute("INSERT INTO outbox (payload) VALUES ('not json')")
+
+        assert await outbox.drain() == 4
+        assert delivered == ["a"] * 4
+        assert outbox.pending == 0
+        assert outbox.quarantined == 3
+        dead = [e for (e,) in outbox._db.execute("SELECT error FROM outbox_dead ORDER BY seq")]
+        assert "value too long" in dead[0]
+        assert "bogus" in dead[1]
+        await outbox.aclose()
+
+    @patch("src.hooks.outbox._activity_crud")
+    async def test_transient_errors_keep_the_batch_queued(self, mock_crud, tmp_path):
+        mock_crud.upsert_many = AsyncMock(
+            side_effect=sa_exc.OperationalError("INSERT", {}, Exception("connection reset"))
+        )
+        outbox = ActivityOutbox(tmp_path / "outbox.db", interval=60)
+        outbox.enqueue({"agent_name": "a", "hook_event": "Stop"})
+        outbox.enqueue({"agent_name": "b", "hook_event": "Stop"})
+
+        with pytest.raises(sa_exc.OperationalError):
+            await outbox.drain()
+        assert mock_crud.upsert_many.call_count == 1  # no bisecting on a dropped connection
+        assert outbox.pending == 2
+        assert outbox.quarantined == 0
+        await outbox.aclose()
+
+    @patch("src.hooks.outbox._activity_crud")
+    async def test_background_drainer_delivers_after_interval(self, mock_crud, tmp_path):
+        mock_crud.upsert_many = AsyncMock()
+        outbox = ActivityOutbox(tmp_path / "outbox.db", interval=0.01)
+        outbox.enqueue({"agent_name": "a", "hook_event": "Stop"})
+
+        await asyncio.sleep(0.05)
+        assert outbox.written == 1
+        assert outbox.pending == 0
+        await outbox.aclose()
+
+
+class TestCollector:
+    async def _wait_for(self, predicate, timeout=1.0):
+        for _ in range(int(timeout / 0.01)):
+            if predicate():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("condition not met")
+
+    async def test_client_frames_reach_collector_sink(self, tmp_path):
+        sink = MagicMock()
+        collector = ActivityCollector(tmp_path / "c.sock", writer=sink)
+        sink.aclose = AsyncMock()
+        await collector.start()
+        client = CollectorClient(tmp_path / "c.sock")
+        task_id = uuid4()
+        hooks = get_activity_hooks(task_id=task_id, agent_name="reviewer", writer=client)
+
+        await hooks["PreToolUse"]("Read", {"file_path": "/a.py"}, tool_use_id="toolu_a")
+        await hooks["Stop"](num_turns=1)
+        await client.flush()
+        await self._wait_for(lambda: sink.enqueue.call_count == 2)
+
+        row = sink.enqueue.call_args_list[0].args[0]
+        assert row["task_id"] == task_id
+        assert row["hook_event"] == "PreToolUse"
+        assert isinstance(row["id"], type(task_id))
+        assert isinstance(row["event_at"], datetime)
+        await client.aclose()
+        await collector.aclose()
+        assert not (tmp_path / "c.sock").exists()
+
+    async def test_client_buffers_until_collector_is_up(self, tmp_path):
+        client = CollectorClient(tmp_path / "c.sock", reconnect_delay=0.01)
+        client.enqueue({"agent_name": "a", "hook_event": "Stop"})
+        await asyncio.sleep(0.03)
+        assert client.pending == 1
+        assert client.reconnects >= 1
+
+        sink = MagicMock()
+        sink.aclose = AsyncMock()
+        collector = ActivityCollector(tmp_path / "c.sock", writer=sink)
+        await collector.start()
+        await client.flush()
+        await self._wait_for(lambda: sink.enqueue.call_count == 1)
+        assert client.sent == 1
+        await client.aclose()
+        await collector.aclose()
+
+    async def test_oversized_frame_disconnects_client(self, tmp_path):
+        sink = MagicMock()
+        sink.aclose = AsyncMock()
+        collector = ActivityCollector(tmp_path / "c.sock", writer=sink)
+        await collector.start()
+        _, writer = await asyncio.open_unix_connection(str(tmp_path / "c.sock"))
+        writer.write((2**31).to_bytes(4, "big"))
+        await writer.drain()
+        await self._wait_for(lambda: collector.rejected == 1)
+        writer.close()
+        await collector.aclose()
+        sink.enqueue.assert_not_called()
+
+    async def test_non_object_frames_are_rejected(self, tmp_path):
+        sink = MagicMock()
+        sink.aclose = AsyncMock()
+        collector = ActivityCollector(tmp_path / "c.sock", writer=sink)
+        await collector.start()
+        _, writer = await asyncio.open_unix_connection(str(tmp_path / "c.sock"))
+        for payload in (b"[]", b'"x"', b"{bad", b'{"agent_name":"a","hook_event":"Stop"}'):
+            writer.write(len(payload).to_bytes(4, "big") + payload)
+        await writer.drain()
+        await self._wait_for(lambda: collector.received == 1)
+        assert collector.rejected == 3
+        writer.close()
+        await collector.aclose()
+        sink.enqueue.assert_called_once()
+
+    async def test_frames_are_projected_onto_hook_row_keys(self, tmp_path):
+        capture = MagicMock()
+        await get_activity_hooks(agent_name="a", writer=capture)["Stop"](num_turns=1)
+        assert set(with_activity_key(capture.enqueue.call_args.args[0])) == set(ACTIVITY_FIELDS)
+
+        sink = MagicMock()
+        sink.aclose = AsyncMock()
+        collector = ActivityCollector(tmp_path / "c.sock", writer=sink)
+        await collector.start()
+        client = CollectorClient(tmp_path / "c.sock")
+        client.enqueue({"agent_name": "a", "hook_event": "Stop", "bogus": 1})
+        client.enqueue({"agent_name": "a", "tool_name": "Read"})  # no hook_event
+        client.enqueue({"agent_name": "a", "hook_event": "Stop"})
+        hooks = get_activity_hooks(task_id=uuid4(), agent_name="reviewer", writer=client)
+        await hooks["Stop"](num_turns=1)
+        await client.flush()
+        await self._wait_for(lambda: collector.received == 2)
+
+        assert collector.rejected == 2
+        rows = [c.args[0] for c in sink.enqueue.call_args_list]
+        assert [tuple(row) for row in rows] == [ACTIVITY_FIELDS] * 2
+        assert rows[0]["tool_name"] is None
+        await client.aclose()
+        await collector.aclose()
+
+    def test_uds_transport_rejects_writer_and_unknown_transports(self):
+        with pytest.raises(ValueError):
+            get_activity_hooks(agent_name="a", transport="uds", writer=ActivityWriter())
+        with pytest.raises(ValueError):
+            get_activity_hooks(agent_name="a", transport="tcp")
@@ -0,0 +1,217 @@
+"""Tests for range-partition maintenance with a mocked engine."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import sqlalchemy as sa
+
+from src.db.partitions import PartitionSpec, maintain_partitions
+from src.db.tables import agent_activity
+
+
+def _dt(*args) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+def _mock_engine(partitions, default_rows=0, in_range=None):
+    """Engine whose connection lists `partitions` as (name, bound expression).
+
+    `in_range` maps a range start to the default-partition rows counted in it.
+    """
+    conn = AsyncMock()
+
+    async def execute(stmt, params=None):
+        sql = str(stmt)
+        result = MagicMock()
+        if "pg_inherits" in sql:
+            result.all.return_value = partitions
+        elif "count(*)" in sql and params:
+            result.scalar_one.return_value = (in_range or {}).get(params["start"], 0)
+        elif "count(*)" in sql:
+            result.scalar_one.return_value = default_rows
+        return result
+
+    conn.execute = AsyncMock(side_effect=execute)
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    engine = MagicMock()
+    engine.begin = MagicMock(return_value=ctx)
+    return engine, conn
+
+
+def _bound(start: str, end: str) -> str:
+    return f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+
+
+def _executed(conn) -> list[str]:
+    return [str(c.args[0]) for c in conn.execute.call_args_list]
+
+
+def _activity_copy(**partitioning) -> sa.Table:
+    """agent_activity's columns with its partitioning block overridden."""
+    info = {"partitioning": {**agent_activity.info["partitioning"], **partitioning}}
+    columns = [sa.Column(c.name, c.type, primary_key=c.primary_key) for c in agent_activity.columns]
+    return sa.Table("agent_activity", sa.MetaData(), *columns, info=info)
+
+
+class TestPartitionSpec:
+    def test_table_info_mirrors_semantic_yaml(self):
+        yaml = pytest.importorskip("yaml")
+        path = Path(__file__).resolve().parent.parent / "semantic" / "agent_activity.yaml"
+        declared = yaml.safe_load(path.read_text())["partitioning"]
+        declared.pop("strategy")
+
+        assert agent_activity.info["partitioning"] == declared
+        assert PartitionSpec.from_table(agent_activity).table == "agent_activity"
+        assert [c.name for c in agent_activity.primary_key.columns] == ["id", "event_at"]
+
+    def test_monthly_names_and_bounds(self):
+        spec = PartitionSpec("agent_activity", "event_at", interval="month", premake=2)
+        wanted = spec.wanted(_dt(2026, 11, 17, 13, 5))
+        assert wanted == [
+            ("agent_activity_p202611", _dt(2026, 11, 1), _dt(2026, 12, 1)),
+            ("agent_activity_p202612", _dt(2026, 12, 1), _dt(2027, 1, 1)),
+            ("agent_activity_p202701", _dt(2027, 1, 1), _dt(2027, 2, 1)),
+        ]
+
+    def test_daily_names_and_bounds(self):
+        spec = PartitionSpec("agent_activity", "event_at", interval="day", premake=1)
+        wanted = spec.wanted(_dt(2026, 12, 31, 23, 59))
+        assert [name for name, _, _ in wanted] == [
+            "agent_activity_p20261231",
+            "agent_activity_p20270101",
+        ]
+
+    def test_expiry_cutoff(self):
+        spec = PartitionSpec("t", "event_at", interval="month", retain=6)
+        assert spec.expiry_cutoff(_dt(2026, 3, 10)) == _dt(2025, 9, 1)
+        assert PartitionSpec("t", "event_at").expiry_cutoff(_dt(2026, 3, 10)) is None
+
+    def test_rejects_bad_settings(self):
+        with pytest.raises(ValueError):
+            PartitionSpec("t", "event_at", interval="week")
+        with pytest.raises(ValueError):
+            PartitionSpec("t", "event_at", expire="truncate")
+
+    def test_unpartitioned_table_rejected(self):
+        from src.db.tables import tasks
+
+        with pytest.raises(ValueError, match="not partitioned"):
+            PartitionSpec.from_table(tasks)
+
+
+class TestMaintainPartitions:
+    @patch("src.db.partitions.get_engine")
+    async def test_default_config_keeps_all_history(self, mock_get_engine):
+        engine, conn = _mock_engine(
+            [
+                ("agent_activity_default", "DEFAULT"),
+                ("agent_activity_p202001", _bound("2020-01-01", "2020-02-01")),
+                ("agent_activity_p202610", _bound("2026-10-01", "2026-11-01")),
+            ]
+        )
+        mock_get_engine.return_value = engine
+
+        report = await maintain_partitions(now=_dt(2026, 10, 17))
+
+        assert report["expired"] == []
+        assert not any("DETACH" in s or "DROP" in s for s in _executed(conn))
+
+    @patch("src.db.partitions.get_engine")
+    async def test_creates_missing_and_drops_expired(self, mock_get_engine):
+        engine, conn = _mock_engine(
+            [
+                ("agent_activity_default", "DEFAULT"),
+                ("agent_activity_p202603", _bound("2026-03-01", "2026-04-01")),
+                ("agent_activity_p202604", _bound("2026-04-01", "2026-05-01")),
+                ("agent_activity_p202610", _bound("2026-10-01", "2026-11-01")),
+            ]
+        )
+        mock_get_engine.return_value = engine
+        table = _activity_copy(retain=6, expire="drop")
+
+        report = await maintain_partitions(table, now=_dt(2026, 10, 17))
+
+        assert report["created"] == [
+            "agent_activity_p202611",
+            "agent_activity_p202612",
+            "agent_activity_p202701",
+        ]
+        assert report["expired"] == ["agent_activity_p202603"]  # retain=6 → cutoff 2026-04-01
+        sql = _executed(conn)
+        assert any('PARTITION OF "agent_activity"' in s and "2026-11-01" in s for s in sql)
+        assert 'ALTER TABLE "agent_activity" DETACH PARTITION "agent_activity_p202603"' in sql
+        assert 'DROP TABLE "agent_activity_p202603"' in sql
+        assert not any("DELETE" in s for s in sql)
+
+    @patch("src.db.partitions.get_engine")
+    async def test_idempotent_when_up_to_date(self, mock_get_engine):
+        engine, _ = _mock_engine(
+            [
+                (f"agent_activity_p2026{m:02d}", _bound(f"2026-{m:02d}-01", f"2026-{m + 1:02d}-01"))
+                for m in range(5, 12)
+            ]
+            + [("agent_activity_p202612", _bound("2026-12-01", "2027-01-01"))]
+            + [("agent_activity_p202701", _bound("2027-01-01", "2027-02-01"))]
+        )
+        mock_get_engine.return_value = engine
+
+        report = await maintain_partitions(now=_dt(2026, 10, 17))
+
+        assert report["created"] == []
+        assert report["expired"] == []
+        assert report["statements"] == []
+
+    @patch("src.db.partitions.get_engine")
+    async def test_detach_mode_keeps_the_table(self, mock_get_engine):
+        engine, conn = _mock_engine(
+            [("agent_activity_p202603", _bound("2026-03-01", "2026-04-01"))]
+        )
+        mock_get_engine.return_value = engine
+
+        report = await maintain_partitions(_activity_copy(retain=6), now=_dt(2026, 10, 17))
+
+        assert report["expired"] == ["agent_activity_p202603"]
+        sql = _executed(conn)
+        assert 'ALTER TABLE "agent_activity" DETACH PARTITION "agent_activity_p202603"' in sql
+        assert not any("DROP" in s for s in sql)
+
+    @patch("src.db.partitions.get_engine")
+    async def test_rows_stranded_in_default_are_moved_into_new_partition(self, mock_get_engine):
+        engine, _ = _mock_engine(
+            [("agent_activity_default", "DEFAULT")],
+            default_rows=5,
+            in_range={_dt(2026, 11, 1): 3},
+        )
+        mock_get_engine.return_value = engine
+
+        report = await maintain_partitions(now=_dt(2026, 10, 17))
+
+        assert report["moved"] == {"agent_activity_p202611": 3}
+        statements = report["statements"]
+        create = next(i for i, s in enumerate(statements) if "agent_activity_p202611" in s
+                      and "PARTITION OF" in s)  # fmt: skip
+        move_out, move_back = statements[create - 1], statements[create + 1]
+        assert 'DELETE FROM "agent_activity_default" WHERE "event_at" >= ' in move_out
+        assert "'2026-11-01T00:00:00+00:00'" in move_out
+        assert move_back.startswith('INSERT INTO "agent_activity" (')
+        assert 'FROM "_agent_activity_p202611_rescue"' in move_back
+        assert statements[create - 2].startswith('CREATE TEMP TABLE "_agent_activity_p202611_')
+        # Months with nothing stranded are created directly.
+        assert sum("CREATE TEMP TABLE" in s for s in statements) == 1
+
+    @patch("src.db.partitions.get_engine")
+    async def test_dry_run_plans_without_ddl(self, mock_get_engine):
+        engine, conn = _mock_engine([("agent_activity_default", "DEFAULT")], default_rows=12)
+        mock_get_engine.return_value = engine
+
+        report = await maintain_partitions(now=_dt(2026, 10, 17), dry_run=True)
+
+        assert len(report["created"]) == 4
+        assert report["default_rows"] == 12
+        assert not any("CREATE TABLE" in s for s in _executed(conn))
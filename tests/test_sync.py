@@ -0,0 +1,659 @@
+"""Tests for GitHub sync: gh pacing/retries, GraphQL batching, and the batch engine."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import re
+import subprocess
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.models.enums import TaskStatus
+from src.sync.batch import sync_tasks
+from src.sync.github_project import (
+    _record_sync,
+    _run_gh,
+    select_tasks_to_sync,
+    sync_hash,
+    sync_task_to_github,
+    sync_tasks_graphql,
+)
+from src.sync.graphql import (
+    GH_TOKEN_TIMEOUT,
+    GraphQLClient,
+    GraphQLError,
+    Operation,
+    render_batch,
+)
+from src.sync.rate_limit import (
+    Pacer,
+    Priority,
+    is_rate_limited,
+    sync_priority,
+    wait_for_active,
+)
+
+_ALIAS = re.compile(r"^\s*(op\d+): (\w+)(?:\((.*?)\))?", re.MULTILINE)
+_STATUS_OPTIONS = [{"id": "OPT_todo", "name": "Todo"}, {"id": "OPT_wip", "name": "In Progress"}]
+
+
+class FakeGitHub:
+    """Local GraphQL endpoint answering the aliased operations the sync sends."""
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.clients: set = set()
+        self.throttle: list[tuple] = []  # queued (status, headers[, payload]) replies
+        # field -> HTTP status for requests containing it, or a list of statuses
+        # for successive requests (None answers normally)
+        self.fail: dict[str, int | list[int | None]] = {}
+        self.next_issue = 100
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append(body)
+                fake.clients.add(self.client_address)
+                failing = [f for f in fake.fail if f"{f}(" in body["query"]]
+                status = fake.fail[failing[0]] if failing else None
+                if isinstance(status, list):
+                    status = status.pop(0) if status else None
+                if status:
+                    return self._reply(status, {"message": "server error"})
+                if fake.throttle:
+                    status, headers, *payload = fake.throttle.pop(0)
+                    payload = payload[0] if payload else {"message": "secondary rate limit"}
+                    return self._reply(status, payload, headers)
+                self._reply(200, fake.answer(body["query"], body["variables"]))
+
+            def _reply(self, status, payload, headers=None):
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/graphql"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def answer(self, query, variables):
+        data, errors = {}, []
+        for alias, field, _ in _ALIAS.findall(query):
+            args = {
+                k[len(alias) + 1 :]: v for k, v in variables.items() if k.startswith(alias + "_")
+            }
+            value = args.get("input", {})
+            if field == "repository":
+                data[alias] = {"id": "R_1"}
+            elif field == "repositoryOwner":
+                field_ = {"id": "F_status", "options": _STATUS_OPTIONS}
+                data[alias] = {"projectV2": {"id": "PVT_1", "field": field_}}
+            elif field == "resource":
+                data[alias] = {"id": "I_" + args["url"].rsplit("/", 1)[-1]}
+            elif field == "createIssue" and value["title"] == "FAIL":
+                data[alias] = None
+                errors.append({"message": "title rejected", "path": [alias]})
+            elif field == "createIssue":
+                self.next_issue += 1
+                data[alias] = {"issue": {"id": f"I_{self.next_issue}", "number": self.next_issue}}
+            elif field == "updateIssue":
+                number = int(value["id"].removeprefix("I_"))
+                data[alias] = {"issue": {"id": value["id"], "number": number}}
+            elif field == "addProjectV2ItemById":
+                data[alias] = {"item": {"id": "PVTI_" + value["contentId"]}}
+            elif field == "updateProjectV2ItemFieldValue":
+                data[alias] = {"projectV2Item": {"id": value["itemId"]}}
+        return {"data": data, **({"errors": errors} if errors else {})}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_github():
+    fake = FakeGitHub()
+    yield fake
+    fake.close()
+
+
+def _session_factory(rows):
+    session = AsyncMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = rows
+    session.execute = AsyncMock(return_value=result)
+    return MagicMock(return_value=session), session
+
+
+_ENV = {"PRJ_GITHUB_REPO": "acme/widgets", "PRJ_GITHUB_PROJECT_NUMBER": "3"}
+T0 = datetime(2026, 10, 17, tzinfo=UTC)
+T1 = datetime(2026, 10, 17, 0, 5, tzinfo=UTC)
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _proc(returncode=0, stdout=b"", stderr=b""):
+    proc = MagicMock()
+    proc.returncode = returncode
+    proc.communicate = AsyncMock(return_value=(stdout, stderr))
+    return proc
+
+
+class TestRunGh:
+    @patch("src.sync.github_project.asyncio.create_subprocess_exec")
+    async def test_retries_secondary_rate_limit_with_pacer(self, mock_exec):
+        mock_exec.side_effect = [
+            _proc(1, stderr=b"You have exceeded a secondary rate limit"),
+            _proc(0, stdout=b'{"number": 7}\n'),
+        ]
+        pacer = Pacer(0.0, cooldown=0.01)
+
+        assert await _run_gh("issue", "create", pacer=pacer) == '{"number": 7}'
+        assert mock_exec.call_count == 2
+
+    @patch("src.sync.github_project.asyncio.create_subprocess_exec")
+    async def test_other_errors_raise_immediately(self, mock_exec):
+        mock_exec.return_value = _proc(1, stderr=b"not found")
+
+        with pytest.raises(RuntimeError, match="not found"):
+            await _run_gh("issue", "edit", "1", pacer=Pacer(0.0))
+        assert mock_exec.call_count == 1
+
+    @patch("src.sync.github_project.asyncio.create_subprocess_exec")
+    async def test_cancellation_kills_process(self, mock_exec):
+        proc = _proc()
+        proc.communicate = AsyncMock(side_effect=asyncio.CancelledError)
+        proc.wait = AsyncMock()
+        mock_exec.return_value = proc
+
+        with pytest.raises(asyncio.CancelledError):
+            await _run_gh("issue", "list")
+        proc.kill.assert_called_once()
+
+
+class TestPacer:
+    async def test_wait_for_active_excludes_time_queued(self):
+        pacer = Pacer(0.05)
+
+        async def work(seconds):
+            await pacer.wait()
+            await pacer.wait()  # queued ~0.05s behind the first
+            await asyncio.sleep(seconds)
+            return "done"
+
+        assert await wait_for_active(work(0), timeout=0.02) == "done"
+        with pytest.raises(TimeoutError):
+            await wait_for_active(work(0.2), timeout=0.05)
+        assert await wait_for_active(work(0), timeout=None) == "done"
+
+    async def test_spaces_out_concurrent_callers(self):
+        pacer = Pacer(0.02)
+        stamps = []
+
+        async def call():
+            await pacer.wait()
+            stamps.append(time.monotonic())
+
+        await asyncio.gather(*(call() for _ in range(5)))
+
+        gaps = [b - a for a, b in itertools.pairwise(stamps)]
+        assert min(gaps) >= 0.018
+
+    async def test_back_off_holds_everyone(self):
+        pacer = Pacer(0.0)
+        pacer.back_off(0.05)
+        start = time.monotonic()
+        await pacer.wait()
+        assert time.monotonic() - start >= 0.045
+
+    async def test_token_bucket_allows_burst_then_paces(self):
+        pacer = Pacer(0.05, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await pacer.wait()
+        assert time.monotonic() - start < 0.03
+        await pacer.wait()
+        assert time.monotonic() - start >= 0.04
+
+    async def test_batch_cost_is_repaid_by_later_callers(self):
+        pacer = Pacer(0.01)
+        await pacer.wait(5)  # goes out now, leaves a 5-write debt
+        start = time.monotonic()
+        await pacer.wait()
+        assert time.monotonic() - start >= 0.045
+
+    async def test_higher_priority_waiters_go_first(self):
+        pacer = Pacer(0.02)
+        await pacer.wait()  # drain the bucket so the rest queue up
+        order = []
+
+        async def call(name, priority):
+            await pacer.wait(priority=priority)
+            order.append(name)
+
+        await asyncio.gather(
+            call("backlog", Priority.backlog),
+            call("normal", Priority.normal),
+            call("status", Priority.status),
+        )
+        assert order == ["status", "normal", "backlog"]
+
+    async def test_low_primary_quota_spreads_requests_until_reset(self):
+        pacer = Pacer(0.0, reserve=10)
+        pacer.observe({"x-ratelimit-remaining": "2", "x-ratelimit-reset": str(time.time() + 0.2)})
+        stamps = []
+        for _ in range(2):
+            await pacer.wait(0)  # reads still spend primary quota
+            stamps.append(time.monotonic())
+        assert stamps[1] - stamps[0] >= 0.15
+        assert pacer.remaining == 0
+
+    def test_retry_delay_is_jittered_exponential_and_capped(self):
+        pacer = Pacer(cooldown=60, base_delay=1, max_backoff=300, jitter=0.5)
+
+        first = [pacer.retry_delay(0) for _ in range(50)]
+        assert all(60 <= d <= 90 for d in first) and len(set(first)) > 1
+        assert 120 <= pacer.retry_delay(1) <= 180
+        assert 300 <= pacer.retry_delay(10) <= 450
+        assert 2 <= pacer.retry_delay(1, transient=True) <= 3
+        assert pacer.retry_delay(3, retry_after=7) == 7
+
+    def test_priority_and_limit_classification(self):
+        assert sync_priority("in_progress", "low") is Priority.status
+        assert sync_priority("pending", "critical") is Priority.high
+        assert sync_priority("blocked", "low") is Priority.backlog
+        assert sync_priority("pending", "medium") is Priority.normal
+        assert is_rate_limited("HTTP 403: API rate limit exceeded for user")
+        assert is_rate_limited("You have exceeded a secondary rate limit")
+        assert not is_rate_limited("Not Found")
+
+
+class TestSyncTasks:
+    @patch("src.sync.batch.sync_task_to_github")
+    async def test_bounded_concurrency_scales_down_elapsed_time(self, mock_sync):
+        in_flight = peak = 0
+
+        async def fake_sync(task_id, *, pacer):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return {"github_issue_number": 1, "github_project_item_id": "x"}
+
+        mock_sync.side_effect = fake_sync
+        ids = [uuid4() for _ in range(20)]
+
+        summary = await sync_tasks(ids, concurrency=5, pacer=Pacer(0.0))
+
+        assert peak == 5
+        assert summary.succeeded == 20
+        assert summary.elapsed < 20 * 0.05 / 3  # ~4 rounds of 0.05s, not 20
+        assert [r.task_id for r in summary.results] == ids
+
+    @patch("src.sync.batch.sync_task_to_github")
+    async def test_failures_and_timeouts_are_aggregated(self, mock_sync):
+        ids = [uuid4() for _ in range(3)]
+
+        async def fake_sync(task_id, *, pacer):
+            if task_id == ids[1]:
+                raise RuntimeError("gh issue create failed: boom")
+            if task_id == ids[2]:
+                await asyncio.sleep(1)
+            return {"github_issue_number": 42, "github_project_item_id": "x"}
+
+        mock_sync.side_effect = fake_sync
+        progress = []
+
+        summary = await sync_tasks(
+            ids,
+            concurrency=3,
+            timeout=0.05,
+            pacer=Pacer(0.0),
+            on_result=lambda r, done, total: progress.append((done, total)),
+        )
+
+        report = summary.to_dict()
+        assert (report["succeeded"], report["failed"], report["timed_out"]) == (1, 1, 1)
+        assert summary.results[0].github_issue_number == 42
+        assert "boom" in report["errors"][str(ids[1])]
+        assert progress == [(1, 3), (2, 3), (3, 3)]
+
+    @patch("src.sync.github_project.env", side_effect=lambda key, **_: _ENV[key])
+    @patch("src.sync.github_project.get_session_factory")
+    @patch("src.sync.github_project._run_gh")
+    async def test_gh_failure_after_create_keeps_issue_number(self, mock_gh, mock_factory, _env):
+        row = {"id": uuid4(), "title": "new", "description": None, "status": "pending",
+               "priority": "medium", "github_issue_number": None,
+               "github_project_item_id": None, "updated_at": T0}  # fmt: skip
+        mock_factory.return_value, session = _session_factory([row])
+        session.execute.return_value.mappings.return_value.first.return_value = row
+        mock_gh.side_effect = ['{"number": 12}', RuntimeError("gh project item-add failed")]
+
+        with pytest.raises(RuntimeError):
+            await sync_task_to_github(row["id"])
+
+        store = session.execute.await_args_list[-1].args[0]
+        assert store.compile().params["github_issue_number"] == 12
+        session.commit.assert_awaited_once()
+
+    async def test_rejects_zero_concurrency(self):
+        with pytest.raises(ValueError):
+            await sync_tasks([], concurrency=0)
+
+    @patch("src.sync.batch.sync_tasks_graphql")
+    async def test_time_queued_in_pacer_does_not_count_toward_timeout(self, mock_gql):
+        async def fake_gql(chunk, client):
+            for _ in chunk:
+                await client.pacer.wait()  # one paced write per task
+            return {t: {"github_issue_number": 1, "github_project_item_id": "x"} for t in chunk}
+
+        mock_gql.side_effect = fake_gql
+        client = MagicMock(max_batch=5, pacer=Pacer(0.01))
+        ids = [uuid4() for _ in range(40)]
+
+        # 40 writes take ~0.4s through the Pacer, far past the 0.1s per-batch limit.
+        summary = await sync_tasks(ids, concurrency=8, timeout=0.1, client=client)
+
+        assert (summary.succeeded, summary.timed_out) == (40, 0)
+        assert summary.elapsed > 0.3
+
+    @patch("src.sync.batch.sync_task_to_github")
+    @patch("src.sync.batch.sync_tasks_graphql")
+    async def test_graphql_batches_fall_back_to_gh_when_api_unreachable(self, mock_gql, mock_gh):
+        ids = [uuid4() for _ in range(3)]
+        ok = {"github_issue_number": 5, "github_project_item_id": "x"}
+
+        async def fake_gql(chunk, client):
+            if ids[2] in chunk:
+                raise GraphQLError("GitHub GraphQL HTTP 401: bad credentials", status=401)
+            return dict.fromkeys(chunk, ok)
+
+        mock_gql.side_effect = fake_gql
+        mock_gh.return_value = ok
+        client = MagicMock(max_batch=2)
+
+        summary = await sync_tasks(ids, client=client, pacer=Pacer(0.0))
+
+        assert summary.succeeded == 3
+        assert [c.args[0] for c in mock_gql.await_args_list] == [ids[:2], ids[2:]]
+        mock_gh.assert_awaited_once()
+
+
+class TestGraphQL:
+    def test_render_batch_aliases_each_operation(self):
+        query, variables = render_batch(
+            "mutation",
+            [
+                Operation(
+                    "createIssue", {"input": ("CreateIssueInput!", {"title": "a"})}, "issue { id }"
+                ),
+                Operation(
+                    "createIssue", {"input": ("CreateIssueInput!", {"title": "b"})}, "issue { id }"
+                ),
+            ],
+        )
+
+        assert query.startswith(
+            "mutation($op0_input: CreateIssueInput!, $op1_input: CreateIssueInput!)"
+        )
+        assert "op1: createIssue(input: $op1_input) { issue { id } }" in query
+        assert variables == {"op0_input": {"title": "a"}, "op1_input": {"title": "b"}}
+
+    async def test_batch_reports_errors_per_alias_over_one_connection(self, fake_github):
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=Pacer(0.0), max_batch=2)
+        ops = [
+            Operation(
+                "createIssue", {"input": ("CreateIssueInput!", {"title": t})}, "issue { number }"
+            )
+            for t in ("a", "FAIL", "c")
+        ]
+
+        results = await client.batch("mutation", ops)
+        await client.execute("query { viewer { login } }")
+        client.close()
+
+        assert results[0]["issue"]["number"] == 101
+        assert isinstance(results[1], GraphQLError) and "title rejected" in str(results[1])
+        assert results[2]["issue"]["number"] == 102
+        assert len(fake_github.requests) == 3  # two batches + execute
+        assert len(fake_github.clients) == 1  # keep-alive connection reused
+
+    async def test_secondary_limit_backs_off_and_retries(self, fake_github):
+        fake_github.throttle.append((403, {"Retry-After": "0"}))
+        pacer = Pacer(0.0)
+        pacer.back_off = MagicMock(wraps=pacer.back_off)
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=pacer)
+
+        data = await client.execute("query {\n  op0: repository { id }\n}")
+
+        assert data == {"op0": {"id": "R_1"}}
+        pacer.back_off.assert_called_once_with(0.0)
+        assert len(fake_github.requests) == 2
+
+    async def test_graphql_rate_limited_error_and_5xx_are_retried(self, fake_github):
+        reset = str(int(time.time()) + 3600)
+        limited = {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+        fake_github.throttle += [
+            (200, {"x-ratelimit-remaining": "4000", "x-ratelimit-reset": reset}, limited),
+            (502, {}),
+        ]
+        pacer = Pacer(0.0, cooldown=0.01, base_delay=0.01)
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=pacer)
+
+        data = await client.execute("query {\n  op0: repository { id }\n}")
+
+        assert data == {"op0": {"id": "R_1"}}
+        assert len(fake_github.requests) == 3
+        assert pacer.remaining == 4000 - 2  # observed, then counted down locally
+
+    async def test_mutations_are_not_resent_after_server_errors(self, fake_github):
+        fake_github.throttle.append((502, {}))
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=Pacer(0.0, base_delay=0.01))
+        ops = [Operation("createIssue", {"input": ("CreateIssueInput!", {"title": "a"})}, "")]
+
+        with pytest.raises(GraphQLError) as exc:
+            await client.batch("mutation", ops)
+        assert exc.value.status == 502
+        assert len(fake_github.requests) == 1
+
+        reply = json.dumps({"data": {"op0": {"issue": {"number": 1}}}}).encode()
+        client._send = MagicMock(side_effect=[ConnectionRefusedError(), (200, {}, reply)])
+        assert await client.batch("mutation", ops) == [{"issue": {"number": 1}}]  # never sent
+
+        client._send = MagicMock(side_effect=TimeoutError("read timed out"))
+        with pytest.raises(TimeoutError):  # may have run: not resent
+            await client.batch("mutation", ops)
+        client._send.assert_called_once()
+
+    @patch("src.sync.graphql.shutil.which", return_value="/usr/bin/gh")
+    @patch("src.sync.graphql.subprocess.run")
+    @patch("src.sync.graphql.env", side_effect=lambda key, default=None: default)
+    def test_from_env_gives_up_on_a_hung_gh(self, _env, mock_run, _which):
+        mock_run.side_effect = subprocess.TimeoutExpired(["gh", "auth", "token"], 10)
+
+        assert GraphQLClient.from_env() is None
+        assert mock_run.call_args.kwargs["timeout"] == GH_TOKEN_TIMEOUT
+
+    async def test_other_http_errors_raise(self, fake_github):
+        fake_github.throttle.append((401, {}))
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=Pacer(0.0))
+
+        with pytest.raises(GraphQLError) as exc:
+            await client.execute("query { viewer { login } }")
+        assert exc.value.status == 401
+
+    @patch("src.sync.github_project.env", side_effect=lambda key, **_: _ENV[key])
+    @patch("src.sync.github_project.get_session_factory")
+    async def test_sync_tasks_graphql_end_to_end(self, mock_factory, _env, fake_github):
+        ids = [uuid4() for _ in range(3)]
+        rows = [
+            {"id": ids[0], "title": "new", "description": None, "status": "pending",
+             "priority": "medium", "github_issue_number": None,
+             "github_project_item_id": None, "updated_at": T0},
+            {"id": ids[1], "title": "FAIL", "description": "x", "status": "pending",
+             "priority": "medium", "github_issue_number": None,
+             "github_project_item_id": None, "updated_at": T0},
+            {"id": ids[2], "title": "old", "description": "y", "status": "in_progress",
+             "priority": "low", "github_issue_number": 7,
+             "github_project_item_id": "PVTI_I_7", "updated_at": T0},
+        ]  # fmt: skip
+        mock_factory.return_value, session = _session_factory(rows)
+        session.execute.return_value.scalar_one_or_none.return_value = T1  # issue number stored
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=Pacer(0.0))
+
+        results = await sync_tasks_graphql(ids, client)
+
+        assert results[ids[0]] == {
+            "github_issue_number": 101,
+            "github_project_item_id": "PVTI_I_101",
+        }
+        assert isinstance(results[ids[1]], GraphQLError)
+        assert results[ids[2]] == {"github_issue_number": 7, "github_project_item_id": "PVTI_I_7"}
+        # context, issue lookup, create/update, add item, status: one request each
+        assert len(fake_github.requests) == 5
+        status_vars = fake_github.requests[-1]["variables"]
+        assert status_vars["op1_input"]["value"] == {"singleSelectOptionId": "OPT_wip"}
+        # select, new issue number, then (update, subtask) per synced task
+        assert session.execute.await_count == 1 + 1 + 2 * 2
+        store = session.execute.await_args_list[1].args[0]
+        assert "RETURNING tasks.updated_at" in _sql(store)
+        assert store.compile().params["github_issue_number"] == 101
+        update = session.execute.await_args_list[2].args[0]
+        assert "github_sync_hash=CASE WHEN (tasks.updated_at = " in _sql(update)
+        params = update.compile().params.values()
+        assert T1 in params and sync_hash("new", None, "pending") in params
+
+    @patch("src.sync.github_project.env", side_effect=lambda key, **_: _ENV[key])
+    @patch("src.sync.github_project.get_session_factory")
+    async def test_failure_after_create_keeps_issue_number(self, mock_factory, _env, fake_github):
+        task_id = uuid4()
+        row = {"id": task_id, "title": "new", "description": None, "status": "pending",
+               "priority": "medium", "github_issue_number": None,
+               "github_project_item_id": None, "updated_at": T0}  # fmt: skip
+        mock_factory.return_value, session = _session_factory([row])
+        session.execute.return_value.scalar_one_or_none.return_value = T1
+        fake_github.fail["addProjectV2ItemById"] = 502
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=Pacer(0.0))
+
+        results = await sync_tasks_graphql([task_id], client)
+
+        assert isinstance(results[task_id], GraphQLError)  # failed, but did not raise
+        statements = [_sql(c.args[0]) for c in session.execute.await_args_list]
+        assert len(statements) == 2 and "SET github_issue_number=" in statements[1]
+        assert sum("addProjectV2ItemById" in r["query"] for r in fake_github.requests) == 1
+
+    @patch("src.sync.github_project.env", side_effect=lambda key, **_: _ENV[key])
+    @patch("src.sync.github_project.get_session_factory")
+    async def test_failed_request_keeps_other_chunks(self, mock_factory, _env, fake_github):
+        ids = [uuid4() for _ in range(30)]
+        rows = [
+            {"id": t, "title": f"task {i}", "description": None, "status": "pending",
+             "priority": "medium", "github_issue_number": None,
+             "github_project_item_id": None, "updated_at": T0}
+            for i, t in enumerate(ids)
+        ]  # fmt: skip
+        mock_factory.return_value, session = _session_factory(rows)
+        session.execute.return_value.scalar_one_or_none.return_value = T1
+        fake_github.fail["createIssue"] = [None, 502]  # second of two createIssue requests
+        client = GraphQLClient("t0ken", url=fake_github.url, pacer=Pacer(0.0))
+
+        results = await sync_tasks_graphql(ids, client)
+
+        assert [results[t]["github_issue_number"] for t in ids[:25]] == list(range(101, 126))
+        assert all(isinstance(results[t], GraphQLError) for t in ids[25:])
+        stored = [
+            c.args[0].compile().params.get("github_issue_number")
+            for c in session.execute.await_args_list
+            if "RETURNING tasks.updated_at" in _sql(c.args[0])
+        ]
+        assert stored == list(range(101, 126))
+
+
+class TestChangeDetection:
+    def test_hash_covers_pushed_fields_only(self):
+        base = sync_hash("Fix login", None, "pending")
+
+        assert sync_hash("Fix login", "", TaskStatus.pending) == base
+        assert sync_hash("Fix login", None, "in_progress") != base
+        assert sync_hash("Fix login", "details", "pending") != base
+        assert len(base) == 64
+
+    @patch("src.sync.github_project.get_session_factory")
+    async def test_only_changed_tasks_are_returned(self, mock_factory):
+        ids = [uuid4() for _ in range(3)]
+        rows = [
+            {"id": ids[0], "title": "same", "description": None, "status": "pending",
+             "priority": "medium", "updated_at": T0,
+             "github_sync_hash": sync_hash("same", None, "pending")},
+            {"id": ids[1], "title": "edited", "description": None, "status": "blocked",
+             "priority": "medium", "updated_at": T0,
+             "github_sync_hash": sync_hash("edited", None, "pending")},
+            {"id": ids[2], "title": "never synced", "description": None, "status": "pending",
+             "priority": "medium", "updated_at": T0,
+             "github_sync_hash": None},
+        ]  # fmt: skip
+        mock_factory.return_value, session = _session_factory(rows)
+
+        changed = await select_tasks_to_sync(["pending", "blocked"])
+
+        assert [r["id"] for r in changed] == [ids[1], ids[2]]
+        select = _sql(session.execute.await_args_list[0].args[0])
+        assert "tasks.updated_at > tasks.github_synced_at" in select
+        bump, params = session.execute.await_args_list[1].args
+        assert "github_synced_at=now()" in _sql(bump)
+        assert params == [{"task_id": ids[0], "seen": T0}]
+        session.commit.assert_awaited_once()
+
+    async def test_sync_racing_an_edit_leaves_task_selected(self):
+        session = AsyncMock()
+        row = {"id": uuid4(), "title": "t", "description": None, "status": "pending",
+               "updated_at": T0}  # fmt: skip
+
+        await _record_sync(session, row, 5, "PVTI_I_5", "acme/widgets")
+
+        update = session.execute.await_args_list[0].args[0]
+        sql = _sql(update)
+        seen = "CASE WHEN (tasks.updated_at = %(updated_at_1)s::TIMESTAMP WITH TIME ZONE)"
+        # Edited since the read: no hash, and github_synced_at stays behind the
+        # edit's updated_at, so `updated_at > github_synced_at` picks it up again.
+        assert f"github_sync_hash={seen} THEN %(param_1)s::VARCHAR END" in sql
+        assert f"github_synced_at={seen} THEN now() ELSE tasks.github_synced_at END" in sql
+        assert update.compile().params["updated_at_1"] == T0
+
+    @patch("src.sync.github_project.get_session_factory")
+    async def test_force_returns_everything_without_bumping(self, mock_factory):
+        rows = [
+            {"id": uuid4(), "title": "same", "description": None, "status": "pending",
+             "priority": "medium", "updated_at": T0,
+             "github_sync_hash": sync_hash("same", None, "pending")},
+        ]  # fmt: skip
+        mock_factory.return_value, session = _session_factory(rows)
+
+        changed = await select_tasks_to_sync(force=True)
+
+        assert len(changed) == 1
+        assert "github_synced_at" not in _sql(session.execute.await_args_list[0].args[0])
+        assert session.execute.await_count == 1